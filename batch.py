@@ -0,0 +1,218 @@
+# ============================================================================
+# batch.py - Offline batch report generation
+# ============================================================================
+"""
+Generate pre-market reports for many portfolios from a JSONL file.
+
+Each input line is a portfolio:
+    {"portfolio_id": "client_0001", "tickers": ["AAPL", "MSFT"]}
+
+Market data is fetched once for the union of all tickers, then each
+portfolio's report is rendered from that shared data with bounded
+concurrency. Reports are appended to the output JSONL as they finish, so an
+interrupted run can be resumed by running the same command again. Reports
+with missing sections or prices are written as partial and generated again
+on the next run; readers should keep the last line per portfolio_id.
+
+Usage:
+    python batch.py portfolios.jsonl reports.jsonl --concurrency 16 --summary
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from market_report_agent.tools.report_templates import missing_sections, render_quick_report
+from market_report_agent.tools.report_tools import gather_report_data, summarize_report
+
+# Print progress every N completed portfolios
+PROGRESS_EVERY = 100
+
+
+def load_portfolios(input_path: str) -> list[dict]:
+    """Read portfolios from JSONL, normalizing tickers."""
+    portfolios = []
+    with open(input_path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                portfolios.append({
+                    "portfolio_id": str(record["portfolio_id"]),
+                    "tickers": list(dict.fromkeys(t.upper().strip() for t in record["tickers"])),
+                })
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                print(f"⚠️  Skipping line {line_number}: {e}")
+    return portfolios
+
+
+def load_completed(output_path: str) -> set[str]:
+    """Portfolio IDs that already have a successful report in the output."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if record.get("success"):
+                completed.add(record["portfolio_id"])
+    return completed
+
+
+def slice_market_data(data: dict, tickers: list[str]) -> dict:
+    """Select one portfolio's share of the union market data."""
+    return {
+        "prices": {t: data["prices"].get(t, {"error": "No data available"}) for t in tickers},
+        "sectors": data["sectors"],
+        "portfolio_news": {t: data["portfolio_news"].get(t, {"articles": []}) for t in tickers},
+        "general_news": data["general_news"],
+    }
+
+
+def incomplete_sections(portfolio_data: dict) -> list[str]:
+    """
+    Sections of one portfolio's data that are missing or degraded.
+
+    Besides the sections marked unavailable, a report is incomplete when
+    any of its tickers has no price or the sector section failed.
+    """
+    incomplete = missing_sections(portfolio_data)
+    prices = portfolio_data["prices"].values()
+    if "prices" not in incomplete and any("error" in price for price in prices):
+        incomplete.append("prices")
+    if "sectors" not in incomplete and "error" in portfolio_data["sectors"]:
+        incomplete.append("sectors")
+    return incomplete
+
+
+async def build_report(
+    portfolio: dict, data: dict, report_date: str, include_summary: bool
+) -> tuple[str, list[str]]:
+    """Render one portfolio's report from the shared market data, with its incomplete sections."""
+    portfolio_data = slice_market_data(data, portfolio["tickers"])
+    report = render_quick_report(report_date=report_date, **portfolio_data)
+    if include_summary:
+        summary = await summarize_report(report)
+        report = render_quick_report(report_date=report_date, summary=summary, **portfolio_data)
+    return report, incomplete_sections(portfolio_data)
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 16,
+    include_summary: bool = False
+) -> dict:
+    """
+    Generate reports for every pending portfolio in the input file.
+
+    Args:
+        input_path: JSONL file of portfolios
+        output_path: JSONL file reports are appended to
+        concurrency: Maximum reports generated at the same time
+        include_summary: Add a model-written executive summary to each report
+
+    Returns:
+        Dictionary with run metrics
+    """
+    start = time.perf_counter()
+    portfolios = load_portfolios(input_path)
+    completed = load_completed(output_path)
+    pending = [p for p in portfolios if p["portfolio_id"] not in completed and p["tickers"]]
+
+    print(f"📂 {len(portfolios)} portfolio(s), {len(completed)} already done, {len(pending)} to generate")
+    if not pending:
+        return {"generated": 0, "partial": 0, "failed": 0, "elapsed_s": 0.0}
+
+    # Fetch market data once for the union of all tickers
+    union = sorted({t for p in pending for t in p["tickers"]})
+    print(f"📈 Fetching market data for {len(union)} distinct ticker(s)...")
+    fetch_start = time.perf_counter()
+    data = await gather_report_data(union)
+    fetch_s = time.perf_counter() - fetch_start
+    print(f"✅ Market data ready in {fetch_s:.1f}s")
+
+    report_date = datetime.now().strftime("%Y-%m-%d")
+    semaphore = asyncio.Semaphore(concurrency)
+    generated = partial = failed = 0
+    render_start = time.perf_counter()
+
+    async def generate(portfolio: dict) -> dict:
+        async with semaphore:
+            record = {
+                "portfolio_id": portfolio["portfolio_id"],
+                "tickers": portfolio["tickers"],
+                "report_date": report_date,
+            }
+            try:
+                record["report"], incomplete = await build_report(portfolio, data, report_date, include_summary)
+                # Only complete reports count as done; a resumed run retries the rest
+                record["success"] = not incomplete
+                if incomplete:
+                    record["partial"] = True
+                    record["missing"] = incomplete
+            except Exception as e:
+                record["success"] = False
+                record["error"] = str(e)
+            return record
+
+    with open(output_path, "a") as out:
+        for task in asyncio.as_completed([generate(p) for p in pending]):
+            record = await task
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+            if record["success"]:
+                generated += 1
+            elif record.get("partial"):
+                partial += 1
+            else:
+                failed += 1
+
+            done = generated + partial + failed
+            if done % PROGRESS_EVERY == 0 or done == len(pending):
+                rate = done / (time.perf_counter() - render_start)
+                print(f"   {done}/{len(pending)} reports ({rate:.1f}/s, {partial} partial, {failed} failed)")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "generated": generated,
+        "partial": partial,
+        "failed": failed,
+        "distinct_tickers": len(union),
+        "fetch_s": round(fetch_s, 2),
+        "elapsed_s": round(elapsed, 2),
+        "reports_per_s": round((generated + partial + failed) / elapsed, 2),
+    }
+
+
+def main():
+    """Command line entry point for batch report generation."""
+    parser = argparse.ArgumentParser(description="Generate market reports for many portfolios")
+    parser.add_argument("input", help="JSONL file with portfolio_id and tickers per line")
+    parser.add_argument("output", help="JSONL file to append reports to")
+    parser.add_argument("--concurrency", type=int, default=16, help="Reports generated at the same time")
+    parser.add_argument("--summary", action="store_true", help="Add a model-written executive summary")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("🚀 MarketReportAgent Batch Mode")
+    print("=" * 60)
+    metrics = asyncio.run(run_batch(args.input, args.output, args.concurrency, args.summary))
+    print("=" * 60)
+    for name, value in metrics.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
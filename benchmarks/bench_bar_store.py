@@ -0,0 +1,146 @@
+# ============================================================================
+# benchmarks/bench_bar_store.py
+# ============================================================================
+"""
+Benchmark: price updates from per-ticker DataFrames vs the columnar bar store.
+
+The DataFrame path rebuilds what each tool call used to hold per ticker (a
+`history()` frame plus its `.dropna()` copy) and reads the price metrics out
+of it. The bar store path computes the same metrics with one snapshot over
+the store's arrays. Network time is excluded; both run on synthetic bars.
+
+Usage:
+    python -m benchmarks.bench_bar_store --symbols 1000 --days 252
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import BarStore
+
+
+def make_bars(symbols: int, days: int, seed: int = 7) -> pd.DataFrame:
+    """Synthetic daily bars shaped like a yfinance download grouped by column."""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0.0004, 0.02, size=(days, symbols)), axis=0)
+    spread = np.abs(rng.normal(0, 0.01, size=(days, symbols))) * closes
+    fields = {
+        "Open": closes,
+        "High": closes + spread,
+        "Low": closes - spread,
+        "Close": closes,
+        "Volume": rng.integers(100_000, 10_000_000, size=(days, symbols)).astype(float),
+    }
+    index = pd.bdate_range(end="2026-01-30", periods=days)
+    tickers = [f"T{i:05d}" for i in range(symbols)]
+    return pd.concat({name: pd.DataFrame(v, index=index, columns=tickers) for name, v in fields.items()}, axis=1)
+
+
+def dataframe_path(data: pd.DataFrame) -> tuple[dict, list]:
+    """Per-ticker frames, as built by one call of the old price tool."""
+    frames = []
+    results = {}
+    for ticker in data["Close"].columns:
+        hist = pd.DataFrame({
+            "Open": data[("Open", ticker)],
+            "High": data[("High", ticker)],
+            "Low": data[("Low", ticker)],
+            "Close": data[("Close", ticker)],
+            "Volume": data[("Volume", ticker)],
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        })
+        hist = hist.dropna()
+        frames.append(hist)
+
+        current_price = hist["Close"].iloc[-1]
+        prev_close = hist["Close"].iloc[-2]
+        week_open = hist["Close"].iloc[max(0, len(hist) - 6)]
+        results[ticker] = {
+            "current_price": round(current_price, 2),
+            "day_change_pct": round((current_price / prev_close - 1) * 100, 2),
+            "week_change_pct": round((current_price / week_open - 1) * 100, 2),
+            "volume": int(hist["Volume"].iloc[-1]),
+            "high_52w": round(hist["High"].max(), 2),
+            "low_52w": round(hist["Low"].min(), 2),
+        }
+    return results, frames
+
+
+def bar_store_path(store: BarStore, tickers: list[str]) -> dict:
+    """The same metrics from one snapshot over the store."""
+    bars = store.snapshot(tickers, lookbacks=(1, 5))
+    day_change_pct = (bars["close"] / bars["close_1"] - 1) * 100
+    week_change_pct = (bars["close"] / bars["close_5"] - 1) * 100
+    return {
+        ticker: {
+            "current_price": round(float(bars["close"][i]), 2),
+            "day_change_pct": round(float(day_change_pct[i]), 2),
+            "week_change_pct": round(float(week_change_pct[i]), 2),
+            "volume": int(bars["volume"][i]),
+            "high_52w": round(float(bars["high_52w"][i]), 2),
+            "low_52w": round(float(bars["low_52w"][i]), 2),
+        }
+        for i, ticker in enumerate(tickers)
+    }
+
+
+def _best_time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _peak_bytes(fn) -> int:
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main(symbols: int, days: int, repeat: int) -> None:
+    data = make_bars(symbols, days)
+    tickers = list(data["Close"].columns)
+    store = BarStore.from_frame(data, tickers)
+    per_1000 = 1000 / symbols
+
+    print(f"Price updates for {symbols} symbols x {days} days")
+    print("=" * 60)
+
+    frame_time = _best_time(lambda: dataframe_path(data), repeat)
+    frame_bytes = _peak_bytes(lambda: dataframe_path(data))
+    store_time = _best_time(lambda: bar_store_path(store, tickers), repeat)
+    store_bytes = _peak_bytes(lambda: bar_store_path(store, tickers))
+
+    print(f"{'dataframes':>12}: {frame_time * 1000 * per_1000:8.1f} ms/1000 symbols   "
+          f"peak {frame_bytes * per_1000 / 1e6:7.1f} MB/1000 symbols")
+    print(f"{'bar store':>12}: {store_time * 1000 * per_1000:8.1f} ms/1000 symbols   "
+          f"peak {store_bytes * per_1000 / 1e6:7.1f} MB/1000 symbols "
+          f"(+ {store.nbytes * per_1000 / 1e6:.1f} MB resident store)")
+
+    # Memory-mapped reopen, as a fresh process would do
+    directory = tempfile.mkdtemp(prefix="bench_bar_store_")
+    store.save(directory)
+    open_time = _best_time(lambda: BarStore.open(directory), repeat)
+    mapped = BarStore.open(directory)
+    mapped_time = _best_time(lambda: bar_store_path(mapped, tickers), repeat)
+    print(f"{'mmap':>12}: open {open_time * 1000:.1f} ms, "
+          f"{mapped_time * 1000 * per_1000:.1f} ms/1000 symbols")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.symbols, args.days, args.repeat)
@@ -0,0 +1,80 @@
+# ============================================================================
+# benchmarks/bench_compute_pool.py
+# ============================================================================
+"""
+Benchmark: bar-history indicators in-thread vs in the process pool.
+
+Measures wall time and the worst event-loop stall observed while the
+computation runs, which is what other sessions on the same runner feel.
+
+Usage:
+    python -m benchmarks.bench_compute_pool --symbols 2000 --days 252
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from utils.compute_pool import compute_indicators, compute_indicators_async, shutdown_pool
+
+
+def make_closes(days: int, symbols: int, seed: int = 7) -> np.ndarray:
+    """Synthetic random-walk closes of shape (days, symbols)."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.02, size=(days, symbols))
+    return 100 * np.cumprod(1 + returns, axis=0)
+
+
+async def _measure_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the largest delay between scheduled and actual wake-ups."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _run(mode: str, closes: np.ndarray) -> tuple[float, float]:
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_lag(stop))
+    await asyncio.sleep(0.02)
+
+    start = time.perf_counter()
+    if mode == "thread":
+        # What a synchronous tool does today: compute on the event loop thread
+        compute_indicators(closes)
+    else:
+        await compute_indicators_async(closes)
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.02)
+    stop.set()
+    return elapsed, await lag_task
+
+
+async def main(symbols: int, days: int, repeat: int) -> None:
+    closes = make_closes(days, symbols)
+    print(f"Indicators for {symbols} symbols x {days} days ({closes.nbytes / 1e6:.1f} MB)")
+    print("=" * 60)
+
+    # Start the workers before timing
+    await compute_indicators_async(make_closes(days, 256))
+
+    for mode in ("thread", "pool"):
+        timings = [await _run(mode, closes) for _ in range(repeat)]
+        best_time = min(t for t, _ in timings)
+        worst_lag = max(lag for _, lag in timings)
+        print(f"{mode:>6}: best {best_time * 1000:8.1f} ms   max loop stall {worst_lag * 1000:8.1f} ms")
+
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.symbols, args.days, args.repeat))
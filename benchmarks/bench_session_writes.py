@@ -0,0 +1,115 @@
+# ============================================================================
+# benchmarks/bench_session_writes.py
+# ============================================================================
+"""
+Benchmark: session event writes per second under concurrent writers.
+
+Each writer owns a session and replays turns shaped like a portfolio turn
+(user message, tool responses carrying state deltas, final answer). Compares
+the default DatabaseSessionService with the tuned and write-behind session
+storage (write-behind timing includes the final flush at close). Append
+latency is measured around each append_event call only, excluding session
+creation.
+
+Usage:
+    python -m benchmarks.bench_session_writes --writers 50 --turns 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+
+from utils.session_storage import create_session_service
+
+APP_NAME = "bench_session_writes"
+TOOL_EVENTS_PER_TURN = 3
+
+
+def make_turn(invocation_id: str, turn: int) -> list[Event]:
+    """Events of one turn: user message, tool responses, final answer."""
+    events = [Event(
+        invocation_id=invocation_id,
+        author="user",
+        content=types.Content(role="user", parts=[types.Part(text=f"Add T{turn} to my portfolio")]),
+    )]
+    for i in range(TOOL_EVENTS_PER_TURN):
+        portfolio = [f"T{t}" for t in range(turn * TOOL_EVENTS_PER_TURN + i + 1)]
+        events.append(Event(
+            invocation_id=invocation_id,
+            author=APP_NAME,
+            content=types.Content(role="user", parts=[types.Part(
+                function_response=types.FunctionResponse(
+                    name="add_ticker_tool", response={"success": True, "portfolio": portfolio}
+                )
+            )]),
+            actions=EventActions(state_delta={"portfolio": portfolio}),
+        ))
+    events.append(Event(
+        invocation_id=invocation_id,
+        author=APP_NAME,
+        content=types.Content(role="model", parts=[types.Part(text="Done.")]),
+    ))
+    return events
+
+
+async def writer(service, index: int, turns: int) -> list[float]:
+    """Write all turns of one session; returns the latency of each append in seconds."""
+    session = await service.create_session(app_name=APP_NAME, user_id=f"user_{index}")
+    latencies = []
+    for turn in range(turns):
+        for event in make_turn(f"inv_{index}_{turn}", turn):
+            started = time.perf_counter()
+            await service.append_event(session, event)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run(label: str, service, writers: int, turns: int) -> None:
+    # Create tables before timing
+    await service.create_session(app_name=APP_NAME, user_id="warmup")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(writer(service, i, turns) for i in range(writers)), return_exceptions=True
+    )
+    await service.close()
+    elapsed_with_close = time.perf_counter() - start
+
+    latencies = sorted(t for r in results if isinstance(r, list) for t in r)
+    written = len(latencies)
+    errors = [r for r in results if isinstance(r, Exception)]
+    mean_ms = statistics.fmean(latencies) * 1000 if latencies else 0.0
+    p95_ms = latencies[int(0.95 * (written - 1))] * 1000 if latencies else 0.0
+    print(f"{label:>12}: {written / elapsed_with_close:8.1f} events/s   "
+          f"({written} events, append {mean_ms:.3f} ms mean / {p95_ms:.3f} ms p95, "
+          f"{len(errors)} failed writers)")
+    if errors:
+        print(f"          first error: {errors[0]}")
+
+
+async def main(writers: int, turns: int) -> None:
+    print(f"{writers} concurrent writers x {turns} turns x {TOOL_EVENTS_PER_TURN + 2} events")
+    print("=" * 60)
+
+    default_path = os.path.join(tempfile.mkdtemp(prefix="bench_sessions_"), "sessions.db")
+    await run("default", DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{default_path}"), writers, turns)
+
+    tuned_path = os.path.join(tempfile.mkdtemp(prefix="bench_sessions_"), "sessions.db")
+    await run("tuned", create_session_service(tuned_path), writers, turns)
+
+    write_behind_path = os.path.join(tempfile.mkdtemp(prefix="bench_sessions_"), "sessions.db")
+    await run("write-behind", create_session_service(write_behind_path, write_behind=True), writers, turns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.turns))
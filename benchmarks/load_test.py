@@ -0,0 +1,359 @@
+# ============================================================================
+# benchmarks/load_test.py
+# ============================================================================
+"""
+Load test: concurrent users running the main.py queries against one Runner.
+
+Uses a stub model and stub market data, so it measures the instance itself
+(runner, tools, sub-agents, session storage) rather than Gemini or Yahoo
+Finance. Users arrive as a Poisson process at the configured rate and each
+runs the EXAMPLE_QUERIES from main.py in its own session. Report queries
+take the quick path or the full sub-agent path in the configured ratio.
+All data/ stores (sessions, report archive, caches) live in a temporary
+directory, never the working tree's data/.
+
+Reports throughput, query latency percentiles, event-loop lag and
+session-DB contention (append latency and "database is locked" errors).
+
+Usage:
+    python -m benchmarks.load_test --users 200 --rate 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+
+from main import EXAMPLE_QUERIES
+from market_report_agent import market_report_agent
+from market_report_agent.memo import MemoAgentTool
+from market_report_agent.sub_agents import market_news_agent, price_update_agent, sector_performance_agent
+from market_report_agent.tools import report_tools
+from utils.constants import GICS_SECTORS
+from utils.session_storage import create_session_service
+
+TICKER_PATTERN = re.compile(r"\b[A-Z]{1,5}\b")
+
+SUB_AGENTS = (price_update_agent, sector_performance_agent, market_news_agent)
+
+# Sub-agent tools called by the stub model, with the arguments they take
+SUB_AGENT_CALLS = {
+    "get_price_updates": lambda tickers: {"tickers": tickers},
+    "get_sector_performance": lambda tickers: {},
+    "search_portfolio_news": lambda tickers: {"tickers": tickers},
+    "search_general_market_news": lambda tickers: {},
+}
+
+
+def _tickers(text: str) -> list[str]:
+    return [t for t in TICKER_PATTERN.findall(text) if t not in {"I", "A"}]
+
+
+def _tool_names(agent) -> set[str]:
+    return {getattr(tool, "name", None) or tool.__name__ for tool in agent.tools}
+
+
+class StubLlm(BaseLlm):
+    """
+    Deterministic model that maps each query to the matching tool call.
+
+    As the root agent it routes a report request to the sub-agents with
+    probability full_report_ratio and to the quick report otherwise; as a
+    sub-agent it calls its data tools for the tickers in the request.
+    """
+
+    model: str = "stub"
+    latency_s: float = 0.0
+    full_report_ratio: float = 0.0
+
+    def _tool_calls(self, text: str, llm_request: LlmRequest) -> list[types.Part]:
+        lowered = text.lower()
+        tickers = _tickers(text)
+        if "generate_report_tool" not in llm_request.tools_dict:
+            calls = [
+                (name, args(tickers)) for name, args in SUB_AGENT_CALLS.items()
+                if name in llm_request.tools_dict
+            ]
+        elif "report" in lowered and random.random() < self.full_report_ratio:
+            # Holdings come from the user's earlier messages in the session
+            portfolio = list(dict.fromkeys(
+                t for content in llm_request.contents if content.role == "user"
+                for part in content.parts if part.text for t in _tickers(part.text)
+            ))
+            request = {"request": f"Portfolio: {' '.join(portfolio)}"}
+            calls = [(sub_agent.name, request) for sub_agent in SUB_AGENTS]
+        elif "report" in lowered:
+            calls = [("generate_report_tool", {"quick": True})]
+        elif "add" in lowered:
+            calls = [("add_ticker_tool", {"ticker": t}) for t in tickers]
+        elif "delete" in lowered or "remove" in lowered:
+            calls = [("delete_ticker_tool", {"ticker": t}) for t in tickers]
+        else:
+            calls = [("list_tickers_tool", {})]
+        return [
+            types.Part(function_call=types.FunctionCall(name=name, args=args))
+            for name, args in calls
+        ]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        last = llm_request.contents[-1]
+        if any(part.function_response for part in last.parts):
+            parts = [types.Part(text="Done.")]
+        else:
+            parts = self._tool_calls(" ".join(p.text or "" for p in last.parts), llm_request)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=0, candidates_token_count=0, total_token_count=0
+            ),
+        )
+
+
+def install_stub_market_data(latency_s: float) -> dict:
+    """
+    Replace the data fetches used by quick reports with synthetic data.
+
+    Returns:
+        The stub fetches by tool name, for the sub-agents' tool lists
+    """
+
+    def get_price_updates(tickers: list[str]) -> dict:
+        """Stub price updates."""
+        time.sleep(latency_s)
+        return {
+            t: {
+                "symbol": t,
+                "current_price": round(random.uniform(50, 500), 2),
+                "day_change_pct": round(random.gauss(0, 2), 2),
+                "week_change_pct": round(random.gauss(0, 4), 2),
+                "high_52w": 600.0,
+                "low_52w": 40.0,
+            }
+            for t in tickers
+        }
+
+    def get_sector_performance() -> dict:
+        """Stub sector performance."""
+        time.sleep(latency_s)
+        data = {
+            name: {"etf": etf, "day_change_pct": round(random.gauss(0, 1), 2)}
+            for name, etf in GICS_SECTORS.items()
+        }
+        ordered = sorted(data.items(), key=lambda x: x[1]["day_change_pct"], reverse=True)
+        return {
+            "all_sectors": data,
+            "leaders": dict(ordered[:2]),
+            "laggards": dict(ordered[-2:]),
+            "trading_date": time.strftime("%Y-%m-%d"),
+        }
+
+    def search_portfolio_news(tickers: list[str]) -> dict:
+        """Stub portfolio news."""
+        return {t: {"articles": []} for t in tickers}
+
+    def search_general_market_news() -> dict:
+        """Stub market news."""
+        return {"general_news": []}
+
+    fetches = {f.__name__: f for f in (
+        get_price_updates, get_sector_performance, search_portfolio_news, search_general_market_news
+    )}
+    for name, fetch in fetches.items():
+        setattr(report_tools, name, fetch)
+    return fetches
+
+
+@contextmanager
+def isolate_data_dir() -> Iterator[str]:
+    """
+    Run from a fresh temporary directory so every data/ store (sessions,
+    report archive, classification and bar caches) starts empty and the
+    working tree's data/ is never written. The previous working directory
+    is restored and the temporary one removed on exit.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="load_test_") as root:
+        os.chdir(root)
+        try:
+            yield root
+        finally:
+            os.chdir(cwd)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LoadStats:
+    """Collects latencies and errors during a load test run."""
+
+    def __init__(self):
+        self.query_latencies: list[float] = []
+        self.append_latencies: list[float] = []
+        self.get_latencies: list[float] = []
+        self.loop_lags: list[float] = []
+        self.locked_errors = 0
+        self.errors: list[str] = []
+
+
+def instrument_session_service(service: DatabaseSessionService, stats: LoadStats) -> None:
+    """Time session reads and event appends, counting SQLite lock errors."""
+
+    def timed(method, latencies: list[float]):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                if "database is locked" in str(e):
+                    stats.locked_errors += 1
+                raise
+            finally:
+                latencies.append(time.perf_counter() - start)
+        return wrapper
+
+    # Lock errors are counted here only, where they are raised
+    service.append_event = timed(service.append_event, stats.append_latencies)
+    service.get_session = timed(service.get_session, stats.get_latencies)
+
+
+async def monitor_loop_lag(stats: LoadStats, stop: asyncio.Event, interval: float = 0.01) -> None:
+    """Sample how late the event loop wakes up from a fixed sleep."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stats.loop_lags.append(time.perf_counter() - start - interval)
+
+
+async def simulate_user(runner: Runner, service, user_index: int, stats: LoadStats, think_time: float) -> None:
+    """Create a session and run the main.py queries in order."""
+    user_id = f"load_user_{user_index:05d}"
+    session = await service.create_session(app_name=runner.app_name, user_id=user_id)
+
+    for query in EXAMPLE_QUERIES:
+        content = types.Content(role="user", parts=[types.Part(text=query)])
+        start = time.perf_counter()
+        try:
+            async for _ in runner.run_async(
+                user_id=user_id, session_id=session.id, new_message=content
+            ):
+                pass
+        except Exception as e:
+            stats.errors.append(f"{type(e).__name__}: {e}")
+            return
+        stats.query_latencies.append(time.perf_counter() - start)
+        if think_time:
+            await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+async def run_load_test(args: argparse.Namespace) -> LoadStats:
+    fetches = install_stub_market_data(args.data_latency_ms / 1000)
+    model = StubLlm(latency_s=args.model_latency_ms / 1000, full_report_ratio=args.full_report_ratio)
+    # Sub-agents run on the stub model and stub fetches too
+    agent_tools = {}
+    for sub_agent in SUB_AGENTS:
+        stub_agent = sub_agent.clone(update={
+            "model": model,
+            "tools": [fetches[name] for name in SUB_AGENT_CALLS if name in _tool_names(sub_agent)],
+        })
+        agent_tools[sub_agent.name] = MemoAgentTool(agent=stub_agent)
+    agent = market_report_agent.clone(update={
+        "model": model,
+        "tools": [agent_tools.get(getattr(tool, "name", None), tool) for tool in market_report_agent.tools],
+    })
+
+    with isolate_data_dir() as root:
+        db_path = os.path.join(root, "sessions.db")
+        if args.session_storage == "tuned":
+            service = create_session_service(db_path)
+        elif args.session_storage == "write-behind":
+            service = create_session_service(db_path, write_behind=True)
+        else:
+            service = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{db_path}")
+        stats = LoadStats()
+        instrument_session_service(service, stats)
+        runner = Runner(agent=agent, app_name=agent.name, session_service=service)
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(monitor_loop_lag(stats, stop))
+
+        users = []
+        for i in range(args.users):
+            users.append(asyncio.create_task(simulate_user(runner, service, i, stats, args.think_time)))
+            await asyncio.sleep(random.expovariate(args.rate))
+        await asyncio.gather(*users)
+
+        stop.set()
+        await lag_task
+        await service.close()
+    return stats
+
+
+def print_report(args: argparse.Namespace, stats: LoadStats, elapsed: float) -> None:
+    ms = lambda seconds: f"{seconds * 1000:8.1f} ms"
+
+    print("=" * 60)
+    print(f"Users: {args.users}   arrival rate: {args.rate}/s   elapsed: {elapsed:.1f}s   sessions: {args.session_storage}")
+    print(f"Full (sub-agent) reports: {args.full_report_ratio:.0%} of report queries")
+    print(f"Queries completed: {len(stats.query_latencies)}   errors: {len(stats.errors)}")
+    print(f"Throughput: {len(stats.query_latencies) / elapsed:.1f} queries/s")
+    print("-" * 60)
+    print("Query latency")
+    for pct in (50, 90, 99):
+        print(f"  p{pct:<3} {ms(percentile(stats.query_latencies, pct))}")
+    print(f"  max  {ms(max(stats.query_latencies, default=0))}")
+    print("Event-loop lag")
+    print(f"  p99  {ms(percentile(stats.loop_lags, 99))}")
+    print(f"  max  {ms(max(stats.loop_lags, default=0))}")
+    print("Session DB")
+    print(f"  append_event p50 {ms(percentile(stats.append_latencies, 50))}   p99 {ms(percentile(stats.append_latencies, 99))}")
+    print(f"  get_session  p50 {ms(percentile(stats.get_latencies, 50))}   p99 {ms(percentile(stats.get_latencies, 99))}")
+    print(f"  'database is locked' errors: {stats.locked_errors}")
+    for error in stats.errors[:5]:
+        print(f"  ❌ {error}")
+    print("=" * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100, help="Number of simulated users")
+    parser.add_argument("--rate", type=float, default=10.0, help="User arrivals per second")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between a user's queries")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Simulated latency per model call")
+    parser.add_argument("--full-report-ratio", type=float, default=0.5,
+                        help="Share of report queries run through the sub-agents instead of the quick report")
+    parser.add_argument("--data-latency-ms", type=float, default=0.0, help="Simulated latency per market data fetch")
+    parser.add_argument("--session-storage", choices=["default", "tuned", "write-behind"], default="default",
+                        help="Plain DatabaseSessionService or a utils.session_storage variant")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    start = time.perf_counter()
+    stats = asyncio.run(run_load_test(args))
+    print_report(args, stats, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,15 @@ Deployment script for MarketReportAgent to Vertex AI Agent Engine
 
 import os
 import sys
+import asyncio
+import argparse
 import yaml
 import subprocess
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# Allow importing the agent package when run as `python deploy/deploy.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 def load_config(config_path: str = "deploy/agent_engine_config.yaml") -> Dict[str, Any]:
     """Load deployment configuration from YAML file."""
@@ -91,6 +96,9 @@ yfinance
 python-dotenv
 aiosqlite
 pyyaml
+numpy
+pandas
+sqlalchemy
 """
     
     with open("deploy/requirements.txt", 'w') as f:
@@ -98,6 +106,24 @@ pyyaml
     
     print("✅ Created deploy/requirements.txt")
 
+def build_warm_start_bundle(universe_path: Optional[str] = None) -> bool:
+    """Build the warm-start bundle loaded by new instances at boot."""
+    from market_report_agent.warm_start import WARM_START_DIR, build_bundle, collect_universe
+    
+    print("\n📦 Building warm-start bundle...")
+    try:
+        symbols = asyncio.run(collect_universe(universe_path))
+        manifest = build_bundle(symbols)
+    except Exception as e:
+        print(f"❌ Failed to build warm-start bundle: {e}")
+        return False
+    
+    print(f"✅ Bundle written to {WARM_START_DIR}")
+    print(f"   Symbols: {len(manifest['symbols'])}")
+    print(f"   Trading date: {manifest['trading_date']}")
+    print(f"   Bar store: {manifest['bar_store_mb']} MB")
+    return True
+
 def deploy_agent(config: Dict[str, Any]) -> bool:
     """Deploy the agent to Vertex AI Agent Engine."""
     project_id = config['project_id']
@@ -141,6 +167,11 @@ def deploy_agent(config: Dict[str, Any]) -> bool:
 
 def main():
     """Main deployment workflow."""
+    parser = argparse.ArgumentParser(description="Deploy MarketReportAgent")
+    parser.add_argument("--universe", help="File with extra tickers (one per line) for the warm-start bundle")
+    parser.add_argument("--skip-bundle", action="store_true", help="Deploy without building a warm-start bundle")
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("MarketReportAgent - Vertex AI Agent Engine Deployment")
     print("=" * 70)
@@ -166,6 +197,10 @@ def main():
     # Create deployment requirements
     create_requirements_for_deployment()
     
+    # Build the warm-start bundle shipped with the source
+    if not args.skip_bundle and not build_warm_start_bundle(args.universe):
+        print("⚠️  Warning: Instances will start without a warm-start bundle")
+    
     # Deploy agent
     print("\n" + "=" * 70)
     deploy_success = deploy_agent(config)
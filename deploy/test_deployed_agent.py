@@ -11,6 +11,7 @@ from google.adk.runners import Runner
 from google.adk.sessions import DatabaseSessionService
 from google.genai import types
 from market_report_agent import market_report_agent
+from main import final_response_text
 
 async def test_deployed_agent():
     """Test the deployed agent with sample queries."""
@@ -69,8 +70,9 @@ async def test_deployed_agent():
             # Get final response
             final_response = None
             for event in events:
-                if event.is_final_response():
-                    final_response = event.content.parts[0].text
+                # A callback that only sets state ends with a final event without content
+                if event.is_final_response() and event.content and event.content.parts:
+                    final_response = final_response_text(event)
                     break
             
             if final_response:
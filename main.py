@@ -4,28 +4,46 @@
 import os
 import asyncio
 from dotenv import load_dotenv
-from google.adk.sessions import DatabaseSessionService
 from google.adk.runners import Runner
 from google.genai import types
 from market_report_agent import market_report_agent
+from market_report_agent.compaction import compaction_metrics
+from market_report_agent.memo import tool_memo
+from market_report_agent.warm_start import warm_up
+from utils.session_storage import create_session_service
 
 # Load environment variables
 load_dotenv()
 
+# Example interactions
+EXAMPLE_QUERIES = [
+    "Add AAPL to my portfolio",
+    "Add MSFT and GOOGL to my portfolio",
+    "List my current portfolio",
+    "Generate a market report for my portfolio",
+]
+
+def final_response_text(event) -> str:
+    """Text of a final response; a report a tool returned directly is shown as rendered."""
+    texts = [part.text for part in event.content.parts if part.text]
+    if texts:
+        return "".join(texts)
+    for part in event.content.parts:
+        if part.function_response:
+            result = part.function_response.response or {}
+            return result.get("report") or result.get("message") or str(result)
+    return ""
+
 async def main():
     """Main entry point for MarketReportAgent runner."""
 
     # Load environment variables
     load_dotenv()
     
-    # Database URL for SQLite with async driver (aiosqlite)
-    db_url = "sqlite+aiosqlite:///./data/sessions.db"
-
-    # Initialize session service with SQLite database
-    session_service = DatabaseSessionService(
-        db_url=db_url,
-        # The session service will create the database if it doesn't exist
-    )
+    # Initialize session service with SQLite database (WAL, pooled connections)
+    # Hot sessions stay in memory and are written behind to SQLite
+    # The session service will create the database if it doesn't exist
+    session_service = create_session_service(write_behind=True)
 
     user_id="user_001"
     session_id = "user_portfolio_session_001"
@@ -46,6 +64,10 @@ async def main():
     
     print("🚀 MarketReportAgent Starting...")
     print("=" * 60)
+
+    # Load the warm-start bundle and create model clients before the first query;
+    # queries run on this same loop, where the clients are cached
+    print(f"🔥 Warmed up: {await warm_up()}")
     
     # Example: Start a new session ????
     session = await session_service.create_session(
@@ -57,15 +79,7 @@ async def main():
     print(f"📊 Session ID: {session_id}")
     print("=" * 60)
     
-    # Example interactions
-    queries = [
-        "Add AAPL to my portfolio",
-        "Add MSFT and GOOGL to my portfolio",
-        "List my current portfolio",
-        "Generate a market report for my portfolio",
-    ]
-    
-    for query in queries:
+    for query in EXAMPLE_QUERIES:
         print(f"\n💬 User: {query}")
         print("-" * 60)
 
@@ -77,8 +91,8 @@ async def main():
         
         try:
 
-            # Run the agent with the query using Runner
-            events = runner.run(
+            # Run the agent on this loop, where warm_up() created the model clients
+            events = runner.run_async(
                 user_id=user_id,
                 session_id=session_id,
                 new_message=content_object
@@ -86,9 +100,10 @@ async def main():
 
             Response = None
             # Process events to get the final response
-            for event in events:
-                if event.is_final_response():
-                    response = event.content.parts[0].text
+            async for event in events:
+                # Callback state changes arrive as events without content
+                if event.is_final_response() and event.content:
+                    response = final_response_text(event)
                     print(f"🤖 Agent: {response}")
                     break
             print("-" * 60)
@@ -100,6 +115,11 @@ async def main():
             print(f"❌ Error: {str(e)}")
             print("-" * 60)
     
+    # Persist any buffered session events before exiting
+    await session_service.close()
+
+    print(f"\n📏 Context size: {compaction_metrics.summary()}")
+    print(f"♻️  Tool memo: {tool_memo.summary()}")
     print("\n✅ MarketReportAgent Session Complete")
 
 if __name__ == "__main__":
@@ -117,8 +137,7 @@ async def interactive_runner():
     
     # Setup
     load_dotenv()
-    db_url = "sqlite+aiosqlite:///./data/sessions.db"
-    session_service = DatabaseSessionService(db_url=db_url)
+    session_service = create_session_service(write_behind=True)
     
     APP_NAME = market_report_agent.name
     
@@ -141,11 +160,13 @@ async def interactive_runner():
     
     print("🚀 MarketReportAgent Interactive Mode")
     print("=" * 60)
+    print(f"🔥 Warmed up: {await warm_up()}")
     print("Commands:")
     print("  - Add tickers: 'Add AAPL to my portfolio'")
     print("  - Remove tickers: 'Delete MSFT from my portfolio'")
     print("  - List portfolio: 'List my tickers'")
     print("  - Generate report: 'Generate a market report'")
+    print("  - Context size and tool memo hits: 'stats'")
     print("  - Exit: 'quit' or 'exit'")
     print("=" * 60)
 
@@ -160,6 +181,13 @@ async def interactive_runner():
             if not user_input:
                 continue
 
+            if user_input.lower() == 'stats':
+                for record in compaction_metrics.records[-10:]:
+                    print(f"   {record['invocation_id']}: {record['tokens_before']} -> {record['tokens_after']} tokens")
+                print(f"📏 {compaction_metrics.summary()}")
+                print(f"♻️  {tool_memo.summary()}")
+                continue
+
             # Create a types.Content object, specifying the role and including the part
             content_object = types.Content(
                 role='user',  # Or 'model' if it's an AI response
@@ -167,7 +195,7 @@ async def interactive_runner():
             )
 
             # Run the agent
-            events = runner.run(
+            events = runner.run_async(
                 user_id=user_id,
                 session_id=session_id,
                 new_message=content_object
@@ -175,9 +203,10 @@ async def interactive_runner():
             
             Response = None
             # Process events to get the final response
-            for event in events:
-                if event.is_final_response():
-                    response = event.content.parts[0].text
+            async for event in events:
+                # Callback state changes arrive as events without content
+                if event.is_final_response() and event.content:
+                    response = final_response_text(event)
                     print(f"\n🤖 Agent: {response}")
                     break
             
@@ -189,5 +218,9 @@ async def interactive_runner():
         except Exception as e:
             print(f"\n❌ Error: {str(e)}")
 
+    await session_service.close()
+    print(f"📏 Context size: {compaction_metrics.summary()}")
+    print(f"♻️  Tool memo: {tool_memo.summary()}")
+
 # To run interactive mode:
 # asyncio.run(interactive_runner())
\ No newline at end of file
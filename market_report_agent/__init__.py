@@ -3,6 +3,15 @@
 # ============================================================================
 """MarketReportAgent - Portfolio management and market analysis agent"""
 
+import os
+from multiprocessing import parent_process
+
 from .agent import market_report_agent
 
+# Serving platforms import the agent at boot; warm up in the background so
+# the instance is ready before traffic arrives (not in compute workers)
+if os.getenv("WARM_START_ON_IMPORT", "").lower() in ("1", "true") and parent_process() is None:
+    from .warm_start import start_warm_up
+    start_warm_up()
+
 __all__ = ['market_report_agent']
\ No newline at end of file
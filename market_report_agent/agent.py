@@ -4,43 +4,96 @@
 """Root MarketReportAgent that manages portfolio and generates reports"""
 
 from google.adk.agents import Agent
-from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools import ToolContext
-from .tools.portfolio_tools import add_ticker, delete_ticker, list_tickers
+from utils.deadline import deadline_scope
+from .compaction import compact_history
+from .deadlines import enforce_turn_deadline, start_turn_deadline, turn_deadline
+from .memo import MemoAgentTool, bump_portfolio_version, tool_memo
+from .tools.portfolio_tools import add_ticker, delete_ticker, list_tickers, set_alert_threshold
 from .tools.report_tools import generate_report
+from .tools.sector_tools import get_portfolio_sector_exposure
+from .warm_start import wait_for_warm_up
 from .sub_agents import (
     price_update_agent,
     sector_performance_agent,
     market_news_agent
 )
 
-# Wrap sub-agents as AgentTools
-price_agent_tool = AgentTool(agent=price_update_agent)
-sector_agent_tool = AgentTool(agent=sector_performance_agent)
-news_agent_tool = AgentTool(agent=market_news_agent)
+# Wrap sub-agents as AgentTools, cancelled when the turn's deadline passes
+# and answered from the session's memo when a request repeats
+price_agent_tool = MemoAgentTool(agent=price_update_agent)
+sector_agent_tool = MemoAgentTool(agent=sector_performance_agent)
+news_agent_tool = MemoAgentTool(agent=market_news_agent)
 
 # Portfolio management functions with session state access via ToolContext
 def add_ticker_tool(ticker: str, tool_context: ToolContext) -> dict:
     """Add a ticker to the portfolio."""
     session_state = tool_context.state
     result = add_ticker(session_state, ticker)
+    if result["success"]:
+        bump_portfolio_version(session_state)
     return result
 
 def delete_ticker_tool(ticker: str, tool_context: ToolContext) -> dict:
     """Remove a ticker from the portfolio."""
     session_state = tool_context.state
     result = delete_ticker(session_state, ticker)
+    if result["success"]:
+        bump_portfolio_version(session_state)
     return result
 
 def list_tickers_tool(tool_context: ToolContext) -> dict:
     """List all tickers in the portfolio."""
     session_state = tool_context.state
-    return list_tickers(session_state)
+    cached = tool_memo.get(tool_context, "list_tickers", {})
+    if cached is not None:
+        return cached
+    return tool_memo.put(tool_context, "list_tickers", {}, list_tickers(session_state))
 
-async def generate_report_tool(tool_context: ToolContext) -> dict:
-    """Generate a comprehensive market report."""
+def set_alert_threshold_tool(threshold_pct: float, tool_context: ToolContext, ticker: str = "") -> dict:
+    """Set the daily % move that triggers a price alert, for one ticker or the whole portfolio."""
     session_state = tool_context.state
-    return await generate_report(session_state)
+    return set_alert_threshold(session_state, threshold_pct, ticker)
+
+async def generate_report_tool(
+    tool_context: ToolContext,
+    quick: bool = False,
+    include_summary: bool = False,
+    changes_only: bool = False
+) -> dict:
+    """Generate a comprehensive market report.
+
+    Set quick=True for a routine report rendered directly from market data,
+    and include_summary=True to add an executive summary paragraph to it.
+    Set changes_only=True to get only what changed since the last report.
+    """
+    session_state = tool_context.state
+    args = {"quick": quick, "include_summary": include_summary, "changes_only": changes_only}
+    # Quick and changes reports write the report archive and changes reports
+    # diff against it, so a replayed result would skip the write or reuse a
+    # stale baseline
+    memoize = not (quick or changes_only)
+    cached = tool_memo.get(tool_context, "generate_report", args) if memoize else None
+    if cached is not None:
+        return cached
+    with deadline_scope(turn_deadline(tool_context)):
+        result = await generate_report(
+            session_state, quick, include_summary, changes_only, tool_context.user_id
+        )
+    if result.get("mode") == "quick":
+        # The rendered report is the answer; don't have the model copy it out
+        tool_context.actions.skip_summarization = True
+    return tool_memo.put(tool_context, "generate_report", args, result) if memoize else result
+
+async def portfolio_sector_exposure_tool(tool_context: ToolContext) -> dict:
+    """Get portfolio sector weights and performance relative to each holding's sector ETF."""
+    session_state = tool_context.state
+    cached = tool_memo.get(tool_context, "portfolio_sector_exposure", {})
+    if cached is not None:
+        return cached
+    with deadline_scope(turn_deadline(tool_context)):
+        result = await get_portfolio_sector_exposure(session_state)
+    return tool_memo.put(tool_context, "portfolio_sector_exposure", {}, result)
 
 # Create the root agent with all tools
 market_report_agent = Agent(
@@ -53,8 +106,16 @@ market_report_agent = Agent(
         add_ticker_tool,
         delete_ticker_tool,
         list_tickers_tool,
-        generate_report_tool
+        set_alert_threshold_tool,
+        generate_report_tool,
+        portfolio_sector_exposure_tool
     ],
+    # Hold requests behind a background warm-up, then start the turn's
+    # latency budget shared by sub-agents and data fetches
+    before_agent_callback=[wait_for_warm_up, start_turn_deadline],
+    # Stop calling the model once the turn's budget is spent, then summarize
+    # old tool results once the context grows past a threshold
+    before_model_callback=[enforce_turn_deadline, compact_history],
     instruction="""You are the MarketReportAgent, a sophisticated portfolio management and market analysis assistant.
 
 Your capabilities:
@@ -62,6 +123,8 @@ Your capabilities:
    - Add tickers to the user's portfolio
    - Remove tickers from the portfolio
    - List current portfolio holdings
+   - Set price alert thresholds (daily % move) for the portfolio or a single ticker
+   - Show portfolio sector exposure and how each holding performs against its sector ETF
 
 2. Market Report Generation:
    - Generate comprehensive market reports by coordinating with three specialized sub-agents:
@@ -79,12 +142,24 @@ Your communication style:
 When generating reports:
 1. First ensure the portfolio is not empty
 2. Coordinate with all three sub-agents
+   and use portfolio_sector_exposure_tool to relate holdings to sector trends
 3. Synthesize their outputs into a unified market report with:
    - Executive summary of key findings
    - Portfolio performance highlights
-   - Sector trends and market context
+   - Sector trends and market context, linked to the portfolio's sector exposure
    - Relevant news and its potential impact
 4. Provide clear, actionable insights
+5. If a sub-agent returns UNAVAILABLE, still deliver the report: add a short
+   "Partial report" note at the top and mark that section as missing rather than guessing its content
+
+For quick or routine reports (e.g. "quick report", "morning report"), call generate_report_tool
+with quick=True instead of the sub-agents. Its rendered report, including any partial notice,
+is shown to the user directly, so do not repeat or rewrite it.
+Only set include_summary=True if the user asks for an executive summary.
+
+When the user asks what changed since their last report (or for an update later the same day),
+call generate_report_tool with changes_only=True and summarize only the returned changes:
+new movers, sector rank changes, new leaders/laggards and new headlines.
 
 Always confirm successful operations and provide helpful feedback to users."""
 )
\ No newline at end of file
@@ -0,0 +1,169 @@
+# ============================================================================
+# market_report_agent/compaction.py
+# ============================================================================
+"""Context compaction that keeps the root agent's model input bounded"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Compaction starts once the estimated context exceeds this many tokens
+COMPACTION_TOKEN_THRESHOLD = 8000
+# The most recent contents are always sent verbatim
+KEEP_RECENT_CONTENTS = 6
+# Rough token estimate used for thresholds and metrics
+CHARS_PER_TOKEN = 4
+
+# Limits applied when summarizing an old tool result
+MAX_STRING_CHARS = 300
+MAX_LIST_ITEMS = 5
+MAX_DICT_KEYS = 12
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_call:
+        return len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+    if part.function_response:
+        return len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+    return 0
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """Estimate the token count of a list of model contents."""
+    chars = sum(_part_chars(p) for c in contents for p in (c.parts or []))
+    return chars // CHARS_PER_TOKEN
+
+
+def summarize_value(value: Any, depth: int = 0) -> Any:
+    """
+    Shrink a tool result while keeping its shape recognizable.
+
+    Scalars are kept, long strings are truncated, lists keep their first
+    items plus a count, and nested dicts below the top level are reduced to
+    their keys.
+    """
+    if isinstance(value, str):
+        if len(value) <= MAX_STRING_CHARS:
+            return value
+        return value[:MAX_STRING_CHARS] + f"... [{len(value) - MAX_STRING_CHARS} chars omitted]"
+
+    if isinstance(value, list):
+        if depth > 0 or len(value) > MAX_LIST_ITEMS:
+            return {"items": len(value), "first": [summarize_value(v, depth + 1) for v in value[:MAX_LIST_ITEMS]]}
+        return [summarize_value(v, depth + 1) for v in value]
+
+    if isinstance(value, dict):
+        if depth > 0:
+            return {"keys": list(value)[:MAX_DICT_KEYS], "size": len(value)}
+        return {k: summarize_value(v, depth + 1) for k, v in list(value.items())[:MAX_DICT_KEYS]}
+
+    return value
+
+
+def summarize_tool_response(response: dict) -> dict:
+    """
+    Build the compact replacement for an old tool result.
+
+    Args:
+        response: The original tool response
+
+    Returns:
+        Compact summary flagged with "compacted": True
+    """
+    summary = dict(response)
+    # Portfolio tools repeat the full holdings list in every response;
+    # the latest list is always in the most recent portfolio result
+    if isinstance(summary.get("portfolio"), list):
+        summary["portfolio"] = f"{len(summary['portfolio'])} ticker(s)"
+    summary = summarize_value(summary)
+    summary["compacted"] = True
+    return summary
+
+
+def compact_contents(contents: list[types.Content]) -> list[types.Content]:
+    """Replace tool results outside the recent window with summaries."""
+    cutoff = max(0, len(contents) - KEEP_RECENT_CONTENTS)
+    compacted = []
+    for index, content in enumerate(contents):
+        parts = content.parts or []
+        if index >= cutoff or not any(p.function_response for p in parts):
+            compacted.append(content)
+            continue
+
+        new_parts = []
+        for part in parts:
+            response = part.function_response
+            if response is None or (response.response or {}).get("compacted"):
+                new_parts.append(part)
+                continue
+            new_parts.append(types.Part(function_response=types.FunctionResponse(
+                id=response.id,
+                name=response.name,
+                response=summarize_tool_response(response.response or {}),
+            )))
+        compacted.append(types.Content(role=content.role, parts=new_parts))
+    return compacted
+
+
+class CompactionMetrics:
+    """Context size per model call, before and after compaction."""
+
+    def __init__(self, max_records: int = 1000):
+        self.max_records = max_records
+        self.records: list[dict] = []
+
+    def record(self, invocation_id: str, tokens_before: int, tokens_after: int) -> None:
+        self.records.append({
+            "invocation_id": invocation_id,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+        })
+        del self.records[:-self.max_records]
+
+    def summary(self) -> dict:
+        if not self.records:
+            return {"model_calls": 0}
+        before = sum(r["tokens_before"] for r in self.records)
+        after = sum(r["tokens_after"] for r in self.records)
+        return {
+            "model_calls": len(self.records),
+            "compacted_calls": sum(r["tokens_after"] < r["tokens_before"] for r in self.records),
+            "avg_tokens_before": before // len(self.records),
+            "avg_tokens_after": after // len(self.records),
+            "max_tokens_after": max(r["tokens_after"] for r in self.records),
+        }
+
+
+compaction_metrics = CompactionMetrics()
+
+
+def compact_history(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    before_model_callback that compacts old tool results.
+
+    Once the estimated context passes COMPACTION_TOKEN_THRESHOLD, tool
+    results older than the last KEEP_RECENT_CONTENTS contents are replaced
+    with compact summaries. Session events are not modified.
+    """
+    tokens_before = estimate_tokens(llm_request.contents)
+    tokens_after = tokens_before
+
+    if tokens_before > COMPACTION_TOKEN_THRESHOLD:
+        llm_request.contents = compact_contents(llm_request.contents)
+        tokens_after = estimate_tokens(llm_request.contents)
+
+    compaction_metrics.record(callback_context.invocation_id, tokens_before, tokens_after)
+    logger.debug("Context tokens before=%d after=%d", tokens_before, tokens_after)
+    return None
@@ -0,0 +1,88 @@
+# ============================================================================
+# market_report_agent/deadlines.py
+# ============================================================================
+"""Report deadline propagation from the root agent to its sub-agents"""
+
+import time
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import ToolContext
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from utils.deadline import MIN_FETCH_TIMEOUT_S, DeadlineExceeded, deadline_scope, new_deadline, within_deadline
+
+# Invocation-scoped state key holding the current turn's deadline
+DEADLINE_STATE_KEY = "temp:report_deadline"
+
+# Answer given instead of a model call once the turn's budget is spent
+OUT_OF_TIME_MESSAGE = (
+    "I ran out of time for this request before I could finish it. "
+    "Please try again, or ask for a quick report."
+)
+
+
+def start_turn_deadline(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    before_agent_callback that starts the latency budget for a turn.
+
+    The deadline is kept in temp state, so every tool call made in this
+    invocation shares it and it is never persisted.
+    """
+    callback_context.state[DEADLINE_STATE_KEY] = new_deadline()
+    return None
+
+
+def turn_deadline(tool_context: ToolContext) -> Optional[float]:
+    """Deadline of the invocation a tool call belongs to."""
+    return tool_context.state.get(DEADLINE_STATE_KEY)
+
+
+def enforce_turn_deadline(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    before_model_callback that bounds the root agent's own model calls.
+
+    Once the turn's budget is spent the model is not called again and the
+    turn ends with a short note; otherwise the call's HTTP timeout is capped
+    at the time remaining.
+    """
+    deadline = callback_context.state.get(DEADLINE_STATE_KEY)
+    if deadline is None:
+        return None
+
+    left = deadline - time.monotonic()
+    if left <= 0:
+        print(f"⚠️  {callback_context.agent_name} model call skipped: turn budget exhausted")
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=OUT_OF_TIME_MESSAGE)]))
+
+    config = llm_request.config
+    http_options = config.http_options or types.HttpOptions()
+    timeout_ms = int(max(MIN_FETCH_TIMEOUT_S, left) * 1000)
+    if http_options.timeout is None or http_options.timeout > timeout_ms:
+        config.http_options = http_options.model_copy(update={"timeout": timeout_ms})
+    return None
+
+
+class DeadlineAgentTool(AgentTool):
+    """
+    AgentTool that cancels the sub-agent when the turn's deadline passes.
+
+    A cancelled sub-agent returns a note telling the root agent to mark its
+    section as missing instead of failing the whole report.
+    """
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        with deadline_scope(turn_deadline(tool_context)):
+            try:
+                return await within_deadline(super().run_async(args=args, tool_context=tool_context))
+            except DeadlineExceeded as e:
+                print(f"⚠️  {self.agent.name} cancelled: {e}")
+                return (
+                    f"UNAVAILABLE: {self.agent.name} did not finish within the report's time budget. "
+                    "Mark this section as missing in the report."
+                )
@@ -0,0 +1,125 @@
+# ============================================================================
+# market_report_agent/memo.py
+# ============================================================================
+"""Per-session memoization of repeated tool calls"""
+
+import copy
+import json
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+from google.adk.tools import ToolContext
+
+from .deadlines import DeadlineAgentTool
+
+# Session state key counting portfolio writes; part of every memo key
+PORTFOLIO_VERSION_KEY = "portfolio_version"
+# Results older than this are recomputed, in step with the bar store refresh
+MEMO_TTL_S = 300
+# Entries kept across all sessions of this process
+MEMO_MAX_ENTRIES = 1000
+
+
+def bump_portfolio_version(session_state: dict) -> None:
+    """Record a portfolio write, invalidating the session's memoized results."""
+    session_state[PORTFOLIO_VERSION_KEY] = session_state.get(PORTFOLIO_VERSION_KEY, 0) + 1
+
+
+def _is_reusable(result: Any) -> bool:
+    """
+    Failed, partial and cancelled results are never replayed.
+
+    A dict counts as degraded when any of its keys is "error" or ends in
+    "_error" (e.g. the sector tool's performance_error), even on success.
+    """
+    if isinstance(result, str):
+        return not result.startswith("UNAVAILABLE:")
+    if isinstance(result, dict):
+        degraded = any(key == "error" or key.endswith("_error") for key in result)
+        return result.get("success", True) and not result.get("partial") and not degraded
+    return result is not None
+
+
+class ToolMemo:
+    """
+    Tool results keyed on session, tool name, arguments and portfolio version.
+
+    A repeated call within MEMO_TTL_S gets the earlier result instead of
+    another fetch or sub-agent run. Portfolio writes bump the version kept
+    in session state, so stale entries are simply never looked up again and
+    age out of the LRU.
+    """
+
+    def __init__(self, ttl_s: float = MEMO_TTL_S, max_entries: int = MEMO_MAX_ENTRIES):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def _key(self, tool_context: ToolContext, tool_name: str, args: dict) -> tuple:
+        session = tool_context.session
+        return (
+            session.app_name,
+            session.user_id,
+            session.id,
+            tool_name,
+            json.dumps(args, sort_keys=True, default=str),
+            tool_context.state.get(PORTFOLIO_VERSION_KEY, 0),
+        )
+
+    def get(self, tool_context: ToolContext, tool_name: str, args: dict) -> Optional[Any]:
+        """The memoized result of this call, or None on a miss."""
+        key = self._key(tool_context, tool_name, args)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_s:
+            self.misses[tool_name] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits[tool_name] += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, tool_context: ToolContext, tool_name: str, args: dict, result: Any) -> Any:
+        """Memoize a result if it can be reused, and return it."""
+        if _is_reusable(result):
+            key = self._key(tool_context, tool_name, args)
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def summary(self) -> dict:
+        calls = sum(self.hits.values()) + sum(self.misses.values())
+        if not calls:
+            return {"tool_calls": 0}
+        return {
+            "tool_calls": calls,
+            "hits": sum(self.hits.values()),
+            "hit_rate": round(sum(self.hits.values()) / calls, 3),
+            "by_tool": {
+                name: f"{self.hits[name]}/{self.hits[name] + self.misses[name]}"
+                for name in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+tool_memo = ToolMemo()
+
+
+class MemoAgentTool(DeadlineAgentTool):
+    """
+    DeadlineAgentTool that reuses the sub-agent's answer to a repeated request.
+
+    Only exact repeats within a session hit; answers cut short by the
+    deadline are not memoized.
+    """
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        cached = tool_memo.get(tool_context, self.name, args)
+        if cached is not None:
+            return cached
+        result = await super().run_async(args=args, tool_context=tool_context)
+        return tool_memo.put(tool_context, self.name, args, result)
@@ -0,0 +1,207 @@
+# ============================================================================
+# market_report_agent/monitor.py
+# ============================================================================
+"""
+Shared watchlist monitor that raises price alerts for every session.
+
+An inverted index maps each ticker to the sessions holding it, built from
+the `portfolio` and `alert_rules` session state. Each cycle polls the union
+of tickers once and evaluates every subscription's threshold in a single
+vectorized pass, so polling cost grows with distinct tickers, not users.
+
+The index is only as fresh as the session service it reads. In a serving
+process, run the monitor in-process on the serving loop with the runner's
+session service:
+
+    monitor = WatchlistMonitor(runner.session_service, app_name)
+    monitor.start()
+
+A write-behind service flushes before listing sessions, so every rebuild
+sees the thresholds and holdings users have just set. Run standalone, the
+monitor reads the session database and therefore only flushed state: with
+a write-behind serving process, a change reaches it after at most
+SESSION_FLUSH_INTERVAL_S plus INDEX_REFRESH_S.
+
+    python -m market_report_agent.monitor --interval 60
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from google.adk.sessions import BaseSessionService
+from utils.constants import ALERT_THRESHOLD_PCT
+from utils.market_data import download_closes
+from utils.session_storage import FLUSH_INTERVAL_S, create_session_service
+from .agent import market_report_agent
+
+# Seconds between price polls and between inverted index rebuilds
+POLL_INTERVAL_S = 60
+INDEX_REFRESH_S = 300
+
+
+class WatchlistMonitor:
+    """Polls subscribed tickers and queues alert notifications."""
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        app_name: str,
+        poll_interval_s: float = POLL_INTERVAL_S,
+        index_refresh_s: float = INDEX_REFRESH_S
+    ):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.poll_interval_s = poll_interval_s
+        self.index_refresh_s = index_refresh_s
+        self.notifications: asyncio.Queue = asyncio.Queue()
+
+        # Inverted index: ticker -> set of (user_id, session_id)
+        self.index: dict[str, set[tuple[str, str]]] = {}
+        # Flattened subscriptions, rebuilt with the index
+        self._symbols: list[str] = []
+        self._subscribers: list[tuple[str, str]] = []
+        self._sub_symbol_idx = np.empty(0, dtype=np.int64)
+        self._sub_thresholds = np.empty(0, dtype=np.float64)
+
+        # (user_id, session_id, ticker, direction) -> trading date last alerted
+        self._alerted: dict[tuple, str] = {}
+        self._index_built_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild_index(self) -> None:
+        """
+        Rebuild the ticker -> subscriber index from session state.
+
+        A write-behind service flushes its cached sessions before listing
+        them, so in-process the index sees the state users have just set.
+        """
+        response = await self.session_service.list_sessions(app_name=self.app_name)
+
+        index: dict[str, set[tuple[str, str]]] = {}
+        thresholds: dict[tuple, float] = {}
+        for session in response.sessions:
+            portfolio = session.state.get("portfolio", [])
+            rules = session.state.get("alert_rules", {})
+            default = rules.get("default", ALERT_THRESHOLD_PCT)
+            subscriber = (session.user_id, session.id)
+            for ticker in portfolio:
+                index.setdefault(ticker, set()).add(subscriber)
+                thresholds[(ticker, subscriber)] = rules.get(ticker, default)
+
+        symbols = sorted(index)
+        position = {ticker: i for i, ticker in enumerate(symbols)}
+        subscriptions = sorted(thresholds)
+
+        self.index = index
+        self._symbols = symbols
+        self._subscribers = [subscriber for _, subscriber in subscriptions]
+        self._sub_symbol_idx = np.array([position[t] for t, _ in subscriptions], dtype=np.int64)
+        self._sub_thresholds = np.array([thresholds[k] for k in subscriptions], dtype=np.float64)
+        self._index_built_at = time.monotonic()
+
+    async def poll_once(self) -> int:
+        """
+        Poll all subscribed tickers once and queue any alerts.
+
+        Returns:
+            Number of notifications queued
+        """
+        if time.monotonic() - self._index_built_at > self.index_refresh_s:
+            await self.rebuild_index()
+        if not self._symbols:
+            return 0
+
+        closes = await asyncio.to_thread(download_closes, self._symbols, "5d")
+        if len(closes) < 2:
+            return 0
+
+        # Daily % change per distinct ticker, aligned with the index order
+        closes = closes.reindex(columns=self._symbols)
+        day_pct = ((closes.iloc[-1] / closes.iloc[-2] - 1) * 100).to_numpy(dtype=np.float64)
+        last_price = closes.iloc[-1].to_numpy(dtype=np.float64)
+        trading_date = closes.index[-1].strftime("%Y-%m-%d")
+
+        # One pass over every subscription of every user
+        moves = day_pct[self._sub_symbol_idx]
+        triggered = np.flatnonzero(np.abs(moves) >= self._sub_thresholds)
+
+        queued = 0
+        for i in triggered:
+            ticker = self._symbols[self._sub_symbol_idx[i]]
+            user_id, session_id = self._subscribers[i]
+            direction = "up" if moves[i] > 0 else "down"
+            key = (user_id, session_id, ticker, direction)
+            if self._alerted.get(key) == trading_date:
+                continue
+            self._alerted[key] = trading_date
+
+            self.notifications.put_nowait({
+                "user_id": user_id,
+                "session_id": session_id,
+                "ticker": ticker,
+                "day_change_pct": round(float(moves[i]), 2),
+                "price": round(float(last_price[self._sub_symbol_idx[i]]), 2),
+                "threshold_pct": float(self._sub_thresholds[i]),
+                "trading_date": trading_date,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            queued += 1
+        return queued
+
+    async def run(self) -> None:
+        """Poll forever at the configured interval."""
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"⚠️  Watchlist poll failed: {e}")
+            await asyncio.sleep(self.poll_interval_s)
+
+    def start(self) -> None:
+        """Start polling in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop background polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def _main(interval: float) -> None:
+    # Read the database directly: caching sessions here would hide other processes' writes
+    session_service = create_session_service(write_behind=False)
+    monitor = WatchlistMonitor(session_service, market_report_agent.name, poll_interval_s=interval)
+    monitor.start()
+
+    print("👀 Watchlist monitor running (Ctrl+C to stop)")
+    print(f"   Reads flushed session state: changes made by write-behind servers show up "
+          f"within {FLUSH_INTERVAL_S + monitor.index_refresh_s:.0f}s")
+    try:
+        while True:
+            alert = await monitor.notifications.get()
+            arrow = "📈" if alert["day_change_pct"] > 0 else "📉"
+            print(f"{arrow} [{alert['user_id']}] {alert['ticker']} {alert['day_change_pct']:+.2f}% "
+                  f"at {alert['price']:.2f} (threshold {alert['threshold_pct']}%)")
+    finally:
+        await monitor.stop()
+        await session_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared watchlist price alert monitor")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_S, help="Seconds between polls")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.interval))
+    except KeyboardInterrupt:
+        print("\n👋 Monitor stopped")
@@ -4,16 +4,20 @@
 """
 PriceUpdateAgent - Analyzes price movements for portfolio tickers using yfinance
 """
-import yfinance as yf
-from datetime import datetime, timedelta
+import asyncio
+import numpy as np
 from google.adk.agents import Agent
+from utils.bar_store import bar_cache, history_start
+from utils.compute_pool import compute_indicators_async
+from utils.intraday import intraday_store
 
-def get_price_updates(tickers: list[str]) -> dict:
+def get_price_updates(tickers: list[str], as_of: str = "") -> dict:
     """
     Fetch price data for given tickers and analyze their performance.
     
     Args:
         tickers: List of stock ticker symbols
+        as_of: Past date (YYYY-MM-DD) to report as of; empty for the latest data
         
     Returns:
         Dictionary with price data and performance metrics
@@ -21,70 +25,132 @@ def get_price_updates(tickers: list[str]) -> dict:
     if not tickers:
         return {"error": "No tickers provided"}
     
-    results = {}
-    end_date = datetime.now()
-    # Fetch more days to ensure we have enough trading days
-    start_date = end_date - timedelta(days=14)  # 14 days to cover weekends/holidays
+    try:
+        history_from = history_start(as_of) if as_of else None
+    except ValueError:
+        return {"error": f"Invalid as_of date '{as_of}', expected YYYY-MM-DD"}
+    
+    try:
+        store = bar_cache.get(tickers, history_from=history_from)
+    except Exception as e:
+        return {ticker: {"error": str(e)} for ticker in tickers}
+    
+    # Latest, previous and week-ago (5 trading days) bars for every ticker at once
+    bars = store.snapshot(tickers, lookbacks=(1, 5), as_of=as_of or None)
+    return price_updates_from_bars(tickers, bars)
+
+def price_updates_from_bars(tickers: list[str], bars: dict) -> dict:
+    """
+    Build price updates from bar store snapshot arrays.
     
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
-            
-            # Drop any NaN values (shouldn't happen with yfinance, but just in case)
-            hist = hist.dropna()
-            
-            if hist.empty:
-                results[ticker] = {"error": "No data available"}
-                continue
-            
-            # Ensure we have at least 2 trading days
-            if len(hist) < 2:
-                results[ticker] = {"error": "Insufficient trading data"}
-                continue
-            
-            # Most recent trading day (could be today or last Friday if weekend)
-            current_price = hist['Close'].iloc[-1]
-            current_date = hist.index[-1]
-            
-            # Previous trading day (handles weekends and holidays automatically)
-            prev_close = hist['Close'].iloc[-2]
-            prev_date = hist.index[-2]
-            
-            # Week ago data (or closest trading day)
-            week_ago_idx = max(0, len(hist) - 6)  # Approximate 5 trading days
-            week_open = hist['Close'].iloc[week_ago_idx]
-            
-            # Calculate metrics
-            day_change = current_price - prev_close
-            day_change_pct = (day_change / prev_close) * 100
-            week_change = current_price - week_open
-            week_change_pct = (week_change / week_open) * 100
-            
-            results[ticker] = {
-                "symbol": ticker,
-                "current_price": round(current_price, 2),
-                "current_date": current_date.strftime("%Y-%m-%d"),
-                "day_change": round(day_change, 2),
-                "day_change_pct": round(day_change_pct, 2),
-                "prev_close_date": prev_date.strftime("%Y-%m-%d"),
-                "week_change": round(week_change, 2),
-                "week_change_pct": round(week_change_pct, 2),
-                "volume": int(hist['Volume'].iloc[-1]),
-                "high_52w": round(stock.info.get('fiftyTwoWeekHigh', 0), 2),
-                "low_52w": round(stock.info.get('fiftyTwoWeekLow', 0), 2),
-            }
-            
-        except Exception as e:
-            results[ticker] = {"error": str(e)}
+    Args:
+        tickers: Ticker symbols the arrays are aligned with
+        bars: Snapshot arrays (lookbacks include 1 and 5)
+        
+    Returns:
+        Dictionary with price data and performance metrics
+    """
+    day_change = bars["close"] - bars["close_1"]
+    day_change_pct = day_change / bars["close_1"] * 100
+    week_change = bars["close"] - bars["close_5"]
+    week_change_pct = week_change / bars["close_5"] * 100
     
+    results = {}
+    for i, ticker in enumerate(tickers):
+        if bars["bars"][i] == 0:
+            results[ticker] = {"error": "No data available"}
+            continue
+        
+        # Ensure we have at least 2 trading days
+        if bars["bars"][i] < 2:
+            results[ticker] = {"error": "Insufficient trading data"}
+            continue
+        
+        results[ticker] = {
+            "symbol": ticker,
+            "current_price": round(float(bars["close"][i]), 2),
+            "current_date": str(bars["date"][i]),
+            "day_change": round(float(day_change[i]), 2),
+            "day_change_pct": round(float(day_change_pct[i]), 2),
+            "prev_close_date": str(bars["date_1"][i]),
+            "week_change": round(float(week_change[i]), 2),
+            "week_change_pct": round(float(week_change_pct[i]), 2),
+            "volume": int(bars["volume"][i]),
+            "high_52w": round(float(bars["high_52w"][i]), 2),
+            "low_52w": round(float(bars["low_52w"][i]), 2),
+        }
+    
+    return results
+
+async def get_technical_indicators(tickers: list[str]) -> dict:
+    """
+    Compute technical indicators from one year of daily history.
+
+    Includes 20/50-day moving averages, 14-day RSI, drawdowns and 20-day
+    volatility. The computation runs in a process pool so it does not
+    stall other sessions.
+
+    Args:
+        tickers: List of stock ticker symbols
+
+    Returns:
+        Dictionary with indicators for each ticker
+    """
+    if not tickers:
+        return {"error": "No tickers provided"}
+
+    tickers = [t.upper().strip() for t in tickers]
+
+    try:
+        store = await asyncio.to_thread(bar_cache.get, tickers)
+    except Exception as e:
+        return {ticker: {"error": str(e)} for ticker in tickers}
+
+    results = {ticker: {"error": "No data available"} for ticker in tickers}
+    # Gap-filled (days, tickers) closes; leading gaps take the first close
+    closes = store.closes(tickers)
+    has_bars = ~np.isnan(closes).all(axis=0)
+    if len(closes) < 2 or not has_bars.any():
+        return results
+
+    indicators = await compute_indicators_async(closes[:, has_bars])
+
+    for ticker, values in zip(np.array(tickers)[has_bars], indicators):
+        results[str(ticker)] = {"symbol": str(ticker), **values}
+
     return results
 
+def get_intraday_update(tickers: list[str]) -> dict:
+    """
+    Get today's intraday snapshot from minute bars.
+
+    Minute bars are kept in memory and only new bars are added on refresh,
+    so repeated questions during the day are cheap.
+
+    Args:
+        tickers: List of stock ticker symbols
+
+    Returns:
+        Dictionary with latest price, VWAP, session open/high/low and
+        change from the open for each ticker
+    """
+    if not tickers:
+        return {"error": "No tickers provided"}
+
+    tickers = [t.upper().strip() for t in tickers]
+
+    try:
+        intraday_store.refresh(tickers)
+    except Exception as e:
+        return {ticker: {"error": str(e)} for ticker in tickers}
+
+    return {ticker: {"symbol": ticker, **intraday_store.latest(ticker)} for ticker in tickers}
+
 # Create the PriceUpdateAgent
 price_update_agent = Agent(
     name="price_update_agent",
     model="gemini-2.0-flash",
-    tools=[get_price_updates],
+    tools=[get_price_updates, get_technical_indicators, get_intraday_update],
     instruction="""You are a Price Update Agent specializing in stock price analysis.
 
 Your role:
@@ -92,6 +158,9 @@ Your role:
 - Calculate daily and weekly performance metrics
 - Highlight significant price movements
 - Provide context with 52-week highs/lows
+- For questions about a past date, pass as_of (YYYY-MM-DD) to report prices as of that trading day
+- Answer intraday questions ("how is AAPL doing this morning?") with the intraday snapshot
+- Add technical context (moving averages, RSI, drawdowns, volatility) when asked for a deeper analysis
 
 When presenting price updates:
 - Lead with the most significant movers (biggest % changes)
@@ -4,59 +4,78 @@
 """
 SectorPerformanceAgent - Analyzes GICS 11 sector performance using sector ETFs
 """
-import yfinance as yf
-from datetime import datetime, timedelta
+import time
+import pandas as pd
+from datetime import datetime
 from google.adk.agents import Agent
-from utils.constants import GICS_SECTORS
+from utils.bar_store import BarStore, bar_cache, history_start
+from utils.constants import GICS_SECTORS, SECTOR_HORIZONS, ROTATION_RANK_THRESHOLD
 
-def get_sector_performance() -> dict:
+# Multi-horizon results are reused for this long; the latest daily bar keeps
+# changing during the session, so results cannot be kept for the whole day
+HORIZON_CACHE_TTL_S = 300
+_horizon_cache: dict = {}
+
+def get_sector_performance(as_of: str = "") -> dict:
     """
     Fetch performance data for all GICS 11 sectors using sector ETFs.
     
+    Args:
+        as_of: Past date (YYYY-MM-DD) to report as of; empty for the latest data
+    
     Returns:
         Dictionary with sector performance data, leaders, and laggards
     """
-    end_date = datetime.now()
-    # Fetch more days to ensure we have enough trading days
-    start_date = end_date - timedelta(days=7)
+    try:
+        end_date = datetime.strptime(as_of, "%Y-%m-%d") if as_of else datetime.now()
+    except ValueError:
+        return {"error": f"Invalid as_of date '{as_of}', expected YYYY-MM-DD"}
+    etfs = list(GICS_SECTORS.values())
     
-    sector_data = {}
+    try:
+        store = bar_cache.get(etfs, history_from=history_start(as_of) if as_of else None)
+    except Exception as e:
+        return {
+            "all_sectors": {sector: {"error": str(e)} for sector in GICS_SECTORS},
+            "leaders": {},
+            "laggards": {},
+            "error": str(e),
+            "analysis_date": end_date.strftime("%Y-%m-%d")
+        }
+    
+    # Latest and previous trading day for all sector ETFs at once
+    bars = store.snapshot(etfs, lookbacks=(1,), as_of=as_of or None)
+    return sector_performance_from_bars(bars, end_date.strftime("%Y-%m-%d"))
+
+def sector_performance_from_bars(bars: dict, analysis_date: str) -> dict:
+    """
+    Build the sector performance result from bar store snapshot arrays.
     
-    for sector_name, etf_ticker in GICS_SECTORS.items():
-        try:
-            etf = yf.Ticker(etf_ticker)
-            hist = etf.history(start=start_date, end=end_date)
-            
-            # Drop any NaN values
-            hist = hist.dropna()
-            
-            if hist.empty or len(hist) < 2:
-                sector_data[sector_name] = {"error": "Insufficient data"}
-                continue
-            
-            # Most recent trading day
-            current_price = hist['Close'].iloc[-1]
-            current_date = hist.index[-1]
-            
-            # Previous trading day (handles weekends and holidays)
-            prev_close = hist['Close'].iloc[-2]
-            prev_date = hist.index[-2]
-            
-            day_change = current_price - prev_close
-            day_change_pct = (day_change / prev_close) * 100
-            
-            sector_data[sector_name] = {
-                "etf": etf_ticker,
-                "current_price": round(current_price, 2),
-                "current_date": current_date.strftime("%Y-%m-%d"),
-                "day_change": round(day_change, 2),
-                "day_change_pct": round(day_change_pct, 2),
-                "prev_close_date": prev_date.strftime("%Y-%m-%d"),
-                "volume": int(hist['Volume'].iloc[-1])
-            }
-            
-        except Exception as e:
-            sector_data[sector_name] = {"error": str(e)}
+    Args:
+        bars: Snapshot arrays aligned with GICS_SECTORS (lookbacks include 1)
+        analysis_date: Date the analysis refers to
+    
+    Returns:
+        Dictionary with sector performance data, leaders, and laggards
+    """
+    day_change = bars["close"] - bars["close_1"]
+    day_change_pct = day_change / bars["close_1"] * 100
+    
+    sector_data = {}
+    for i, (sector_name, etf_ticker) in enumerate(GICS_SECTORS.items()):
+        if bars["bars"][i] < 2:
+            sector_data[sector_name] = {"error": "Insufficient data"}
+            continue
+        
+        sector_data[sector_name] = {
+            "etf": etf_ticker,
+            "current_price": round(float(bars["close"][i]), 2),
+            "current_date": str(bars["date"][i]),
+            "day_change": round(float(day_change[i]), 2),
+            "day_change_pct": round(float(day_change_pct[i]), 2),
+            "prev_close_date": str(bars["date_1"][i]),
+            "volume": int(bars["volume"][i])
+        }
     
     # Sort sectors by performance
     valid_sectors = {k: v for k, v in sector_data.items() if "error" not in v}
@@ -67,7 +86,7 @@ def get_sector_performance() -> dict:
             "leaders": {},
             "laggards": {},
             "error": "No valid sector data available",
-            "analysis_date": end_date.strftime("%Y-%m-%d")
+            "analysis_date": analysis_date
         }
     
     sorted_sectors = sorted(
@@ -84,15 +103,109 @@ def get_sector_performance() -> dict:
         "all_sectors": sector_data,
         "leaders": dict(leaders),
         "laggards": dict(laggards),
-        "analysis_date": end_date.strftime("%Y-%m-%d"),
+        "analysis_date": analysis_date,
         "trading_date": valid_sectors[list(valid_sectors.keys())[0]]["current_date"]
     }
 
+def _horizon_returns(store: BarStore, etfs: list[str]) -> tuple[pd.DataFrame, str]:
+    """
+    Compute percentage returns for every horizon from one store snapshot.
+
+    Args:
+        store: Bar store holding about a year of bars for the ETFs
+        etfs: Sector ETF symbols
+
+    Returns:
+        DataFrame with one row per horizon and one column per ETF (NaN for
+        ETFs without bars), and the latest trading date
+    """
+    bars = store.snapshot(etfs, lookbacks=tuple(SECTOR_HORIZONS.values()))
+    base = {name: bars[f"close_{days}"] for name, days in SECTOR_HORIZONS.items()}
+
+    # YTD is measured from the last close of the previous year
+    trading_date = str(bars["date"][bars["bars"] > 0].max())
+    year_end = f"{int(trading_date[:4]) - 1}-12-31"
+    base["YTD"] = store.snapshot(etfs, as_of=year_end)["close"]
+
+    returns = {name: (bars["close"] / values - 1.0) * 100 for name, values in base.items()}
+    return pd.DataFrame(returns, index=etfs).T, trading_date
+
+
+def get_multi_horizon_sector_performance() -> dict:
+    """
+    Analyze GICS 11 sector performance over 1D, 1W, 1M, 3M and YTD horizons.
+
+    Every horizon is computed at once from the sector ETFs' year of bars in
+    the bar store. Results are reused for HORIZON_CACHE_TTL_S seconds.
+
+    Returns:
+        Dictionary with leaders and laggards per horizon, momentum ranks,
+        and sector rotation signals
+    """
+    analysis_date = datetime.now().strftime("%Y-%m-%d")
+    cached = _horizon_cache.get("result")
+    if cached and time.monotonic() - _horizon_cache["computed_at"] < HORIZON_CACHE_TTL_S:
+        return cached
+
+    etfs = list(GICS_SECTORS.values())
+    try:
+        store = bar_cache.get(etfs)
+    except Exception as e:
+        return {"error": str(e), "analysis_date": analysis_date}
+
+    if store.snapshot(etfs)["bars"].max(initial=0) < 2:
+        return {"error": "No valid sector data available", "analysis_date": analysis_date}
+
+    returns, trading_date = _horizon_returns(store, etfs)
+    etf_to_sector = {etf: sector for sector, etf in GICS_SECTORS.items()}
+    returns = returns.rename(columns=etf_to_sector)
+
+    returns = returns.dropna(axis=1).round(2)
+    # Rank 1 is the best performing sector for that horizon
+    ranks = returns.rank(axis=1, ascending=False, method="min").astype(int)
+
+    horizons = {}
+    for horizon, row in returns.iterrows():
+        ordered = row.sort_values(ascending=False)
+        horizons[horizon] = {
+            "returns_pct": ordered.to_dict(),
+            "leaders": ordered.head(2).to_dict(),
+            "laggards": ordered.tail(2).to_dict(),
+        }
+
+    # Momentum rank change: positive means the sector climbed from its
+    # 3-month rank to its 1-week rank
+    rank_change = ranks.loc["3M"] - ranks.loc["1W"]
+    rotation_signals = []
+    for sector, change in rank_change.sort_values(ascending=False).items():
+        if abs(change) < ROTATION_RANK_THRESHOLD:
+            continue
+        rotation_signals.append({
+            "sector": sector,
+            "etf": GICS_SECTORS[sector],
+            "rank_3m": int(ranks.at["3M", sector]),
+            "rank_1w": int(ranks.at["1W", sector]),
+            "rank_change": int(change),
+            "signal": "rotating_in" if change > 0 else "rotating_out",
+        })
+
+    result = {
+        "horizons": horizons,
+        "ranks": ranks.T.to_dict(orient="index"),
+        "rotation_signals": rotation_signals,
+        "analysis_date": analysis_date,
+        "trading_date": trading_date,
+    }
+
+    _horizon_cache["result"] = result
+    _horizon_cache["computed_at"] = time.monotonic()
+    return result
+
 # Create the SectorPerformanceAgent
 sector_performance_agent = Agent(
     name="sector_performance_agent",
     model="gemini-2.0-flash",
-    tools=[get_sector_performance],
+    tools=[get_sector_performance, get_multi_horizon_sector_performance],
     instruction="""You are a Sector Performance Agent specializing in market sector analysis.
 
 Your role:
@@ -100,11 +213,13 @@ Your role:
 - Identify the top 2 performing sectors (leaders)
 - Identify the bottom 2 performing sectors (laggards)
 - Provide market context and rotation insights
+- For questions about a past date, pass as_of (YYYY-MM-DD) to get sector performance as of that trading day
+- Use the multi-horizon analysis (1D, 1W, 1M, 3M, YTD) when asked about longer-term trends or sector rotation
 
 When presenting sector analysis:
 - Clearly highlight the leaders and laggards
 - Explain what's driving sector movements (if patterns are evident)
-- Note any sector rotation trends
+- Note any sector rotation trends, citing the momentum rank changes from the multi-horizon analysis
 - Keep analysis focused on actionable insights
 
 Format your response as a concise sector performance report with clear sections for leaders and laggards.""",
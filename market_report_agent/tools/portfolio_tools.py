@@ -110,4 +110,35 @@ def list_tickers(session_state: dict) -> dict:
         "message": f"You have {len(portfolio)} ticker(s) in your portfolio",
         "portfolio": portfolio,
         "count": len(portfolio)
+    }
+
+
+def set_alert_threshold(session_state: dict, threshold_pct: float, ticker: str = "") -> dict:
+    """
+    Set the daily move that triggers a price alert.
+    
+    Args:
+        session_state: Current session state containing portfolio
+        threshold_pct: Absolute daily % change that triggers an alert
+        ticker: Stock ticker symbol, or empty for the portfolio-wide default
+        
+    Returns:
+        Dictionary with operation result
+    """
+    if threshold_pct <= 0:
+        return {
+            "success": False,
+            "message": "Alert threshold must be a positive percentage"
+        }
+    
+    rules = dict(session_state.get("alert_rules", {}))
+    key = ticker.upper().strip() or "default"
+    rules[key] = float(threshold_pct)
+    session_state["alert_rules"] = rules
+    
+    target = key if key != "default" else "all portfolio tickers"
+    return {
+        "success": True,
+        "message": f"Alerts set for moves of {threshold_pct}% or more on {target}",
+        "alert_rules": rules
     }
\ No newline at end of file
@@ -0,0 +1,83 @@
+# ============================================================================
+# market_report_agent/tools/report_diff.py
+# ============================================================================
+"""Day-over-day differences between two sets of report inputs"""
+
+from typing import Dict, Any
+
+from utils.constants import SECTOR_RANK_CHANGE_MIN
+from .report_templates import select_movers
+
+
+def _sector_ranks(sectors: dict) -> dict:
+    """Rank sectors by daily change, 1 being the best."""
+    valid = {
+        name: data for name, data in sectors.get("all_sectors", {}).items()
+        if "error" not in data
+    }
+    ordered = sorted(valid, key=lambda name: valid[name]["day_change_pct"], reverse=True)
+    return {name: rank for rank, name in enumerate(ordered, start=1)}
+
+
+def _headlines(inputs: dict) -> set[str]:
+    """All headline titles in a set of report inputs."""
+    titles = set()
+    for data in inputs.get("portfolio_news", {}).values():
+        for article in data.get("articles", []):
+            titles.add(article.get("title", str(article)) if isinstance(article, dict) else str(article))
+    for article in inputs.get("general_news", {}).get("general_news", []):
+        titles.add(article.get("title", str(article)) if isinstance(article, dict) else str(article))
+    return titles
+
+
+def diff_report_inputs(previous: dict, current: dict) -> Dict[str, Any]:
+    """
+    Find the meaningful changes between two report snapshots.
+
+    Args:
+        previous: Structured inputs of the last archived report
+        current: Structured inputs gathered now
+
+    Returns:
+        Dictionary with new movers, sector rank changes, new headlines and
+        portfolio changes; empty lists mean nothing changed
+    """
+    prev_prices = previous.get("prices", {})
+    curr_prices = current.get("prices", {})
+
+    prev_movers = {t: d["day_change_pct"] for t, d in select_movers(prev_prices)}
+    new_movers = [
+        {
+            "ticker": ticker,
+            "day_change_pct": data["day_change_pct"],
+            "current_price": data["current_price"],
+            "previous_day_change_pct": prev_movers.get(ticker),
+        }
+        for ticker, data in select_movers(curr_prices)
+        # New mover, or a mover that reversed direction
+        if ticker not in prev_movers or (prev_movers[ticker] > 0) != (data["day_change_pct"] > 0)
+    ]
+
+    prev_ranks = _sector_ranks(previous.get("sectors", {}))
+    curr_ranks = _sector_ranks(current.get("sectors", {}))
+    sector_rank_changes = [
+        {
+            "sector": sector,
+            "previous_rank": prev_ranks[sector],
+            "current_rank": rank,
+            "day_change_pct": current["sectors"]["all_sectors"][sector]["day_change_pct"],
+        }
+        for sector, rank in curr_ranks.items()
+        if sector in prev_ranks and abs(prev_ranks[sector] - rank) >= SECTOR_RANK_CHANGE_MIN
+    ]
+    sector_rank_changes.sort(key=lambda c: abs(c["previous_rank"] - c["current_rank"]), reverse=True)
+
+    return {
+        "new_movers": new_movers,
+        "sector_rank_changes": sector_rank_changes,
+        "new_leaders": sorted(set(current.get("sectors", {}).get("leaders", {})) - set(previous.get("sectors", {}).get("leaders", {}))),
+        "new_laggards": sorted(set(current.get("sectors", {}).get("laggards", {})) - set(previous.get("sectors", {}).get("laggards", {}))),
+        "new_headlines": sorted(_headlines(current) - _headlines(previous)),
+        "added_tickers": sorted(set(curr_prices) - set(prev_prices)),
+        "removed_tickers": sorted(set(prev_prices) - set(curr_prices)),
+    }
@@ -0,0 +1,193 @@
+# ============================================================================
+# market_report_agent/tools/report_templates.py
+# ============================================================================
+"""Markdown templates for reports rendered directly from tool outputs"""
+
+from string import Template
+from typing import Optional
+
+from utils.constants import MOVER_THRESHOLD_PCT
+
+# Number of movers listed in the top movers section
+TOP_MOVERS = 5
+
+QUICK_REPORT_TEMPLATE = Template("""# Market Report - $report_date
+
+$partial$summary## Portfolio Performance
+
+$holdings_table
+
+### Top Movers
+
+$movers
+
+## Sector Performance ($trading_date)
+
+$sectors
+
+## News
+
+$news
+""")
+
+
+# Section names used in the partial report notice
+SECTION_TITLES = {
+    "prices": "Portfolio Performance",
+    "sectors": "Sector Performance",
+    "portfolio_news": "Portfolio News",
+    "general_news": "General Market News",
+}
+
+
+def _fmt_pct(value: float) -> str:
+    return f"{value:+.2f}%"
+
+
+def unavailable_reason(section: dict) -> str:
+    """
+    Reason a report section is missing, or "" if it is available.
+
+    Per-ticker sections (prices, portfolio news) are missing when every
+    ticker entry is marked unavailable.
+    """
+    if section.get("unavailable"):
+        return section.get("error", "unavailable")
+    entries = [v for v in section.values() if isinstance(v, dict)]
+    if entries and all(v.get("unavailable") for v in entries):
+        return entries[0].get("error", "unavailable")
+    return ""
+
+
+def missing_sections(data: dict) -> list[str]:
+    """Names of the report input sections that are marked unavailable."""
+    return [name for name in SECTION_TITLES if unavailable_reason(data.get(name, {}))]
+
+
+def _partial_notice(data: dict) -> str:
+    missing = missing_sections(data)
+    if not missing:
+        return ""
+    titles = ", ".join(SECTION_TITLES[name] for name in missing)
+    return f"> ⚠️ **Partial report** - unavailable: {titles}. See the notes in each section.\n\n"
+
+
+def _holdings_table(prices: dict) -> str:
+    reason = unavailable_reason(prices)
+    if reason:
+        return f"_Price data unavailable: {reason}_"
+    rows = [
+        "| Ticker | Price | Day | Week | 52w Range |",
+        "|---|---:|---:|---:|---|",
+    ]
+    for ticker, data in prices.items():
+        if "error" in data:
+            rows.append(f"| {ticker} | n/a | n/a | n/a | {data['error']} |")
+            continue
+        rows.append(
+            f"| {ticker} | {data['current_price']:.2f} | {_fmt_pct(data['day_change_pct'])} "
+            f"| {_fmt_pct(data['week_change_pct'])} | {data['low_52w']:.2f} - {data['high_52w']:.2f} |"
+        )
+    return "\n".join(rows)
+
+
+def select_movers(prices: dict, threshold_pct: float = MOVER_THRESHOLD_PCT) -> list[tuple[str, dict]]:
+    """
+    Pick the holdings whose daily move is at least the mover threshold.
+
+    Args:
+        prices: Output of get_price_updates
+        threshold_pct: Minimum absolute daily % change
+
+    Returns:
+        List of (ticker, price data) sorted by absolute daily move
+    """
+    valid = [(t, d) for t, d in prices.items() if "error" not in d]
+    movers = [(t, d) for t, d in valid if abs(d["day_change_pct"]) >= threshold_pct]
+    return sorted(movers, key=lambda x: abs(x[1]["day_change_pct"]), reverse=True)
+
+
+def _movers_section(prices: dict) -> str:
+    movers = select_movers(prices)[:TOP_MOVERS]
+    if not movers:
+        return f"No holdings moved more than {MOVER_THRESHOLD_PCT:.1f}% on the day."
+    return "\n".join(
+        f"- **{ticker}** {_fmt_pct(data['day_change_pct'])} to {data['current_price']:.2f}"
+        for ticker, data in movers
+    )
+
+
+def _sector_line(sector: str, data: dict) -> str:
+    return f"- {sector} ({data['etf']}): {_fmt_pct(data['day_change_pct'])}"
+
+
+def _sectors_section(sectors: dict) -> str:
+    if sectors.get("error"):
+        return f"_Sector data unavailable: {sectors['error']}_"
+    lines = ["**Leaders**"]
+    lines += [_sector_line(s, d) for s, d in sectors["leaders"].items()]
+    lines += ["", "**Laggards**"]
+    lines += [_sector_line(s, d) for s, d in sectors["laggards"].items()]
+    return "\n".join(lines)
+
+
+def _news_section(portfolio_news: dict, general_news: dict) -> str:
+    lines = []
+    reason = unavailable_reason(portfolio_news)
+    if reason:
+        lines.append(f"- _Portfolio news unavailable: {reason}_")
+    else:
+        for ticker, data in portfolio_news.items():
+            articles = data.get("articles", [])
+            lines.append(f"- {ticker}: {len(articles)} headline(s)")
+            lines += [f"  - {a.get('title', a)}" for a in articles[:3]]
+
+    reason = unavailable_reason(general_news)
+    if reason:
+        lines.append(f"- _General market news unavailable: {reason}_")
+    else:
+        lines.append(f"- General market: {len(general_news.get('general_news', []))} headline(s)")
+    return "\n".join(lines)
+
+
+def render_quick_report(
+    prices: dict,
+    sectors: dict,
+    portfolio_news: dict,
+    general_news: dict,
+    report_date: str,
+    summary: Optional[str] = None
+) -> str:
+    """
+    Render a full markdown report from structured tool outputs.
+
+    Args:
+        prices: Output of get_price_updates
+        sectors: Output of get_sector_performance
+        portfolio_news: Output of search_portfolio_news
+        general_news: Output of search_general_market_news
+        report_date: Date shown in the report title
+        summary: Optional executive summary paragraph
+
+    Sections marked unavailable (see unavailable_reason) are rendered as
+    missing and listed in a partial report notice at the top.
+
+    Returns:
+        Markdown report
+    """
+    data = {
+        "prices": prices,
+        "sectors": sectors,
+        "portfolio_news": portfolio_news,
+        "general_news": general_news,
+    }
+    return QUICK_REPORT_TEMPLATE.substitute(
+        report_date=report_date,
+        partial=_partial_notice(data),
+        summary=f"## Executive Summary\n\n{summary.strip()}\n\n" if summary else "",
+        holdings_table=_holdings_table(prices),
+        movers=_movers_section(prices),
+        trading_date=sectors.get("trading_date", report_date),
+        sectors=_sectors_section(sectors),
+        news=_news_section(portfolio_news, general_news),
+    )
@@ -3,24 +3,240 @@
 # ============================================================================
 """Report generation tool that orchestrates sub-agents"""
 
-from typing import Dict, Any
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from google import genai
+
+from ..sub_agents.price_update_agent.agent import get_price_updates
+from ..sub_agents.sector_performance_agent.agent import get_sector_performance
+from ..sub_agents.market_news_agent.agent import (
+    search_portfolio_news,
+    search_general_market_news
+)
+from utils.deadline import DeadlineExceeded, report_deadline, within_deadline
+from utils.report_archive import archive_report, load_latest_report
+from .report_diff import diff_report_inputs
+from .report_templates import missing_sections, render_quick_report
+
+# Model used for the optional executive summary in quick mode
+SUMMARY_MODEL = "gemini-2.0-flash"
+
+# Shared client for summaries, created on first use or at warm-up
+_genai_client: Optional[genai.Client] = None
+
+
+def genai_client() -> genai.Client:
+    """Model client shared by all summaries in this process."""
+    global _genai_client
+    if _genai_client is None:
+        _genai_client = genai.Client()
+    return _genai_client
+
+
+def _unavailable_section(name: str, portfolio: list[str], error: str) -> Dict[str, Any]:
+    """
+    Placeholder for a section that could not be fetched.
+
+    Keeps the section's usual shape so templates and diffs still work;
+    each entry carries "unavailable": True.
+    """
+    missing = {"error": error, "unavailable": True}
+    if name == "prices":
+        return {ticker: dict(missing) for ticker in portfolio}
+    if name == "portfolio_news":
+        return {ticker: {"articles": [], **missing} for ticker in portfolio}
+    if name == "sectors":
+        return {"all_sectors": {}, "leaders": {}, "laggards": {}, **missing}
+    return {"general_news": [], **missing}
+
+
+async def _fetch_section(name: str, portfolio: list[str], func, *args) -> Dict[str, Any]:
+    """Run one blocking fetch in a thread, bounded by the report deadline."""
+    try:
+        return await within_deadline(asyncio.to_thread(func, *args))
+    except DeadlineExceeded as e:
+        # The worker thread cannot be interrupted; its network calls are
+        # bounded separately by fetch_timeout()
+        print(f"⚠️  Report section '{name}' timed out")
+        return _unavailable_section(name, portfolio, str(e))
+    except Exception as e:
+        return _unavailable_section(name, portfolio, str(e))
+
+
+async def gather_report_data(portfolio: list[str]) -> Dict[str, Any]:
+    """
+    Fetch the structured inputs of a report concurrently.
+
+    Each fetch is bounded by the current report deadline; sections that
+    miss it are returned as unavailable instead of delaying the report.
+
+    Args:
+        portfolio: List of stock ticker symbols
+
+    Returns:
+        Dictionary with prices, sectors, portfolio_news and general_news
+    """
+    prices, sectors, portfolio_news, general_news = await asyncio.gather(
+        _fetch_section("prices", portfolio, get_price_updates, portfolio),
+        _fetch_section("sectors", portfolio, get_sector_performance),
+        _fetch_section("portfolio_news", portfolio, search_portfolio_news, portfolio),
+        _fetch_section("general_news", portfolio, search_general_market_news),
+    )
+    return {
+        "prices": prices,
+        "sectors": sectors,
+        "portfolio_news": portfolio_news,
+        "general_news": general_news,
+    }
+
+
+async def summarize_report(report: str) -> str:
+    """
+    Ask the model for a short executive summary of a rendered report.
+
+    Args:
+        report: Markdown report rendered from structured data
+
+    Returns:
+        Executive summary paragraph
+    """
+    response = await genai_client().aio.models.generate_content(
+        model=SUMMARY_MODEL,
+        contents=(
+            "Write a 3-4 sentence executive summary for this market report. "
+            "Only use facts that appear in the report.\n\n" + report
+        ),
+    )
+    return response.text or ""
+
+
+def _trading_date(data: Dict[str, Any]) -> str:
+    """Trading date the report data refers to."""
+    if data["sectors"].get("trading_date"):
+        return data["sectors"]["trading_date"]
+    for price in data["prices"].values():
+        if isinstance(price, dict) and "current_date" in price:
+            return price["current_date"]
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+async def quick_report(
+    portfolio: list[str],
+    include_summary: bool = False,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Render a full markdown report from tool outputs without the root agent.
+
+    Args:
+        portfolio: List of stock ticker symbols
+        include_summary: Add a model-written executive summary paragraph
+        user_id: Archive the report and its inputs for this user
+
+    Returns:
+        Dictionary with the rendered markdown report
+    """
+    start = time.perf_counter()
+    with report_deadline():
+        data = await gather_report_data(portfolio)
+        report_date = datetime.now().strftime("%Y-%m-%d")
+        report = render_quick_report(report_date=report_date, **data)
+        missing = missing_sections(data)
+
+        if include_summary:
+            try:
+                summary = await within_deadline(summarize_report(report))
+                report = render_quick_report(report_date=report_date, summary=summary, **data)
+            except Exception as e:
+                # The report is complete without the summary
+                print(f"⚠️  Executive summary skipped: {e}")
+
+    # Partial reports are not archived so the next comparison has a full baseline
+    if user_id and not missing:
+        await asyncio.to_thread(archive_report, user_id, _trading_date(data), report, data)
+
+    return {
+        "success": True,
+        "mode": "quick",
+        "portfolio": portfolio,
+        "report": report,
+        "partial": bool(missing),
+        "missing_sections": missing,
+        "generated_in_ms": round((time.perf_counter() - start) * 1000, 1),
+        "instructions": "This report is shown to the user as rendered; do not repeat it."
+    }
+
+
+async def changes_report(portfolio: list[str], user_id: str) -> Dict[str, Any]:
+    """
+    Report only what changed since the user's last archived report.
+
+    Args:
+        portfolio: List of stock ticker symbols
+        user_id: User whose archived report is the baseline
+
+    Returns:
+        Dictionary with the meaningful deltas for the model to summarize
+    """
+    previous = await asyncio.to_thread(load_latest_report, user_id)
+    if previous is None:
+        result = await quick_report(portfolio, user_id=user_id)
+        result["message"] = "No previous report to compare with, so a full quick report was generated."
+        return result
+
+    with report_deadline():
+        data = await gather_report_data(portfolio)
+    changes = diff_report_inputs(previous["inputs"], data)
+    missing = missing_sections(data)
+
+    # Archive this snapshot as the baseline for the next comparison
+    if not missing:
+        report = render_quick_report(report_date=datetime.now().strftime("%Y-%m-%d"), **data)
+        await asyncio.to_thread(archive_report, user_id, _trading_date(data), report, data)
+
+    return {
+        "success": True,
+        "mode": "changes",
+        "portfolio": portfolio,
+        "since": {
+            "trading_date": previous["trading_date"],
+            "created_at": previous["created_at"],
+        },
+        "changes": changes,
+        "partial": bool(missing),
+        "missing_sections": missing,
+        "instructions": "Summarize only these changes since the last report. If every list is empty, say nothing meaningful has changed. If missing_sections is not empty, say those sections could not be checked in time."
+    }
 
 
 async def generate_report(
-    session_state: dict
+    session_state: dict,
+    quick: bool = False,
+    include_summary: bool = False,
+    changes_only: bool = False,
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Generate a comprehensive market report.
     
-    This is a simplified version that returns the structure.
-    The actual orchestration of sub-agents happens via the main agent's LLM
-    using the AgentTools we've provided.
+    In the default mode this validates the request and returns the structure;
+    the actual orchestration of sub-agents happens via the main agent's LLM
+    using the AgentTools we've provided. In quick mode the report is rendered
+    directly from the data tools with a template. In changes mode only the
+    differences from the user's last archived report are returned.
     
     Args:
         session_state: Current session state containing portfolio
+        quick: Render the full report from a template instead of the sub-agents
+        include_summary: In quick mode, add a model-written executive summary
+        changes_only: Return only what changed since the last archived report
+        user_id: User the report is archived for
         
     Returns:
-        Dictionary with report structure
+        Dictionary with report structure, or the rendered report in quick mode
     """
     portfolio = session_state.get("portfolio", [])
     
@@ -31,6 +247,18 @@ async def generate_report(
             "report": None
         }
     
+    if changes_only:
+        if not user_id:
+            return {
+                "success": False,
+                "message": "Cannot report changes: no user to compare against, so there is no archived report.",
+                "report": None
+            }
+        return await changes_report(portfolio, user_id)
+
+    if quick:
+        return await quick_report(portfolio, include_summary, user_id)
+
     # The agent's LLM will handle calling the sub-agents through AgentTools
     # This function just validates and structures the request
     return {
@@ -0,0 +1,104 @@
+# ============================================================================
+# market_report_agent/tools/sector_tools.py
+# ============================================================================
+"""Portfolio sector exposure tools backed by the classification index"""
+
+import asyncio
+from collections import Counter
+from typing import Dict, Any
+
+from utils.bar_store import bar_cache
+from utils.constants import UNCLASSIFIED_SECTOR
+from utils.deadline import DeadlineExceeded, within_deadline
+from utils.sector_classification import classify_tickers
+
+
+async def get_portfolio_sector_exposure(session_state: dict) -> Dict[str, Any]:
+    """
+    Compute portfolio sector weights and sector-relative performance.
+
+    Holdings are equally weighted. Each ticker's 1-day and 1-week returns
+    are compared with the ETF of its GICS sector. Classification lookups
+    and bar downloads run in threads bounded by the report deadline.
+
+    Args:
+        session_state: Current session state containing portfolio
+
+    Returns:
+        Dictionary with sector weights and per-ticker relative performance
+    """
+    portfolio = session_state.get("portfolio", [])
+
+    if not portfolio:
+        return {
+            "success": False,
+            "message": "Your portfolio is empty",
+            "sector_weights": {},
+            "holdings": {}
+        }
+
+    try:
+        classifications = await within_deadline(asyncio.to_thread(classify_tickers, portfolio))
+    except DeadlineExceeded as e:
+        return {
+            "success": False,
+            "error": f"Sector classification timed out: {e}",
+            "sector_weights": {},
+            "holdings": {}
+        }
+
+    counts = Counter(c["sector"] for c in classifications.values())
+    sector_weights = {
+        sector: round(count / len(portfolio) * 100, 2)
+        for sector, count in counts.most_common()
+    }
+
+    etfs = sorted({c["etf"] for c in classifications.values() if c["etf"]})
+    symbols = list(dict.fromkeys(portfolio + etfs))
+    # 1-day and 1-week % changes of every symbol with at least two bars;
+    # recent listings are measured from their first close
+    performance = {}
+    try:
+        store = await within_deadline(asyncio.to_thread(bar_cache.get, symbols))
+        bars = store.snapshot(symbols, lookbacks=(1, 5))
+    except Exception as e:
+        performance_error = str(e)
+    else:
+        day_pct = (bars["close"] / bars["close_1"] - 1.0) * 100
+        week_pct = (bars["close"] / bars["close_5"] - 1.0) * 100
+        for i, symbol in enumerate(symbols):
+            if bars["bars"][i] >= 2:
+                performance[symbol] = (float(day_pct[i]), float(week_pct[i]))
+        performance_error = None if performance else "Insufficient trading data"
+
+    holdings = {}
+
+    for ticker, classification in classifications.items():
+        holding = {
+            "sector": classification["sector"],
+            "sector_etf": classification["etf"],
+        }
+        etf = classification["etf"]
+        if ticker in performance:
+            day, week = performance[ticker]
+            holding["day_change_pct"] = round(day, 2)
+            holding["week_change_pct"] = round(week, 2)
+            if etf in performance:
+                holding["day_vs_sector_pct"] = round(day - performance[etf][0], 2)
+                holding["week_vs_sector_pct"] = round(week - performance[etf][1], 2)
+        holdings[ticker] = holding
+
+    result = {
+        "success": True,
+        "sector_weights": sector_weights,
+        "holdings": holdings,
+        "unclassified": [t for t, c in classifications.items() if c["sector"] == UNCLASSIFIED_SECTOR],
+    }
+    if performance_error:
+        result["performance_error"] = performance_error
+    # Failed lookups come back unclassified without a timestamp; the next call retries them
+    failed = [t for t, c in classifications.items() if c["classified_at"] is None]
+    if failed:
+        result["classification_error"] = f"Sector lookup failed for {', '.join(failed)}"
+
+    return result
@@ -0,0 +1,223 @@
+# ============================================================================
+# market_report_agent/warm_start.py
+# ============================================================================
+"""
+Warm-start bundle and startup warm-up for new instances.
+
+deploy/deploy.py builds a bundle with the symbol universe, sector
+classifications and recent daily bars (sector ETFs included). At boot,
+warm_up() loads it, catches the bars up, creates the model clients and
+starts the compute workers, then sets the readiness signal, so the first
+report does not pay for all of that at once. Requests that arrive during a
+background warm-up wait for it (wait_for_warm_up) instead of racing it.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from utils.bar_store import BarStore, bar_cache
+from utils.compute_pool import start_pool
+from utils.constants import GICS_SECTORS
+from utils.deadline import report_deadline, within_deadline
+from utils.market_data import download_bars
+from utils.sector_classification import classify_tickers, preload_classifications
+from utils.session_storage import create_session_service
+from .tools.report_tools import genai_client
+
+WARM_START_DIR = os.path.join("data", "warm_start")
+# Seconds of boot time the bar refresh may take before serving stale bundle bars
+WARM_UP_BUDGET_S = float(os.getenv("WARM_UP_BUDGET_S", "30"))
+
+_ready = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def is_ready() -> bool:
+    """True once warm-up has completed; use as the readiness check."""
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """Block until warm-up completes; returns False on timeout."""
+    return _ready.wait(timeout)
+
+
+async def wait_for_warm_up(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    before_agent_callback that holds requests while a background warm-up
+    runs, for at most WARM_UP_BUDGET_S, so they do not race it for the same
+    bars and workers.
+    """
+    if _thread is not None and not _ready.is_set():
+        await asyncio.to_thread(_ready.wait, WARM_UP_BUDGET_S)
+    return None
+
+
+async def collect_universe(universe_path: Optional[str] = None) -> list[str]:
+    """
+    Symbols worth having warm: sector ETFs, every ticker held in a stored
+    session, and optionally a file with one ticker per line.
+    """
+    from .agent import market_report_agent
+
+    symbols = list(GICS_SECTORS.values())
+
+    session_service = create_session_service()
+    try:
+        response = await session_service.list_sessions(app_name=market_report_agent.name)
+        for session in response.sessions:
+            symbols += session.state.get("portfolio", [])
+    finally:
+        await session_service.close()
+
+    if universe_path:
+        with open(universe_path, "r") as f:
+            symbols += [line.strip().upper() for line in f if line.strip()]
+
+    return list(dict.fromkeys(symbols))
+
+
+def build_bundle(symbols: list[str], directory: str = WARM_START_DIR) -> dict:
+    """
+    Build the warm-start bundle for a symbol universe.
+
+    Args:
+        symbols: Symbol universe, sector ETFs included
+        directory: Output directory
+
+    Returns:
+        The bundle manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    classifications = classify_tickers(symbols)
+    with open(os.path.join(directory, "sector_classifications.json"), "w") as f:
+        json.dump(classifications, f, indent=2, sort_keys=True)
+
+    store = BarStore.from_frame(download_bars(symbols), symbols, loaded_on=datetime.now().strftime("%Y-%m-%d"))
+    store.save(os.path.join(directory, "bar_store"))
+
+    manifest = {
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "symbols": symbols,
+        "trading_date": str(store.dates[-1]) if len(store.dates) else None,
+        "bar_store_mb": round(store.nbytes / 1e6, 2),
+    }
+    # Written last: a bundle without a manifest is treated as absent
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_bundle(directory: str = WARM_START_DIR) -> Optional[dict]:
+    """
+    Load a warm-start bundle into the process caches.
+
+    Returns:
+        The bundle manifest, or None if there is no bundle
+    """
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    with open(os.path.join(directory, "sector_classifications.json"), "r") as f:
+        preload_classifications(json.load(f))
+    bar_cache.preload(BarStore.open(os.path.join(directory, "bar_store")))
+    return manifest
+
+
+def _agents(agent) -> list:
+    """The agent and every sub-agent reachable through its tools."""
+    found = [agent]
+    for tool in getattr(agent, "tools", []):
+        if hasattr(tool, "agent"):
+            found += _agents(tool.agent)
+    return found
+
+
+async def warm_up(directory: str = WARM_START_DIR, clients: bool = True) -> dict:
+    """
+    Prepare this instance for traffic and set the readiness signal.
+
+    Args:
+        directory: Warm-start bundle directory
+        clients: Create the model clients. ADK caches them per event loop,
+            so only do this on the loop that will serve requests.
+
+    Returns:
+        Timings of each warm-up step in milliseconds
+    """
+    from .agent import market_report_agent
+
+    timings = {}
+    start = time.perf_counter()
+
+    try:
+        manifest = await asyncio.to_thread(load_bundle, directory)
+    except Exception as e:
+        manifest = None
+        print(f"⚠️  Warm-start bundle not loaded: {e}")
+    timings["bundle_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    symbols = manifest["symbols"] if manifest else list(GICS_SECTORS.values())
+    step = time.perf_counter()
+    try:
+        # Merge recent bars into the bundle's; serve them as-is if this is slow.
+        # The cache does not hold its lock while downloading, so an abandoned
+        # refresh never blocks requests.
+        with report_deadline(WARM_UP_BUDGET_S):
+            await within_deadline(asyncio.to_thread(bar_cache.get, symbols))
+    except Exception as e:
+        print(f"⚠️  Bar refresh skipped during warm-up: {e}")
+    timings["bars_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    if clients:
+        step = time.perf_counter()
+        genai_client()
+        for agent in _agents(market_report_agent):
+            if isinstance(agent, LlmAgent):
+                # Gemini models create their client lazily on first access
+                getattr(agent.canonical_model, "api_client", None)
+        timings["model_clients_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    await asyncio.to_thread(start_pool)
+    timings["compute_pool_ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    _ready.set()
+    return timings
+
+
+def _background_warm_up(directory: str) -> None:
+    try:
+        # This thread's loop never serves requests, so model clients are
+        # left to the serving loop's first request
+        print(f"🔥 Warmed up: {asyncio.run(warm_up(directory, clients=False))}")
+    except Exception as e:
+        print(f"⚠️  Warm-up failed: {e}")
+    finally:
+        # Never hold traffic behind a failed warm-up
+        _ready.set()
+
+
+def start_warm_up(directory: str = WARM_START_DIR) -> None:
+    """
+    Run warm_up() in a background thread when the serving loop is not
+    available, e.g. at import time. Requests wait for it through
+    wait_for_warm_up.
+    """
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_background_warm_up, args=(directory,), name="warm-up", daemon=True)
+        _thread.start()
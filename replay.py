@@ -0,0 +1,120 @@
+# ============================================================================
+# replay.py - Historical report replay for backtesting
+# ============================================================================
+"""
+Replay the report inputs of a portfolio over a range of past dates.
+
+Every trading day in the range gets the structured data the report would
+have been built from on that day: the price updates, sector performance and
+holdings movers, in the same shape the tools return. All dates come out of
+one pass over the cached bar history instead of one tool call per date, so
+a year of replay takes about as long as a single report. News has no
+history and is not replayed.
+
+Each output line is one date:
+    {"date": "2026-03-02", "prices": {...}, "sectors": {...}, "movers": [...]}
+
+Usage:
+    python replay.py AAPL MSFT NVDA --start 2026-01-02 --end 2026-06-30 \\
+        --output replay.jsonl --thresholds 1 2 3
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from market_report_agent.sub_agents.price_update_agent.agent import price_updates_from_bars
+from market_report_agent.sub_agents.sector_performance_agent.agent import sector_performance_from_bars
+from market_report_agent.tools.report_templates import select_movers
+from utils.bar_store import bar_cache, history_start
+from utils.constants import GICS_SECTORS, MOVER_THRESHOLD_PCT
+
+
+def _column(bars: dict, j: int) -> dict:
+    """Snapshot-shaped arrays for the j-th date of a history() result."""
+    return {key: values[:, j] for key, values in bars.items() if key != "dates"}
+
+
+def replay(
+    tickers: list[str],
+    start: str,
+    end: str,
+    mover_threshold_pct: float = MOVER_THRESHOLD_PCT
+) -> list[dict]:
+    """
+    Structured report inputs for every trading day from `start` to `end`.
+
+    Args:
+        tickers: Portfolio ticker symbols
+        start: First date to replay (YYYY-MM-DD)
+        end: Last date to replay (YYYY-MM-DD)
+        mover_threshold_pct: Minimum absolute daily % change for a mover
+
+    Returns:
+        One dictionary per trading day with date, prices, sectors and movers
+    """
+    etfs = list(GICS_SECTORS.values())
+    store = bar_cache.get(list(dict.fromkeys(tickers + etfs)), history_from=history_start(start))
+    prices = store.history(tickers, start, end, lookbacks=(1, 5))
+    sectors = store.history(etfs, start, end, lookbacks=(1,))
+
+    days = []
+    for j, date in enumerate(prices["dates"]):
+        day_prices = price_updates_from_bars(tickers, _column(prices, j))
+        days.append({
+            "date": str(date),
+            "prices": day_prices,
+            "sectors": sector_performance_from_bars(_column(sectors, j), str(date)),
+            "movers": [ticker for ticker, _ in select_movers(day_prices, mover_threshold_pct)],
+        })
+    return days
+
+
+def mover_counts(days: list[dict], thresholds: list[float]) -> dict[float, float]:
+    """Average number of movers per day for each candidate threshold."""
+    if not days:
+        return {threshold: 0.0 for threshold in thresholds}
+    return {
+        threshold: sum(len(select_movers(day["prices"], threshold)) for day in days) / len(days)
+        for threshold in thresholds
+    }
+
+
+def main():
+    """Command line entry point for historical replay."""
+    parser = argparse.ArgumentParser(description="Replay report inputs over past dates")
+    parser.add_argument("tickers", nargs="+", help="Portfolio ticker symbols")
+    parser.add_argument("--start", required=True, help="First date to replay (YYYY-MM-DD)")
+    parser.add_argument("--end", default=datetime.now().strftime("%Y-%m-%d"), help="Last date to replay (YYYY-MM-DD)")
+    parser.add_argument("--output", help="JSONL file to write one line per date to")
+    parser.add_argument("--threshold", type=float, default=MOVER_THRESHOLD_PCT, help="Mover threshold in %% for the output")
+    parser.add_argument("--thresholds", type=float, nargs="*", default=[], help="Other mover thresholds to compare")
+    args = parser.parse_args()
+
+    tickers = list(dict.fromkeys(t.upper().strip() for t in args.tickers))
+    for date in (args.start, args.end):
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            parser.error(f"Invalid date '{date}', expected YYYY-MM-DD")
+
+    print("🚀 MarketReportAgent Historical Replay")
+    print("=" * 60)
+    started = time.perf_counter()
+    days = replay(tickers, args.start, args.end, args.threshold)
+    print(f"✅ Replayed {len(days)} trading day(s) in {time.perf_counter() - started:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as out:
+            for day in days:
+                out.write(json.dumps(day) + "\n")
+        print(f"📂 Wrote {args.output}")
+
+    print("=" * 60)
+    thresholds = list(dict.fromkeys([args.threshold] + args.thresholds))
+    for threshold, average in mover_counts(days, thresholds).items():
+        print(f"movers/day at {threshold:.1f}%: {average:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# ============================================================================
+# tests/conftest.py
+# ============================================================================
+"""Shared fixtures: synthetic market data, no network access"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.bar_store import BarStore
+from utils.constants import GICS_SECTORS
+
+
+def bar_frame(symbols: list[str], start: str, end: str, seed: int = 7) -> pd.DataFrame:
+    """Daily bars shaped like a yfinance download grouped by column."""
+    dates = pd.bdate_range(start, end)
+    rng = np.random.default_rng(seed)
+    close = pd.DataFrame(
+        100 * np.exp(rng.normal(0, 0.01, (len(dates), len(symbols))).cumsum(axis=0)),
+        index=dates, columns=symbols,
+    )
+    volume = pd.DataFrame(rng.integers(1_000, 10_000, close.shape), index=dates, columns=symbols)
+    return pd.concat({
+        "Close": close,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Volume": volume,
+    }, axis=1)
+
+
+def masked(frame: pd.DataFrame, drop: pd.DataFrame) -> pd.DataFrame:
+    """Copy of a bar frame with the bars where `drop` is True missing."""
+    return pd.concat({
+        field: frame[field].where(~drop) for field in ("Close", "High", "Low", "Volume")
+    }, axis=1)
+
+
+@pytest.fixture
+def make_store():
+    """Build a BarStore from synthetic bars; `drop(close)` picks bars to leave out."""
+
+    def make(symbols: list[str], start: str, end: str, drop=None, seed: int = 7) -> BarStore:
+        frame = bar_frame(symbols, start, end, seed)
+        if drop is not None:
+            frame = masked(frame, drop(frame["Close"]))
+        return BarStore.from_frame(frame, symbols)
+
+    return make
+
+
+def inputs_for(day_changes: dict, sector_changes: dict, headlines: list[str]) -> dict:
+    """Report inputs shaped like gather_report_data() output."""
+    sectors = {
+        name: {"etf": etf, "day_change_pct": sector_changes.get(name, 0.0)}
+        for name, etf in GICS_SECTORS.items()
+    }
+    ordered = sorted(sectors, key=lambda name: sectors[name]["day_change_pct"], reverse=True)
+    return {
+        "prices": {
+            ticker: {
+                "symbol": ticker,
+                "current_price": 100.0,
+                "day_change_pct": change,
+                "week_change_pct": change,
+                "high_52w": 120.0,
+                "low_52w": 80.0,
+                "current_date": "2026-03-02",
+            }
+            for ticker, change in day_changes.items()
+        },
+        "sectors": {
+            "all_sectors": sectors,
+            "leaders": {name: sectors[name] for name in ordered[:2]},
+            "laggards": {name: sectors[name] for name in ordered[-2:]},
+            "trading_date": "2026-03-02",
+        },
+        "portfolio_news": {ticker: {"articles": []} for ticker in day_changes},
+        "general_news": {"general_news": [{"title": title} for title in headlines]},
+    }
+
+
+@pytest.fixture
+def report_inputs():
+    """Build report inputs from day changes, sector changes and headlines."""
+    return inputs_for
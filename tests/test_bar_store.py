@@ -0,0 +1,65 @@
+# ============================================================================
+# tests/test_bar_store.py
+# ============================================================================
+"""BarStore reads: snapshots, filled close histories and as-of-date history"""
+import numpy as np
+import pytest
+
+from utils.bar_store import BarStore
+
+SYMBOLS = ["AAA", "BBB", "NEW", "GAP"]
+LOOKBACKS = (1, 5, 21)
+
+
+@pytest.fixture
+def store(make_store) -> BarStore:
+    """Two years of synthetic bars with a late listing and missing bars."""
+
+    def drop(close):
+        missing = close.isna()
+        # Listed a third of the way in, and a symbol with scattered missing bars
+        missing.loc[:close.index[len(close) // 3], "NEW"] = True
+        gaps = np.random.default_rng(7).choice(len(close), 60, replace=False)
+        missing.loc[close.index[gaps], "GAP"] = True
+        return missing
+
+    return make_store(SYMBOLS, "2024-01-02", "2025-12-31", drop=drop)
+
+
+def test_snapshot_reads_the_latest_bars(store):
+    snapshot = store.snapshot(["AAA", "UNKNOWN"], lookbacks=(1, 5))
+    close = store.close[0].astype(np.float64)
+
+    np.testing.assert_allclose(snapshot["close"][0], close[-1])
+    np.testing.assert_allclose(snapshot["close_5"][0], close[-6])
+    assert snapshot["bars"][1] == 0 and np.isnan(snapshot["close"][1])
+
+
+def test_closes_fill_gaps_and_leading_history(store):
+    closes = store.closes(["NEW", "GAP", "UNKNOWN"], sessions=300)
+
+    assert closes.shape == (300, 3)
+    # Gaps and the days before the listing are filled, unknown symbols are not
+    assert not np.isnan(closes[:, :2]).any()
+    assert np.isnan(closes[:, 2]).all()
+    latest = store.snapshot(["NEW", "GAP"])["close"]
+    np.testing.assert_allclose(closes[-1, :2], latest)
+
+
+def test_history_matches_snapshot_on_every_date(store):
+    symbols = SYMBOLS + ["UNKNOWN"]
+    history = store.history(symbols, "2024-03-01", "2025-12-31", lookbacks=LOOKBACKS)
+    assert len(history["dates"]) > 400
+
+    for j, date in enumerate(history["dates"]):
+        snapshot = store.snapshot(symbols, lookbacks=LOOKBACKS, as_of=str(date))
+        has_bars = snapshot["bars"] > 0
+        np.testing.assert_array_equal(history["bars"][:, j], snapshot["bars"], err_msg=str(date))
+        for key, expected in snapshot.items():
+            if key == "bars":
+                continue
+            actual = history[key][:, j]
+            if expected.dtype.kind == "f":
+                np.testing.assert_allclose(actual, expected, equal_nan=True, err_msg=f"{key} on {date}")
+            else:
+                np.testing.assert_array_equal(actual[has_bars], expected[has_bars], err_msg=f"{key} on {date}")
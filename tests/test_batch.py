@@ -0,0 +1,41 @@
+# ============================================================================
+# tests/test_batch.py
+# ============================================================================
+"""Batch runs: only complete reports count as done"""
+import asyncio
+import json
+import os
+
+import batch
+
+
+def test_incomplete_reports_are_retried(tmp_path, monkeypatch, report_inputs):
+    input_path = os.path.join(tmp_path, "portfolios.jsonl")
+    output_path = os.path.join(tmp_path, "reports.jsonl")
+    with open(input_path, "w") as f:
+        for portfolio_id, tickers in (("complete", ["AAPL"]), ("no_price", ["AAPL", "DELISTED"])):
+            f.write(json.dumps({"portfolio_id": portfolio_id, "tickers": tickers}) + "\n")
+
+    data = report_inputs({"AAPL": 1.0}, {}, ["Fed holds rates"])
+    fetched = []
+
+    async def gather_report_data(tickers):
+        fetched.append(tickers)
+        return data
+
+    monkeypatch.setattr(batch, "gather_report_data", gather_report_data)
+
+    first = asyncio.run(batch.run_batch(input_path, output_path))
+    assert (first["generated"], first["partial"], first["failed"]) == (1, 1, 0)
+    with open(output_path) as f:
+        records = {r["portfolio_id"]: r for r in map(json.loads, f)}
+    assert records["no_price"]["missing"] == ["prices"] and not records["no_price"]["success"]
+
+    # The resumed run regenerates only the partial report; a failed sector section keeps it partial
+    data["sectors"] = {"all_sectors": {}, "leaders": {}, "laggards": {}, "error": "timeout"}
+    second = asyncio.run(batch.run_batch(input_path, output_path))
+    assert fetched[-1] == ["AAPL", "DELISTED"]
+    assert (second["generated"], second["partial"]) == (0, 1)
+    with open(output_path) as f:
+        last = [json.loads(line) for line in f][-1]
+    assert last["missing"] == ["prices", "sectors"]
@@ -0,0 +1,86 @@
+# ============================================================================
+# tests/test_compaction.py
+# ============================================================================
+"""History compaction of old tool results in the root agent's requests"""
+from types import SimpleNamespace
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from market_report_agent import compaction
+from market_report_agent.compaction import (
+    COMPACTION_TOKEN_THRESHOLD,
+    KEEP_RECENT_CONTENTS,
+    MAX_STRING_CHARS,
+    compact_history,
+    estimate_tokens,
+)
+
+
+def tool_turn(index: int, report_chars: int) -> list[types.Content]:
+    """A tool call and its large result, as they appear in the model history."""
+    return [
+        types.Content(role="model", parts=[types.Part(
+            function_call=types.FunctionCall(id=f"call_{index}", name="generate_report_tool", args={})
+        )]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id=f"call_{index}",
+            name="generate_report_tool",
+            response={
+                "success": True,
+                "report": "x" * report_chars,
+                "portfolio": ["AAPL", "MSFT", "XOM"],
+                "data": {"prices": {"AAPL": {"current_price": 100.0}}},
+            },
+        ))]),
+    ]
+
+
+def history(turns: int, report_chars: int) -> list[types.Content]:
+    return [content for i in range(turns) for content in tool_turn(i, report_chars)]
+
+
+def run_callback(contents: list[types.Content]) -> LlmRequest:
+    request = LlmRequest(contents=contents)
+    compact_history(SimpleNamespace(invocation_id="inv"), request)
+    return request
+
+
+def test_small_histories_are_sent_verbatim(monkeypatch):
+    monkeypatch.setattr(compaction, "compaction_metrics", compaction.CompactionMetrics())
+    contents = history(2, 100)
+    assert run_callback(contents).contents == contents
+    assert compaction.compaction_metrics.summary()["compacted_calls"] == 0
+
+
+def test_old_tool_results_are_summarized(monkeypatch):
+    monkeypatch.setattr(compaction, "compaction_metrics", compaction.CompactionMetrics())
+    contents = history(6, 8000)
+    assert estimate_tokens(contents) > COMPACTION_TOKEN_THRESHOLD
+
+    request = run_callback(contents)
+    cutoff = len(contents) - KEEP_RECENT_CONTENTS
+    # The recent window is untouched, calls and ids are kept
+    assert request.contents[cutoff:] == contents[cutoff:]
+    assert [c.parts[0].function_call for c in request.contents[:cutoff:2]] == \
+           [c.parts[0].function_call for c in contents[:cutoff:2]]
+
+    old = request.contents[1].parts[0].function_response
+    assert old.id == "call_0"
+    assert old.response["compacted"] is True
+    assert old.response["portfolio"] == "3 ticker(s)"
+    assert len(old.response["report"]) < MAX_STRING_CHARS + 40
+    assert old.response["data"] == {"keys": ["prices"], "size": 1}
+
+    summary = compaction.compaction_metrics.summary()
+    assert summary["compacted_calls"] == 1
+    assert summary["avg_tokens_after"] < summary["avg_tokens_before"]
+    # Session events are not touched, only the request
+    assert contents[1].parts[0].function_response.response["portfolio"] == ["AAPL", "MSFT", "XOM"]
+
+
+def test_compacted_results_are_not_summarized_again(monkeypatch):
+    monkeypatch.setattr(compaction, "compaction_metrics", compaction.CompactionMetrics())
+    once = run_callback(history(6, 8000)).contents
+    twice = run_callback(once + history(1, 8000)).contents
+    assert twice[1] == once[1]
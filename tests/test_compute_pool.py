@@ -0,0 +1,57 @@
+# ============================================================================
+# tests/test_compute_pool.py
+# ============================================================================
+"""Indicator computation in-process, in threads and in the worker pool"""
+import asyncio
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from utils import compute_pool
+
+
+def closes(days: int, symbols: int) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    return 100 * np.exp(rng.normal(0, 0.01, (days, symbols)).cumsum(axis=0))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A two-worker pool, shut down after the test."""
+    monkeypatch.setattr(compute_pool, "COMPUTE_WORKERS", 2)
+    monkeypatch.setattr(compute_pool, "_pool", None)
+    yield
+    compute_pool.shutdown_pool()
+
+
+def test_small_inputs_run_in_a_thread(monkeypatch):
+    small = closes(60, 5)
+    monkeypatch.setattr(compute_pool, "_submit", lambda closes: pytest.fail("small input sent to the pool"))
+    result = asyncio.run(compute_pool.compute_indicators_async(small))
+    assert result == compute_pool.compute_indicators(small)
+
+
+def test_large_inputs_match_in_process_results(pool):
+    large = closes(300, 200)
+    assert large.size >= compute_pool.POOL_MIN_CELLS
+    expected = compute_pool.compute_indicators(large)
+
+    assert asyncio.run(compute_pool.compute_indicators_async(large)) == expected
+    assert compute_pool.compute_indicators_in_pool(large) == expected
+
+
+def test_shared_memory_outlives_running_slices():
+    shm = shared_memory.SharedMemory(create=True, size=8)
+    queued, running = Future(), Future()
+    running.set_running_or_notify_cancel()
+
+    compute_pool._release_when_done(shm, [queued, running])
+    # The running slice can still attach; the queued one never will
+    assert queued.cancelled()
+    shared_memory.SharedMemory(name=shm.name).close()
+
+    running.set_result([])
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shm.name)
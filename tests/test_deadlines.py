@@ -0,0 +1,88 @@
+# ============================================================================
+# tests/test_deadlines.py
+# ============================================================================
+"""Per-turn latency budget: fetch timeouts, cancellation and model calls"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from market_report_agent.deadlines import DEADLINE_STATE_KEY, OUT_OF_TIME_MESSAGE, enforce_turn_deadline
+from utils.deadline import (
+    FETCH_TIMEOUT_S,
+    MIN_FETCH_TIMEOUT_S,
+    DeadlineExceeded,
+    deadline_scope,
+    fetch_timeout,
+    new_deadline,
+    within_deadline,
+)
+
+
+def callback_context(deadline):
+    return SimpleNamespace(state={DEADLINE_STATE_KEY: deadline}, agent_name="market_report_agent")
+
+
+def llm_request(timeout_ms=None) -> LlmRequest:
+    return LlmRequest(config=types.GenerateContentConfig(http_options=types.HttpOptions(timeout=timeout_ms)))
+
+
+def test_fetch_timeout_is_capped_by_the_deadline():
+    assert fetch_timeout() == FETCH_TIMEOUT_S
+    with deadline_scope(new_deadline(3)):
+        assert 2 < fetch_timeout() <= 3
+        # An inner, later deadline does not extend the enclosing one
+        with deadline_scope(new_deadline(30)):
+            assert fetch_timeout() <= 3
+    with deadline_scope(new_deadline(-1)):
+        assert fetch_timeout() == MIN_FETCH_TIMEOUT_S
+
+
+def test_within_deadline_cancels_slow_work():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        with deadline_scope(new_deadline(0.05)):
+            await within_deadline(slow())
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+    assert cancelled == [True]
+
+
+def test_model_call_skipped_once_the_budget_is_spent():
+    request = llm_request()
+    response = enforce_turn_deadline(callback_context(time.monotonic() - 1), request)
+    assert response.content.parts[0].text == OUT_OF_TIME_MESSAGE
+    assert request.config.http_options.timeout is None
+
+
+@pytest.mark.parametrize("configured_ms, left_s, expected_ms", [
+    (None, 5, 5_000),
+    (120_000, 5, 5_000),
+    # A tighter configured timeout is kept
+    (2_000, 5, 2_000),
+    # Nearly out of time still leaves the minimum
+    (None, 0.01, int(MIN_FETCH_TIMEOUT_S * 1000)),
+])
+def test_model_call_timeout_is_capped(monkeypatch, configured_ms, left_s, expected_ms):
+    monkeypatch.setattr(time, "monotonic", lambda: 1000.0)
+    request = llm_request(configured_ms)
+    assert enforce_turn_deadline(callback_context(1000.0 + left_s), request) is None
+    assert request.config.http_options.timeout == expected_ms
+
+
+def test_no_deadline_leaves_the_request_alone():
+    request = llm_request(120_000)
+    assert enforce_turn_deadline(SimpleNamespace(state={}, agent_name="root"), request) is None
+    assert request.config.http_options.timeout == 120_000
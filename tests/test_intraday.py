@@ -0,0 +1,105 @@
+# ============================================================================
+# tests/test_intraday.py
+# ============================================================================
+"""Minute-bar rings: wrap-around, session aggregates and incremental refresh"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import intraday
+from utils.intraday import IntradayStore, MinuteBarRing
+
+
+def minute_bars(start: str, minutes: int, first_close: float = 100.0) -> pd.DataFrame:
+    """Minute bars in New York time, shaped like one ticker of a yfinance download."""
+    index = pd.date_range(start, periods=minutes, freq="min", tz="America/New_York")
+    close = first_close + np.arange(minutes, dtype=np.float64)
+    return pd.DataFrame({
+        "Open": close - 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": np.full(minutes, 100, dtype=np.int64),
+    }, index=index)
+
+
+def extend(ring: MinuteBarRing, bars: pd.DataFrame, session_date: str = "2026-03-02") -> None:
+    ring.extend(
+        bars.index.as_unit("s").asi8, session_date,
+        bars["High"].to_numpy(), bars["Low"].to_numpy(), bars["Close"].to_numpy(),
+        bars["Volume"].to_numpy(), bars["Open"].to_numpy(),
+    )
+
+
+def ring_closes(ring: MinuteBarRing) -> list[float]:
+    """Closes held by the ring, oldest first."""
+    slots = (ring.head - ring.size + np.arange(ring.size)) % ring.capacity
+    return ring.closes[slots].tolist()
+
+
+def test_extend_wraps_and_keeps_session_aggregates():
+    bars = minute_bars("2026-03-02 09:30", 7)
+    ring = MinuteBarRing(capacity=5)
+    extend(ring, bars.iloc[:3])
+    # Overlapping bars are ignored; the ring wraps and keeps the newest five
+    extend(ring, bars.iloc[1:])
+
+    assert ring.size == 5
+    assert ring_closes(ring) == bars["Close"].iloc[-5:].tolist()
+    latest = ring.latest()
+    assert latest["price"] == 106.0
+    assert latest["session_open"] == 99.5
+    assert (latest["session_low"], latest["session_high"]) == (99.0, 107.0)
+    assert latest["session_volume"] == 700
+    assert latest["vwap"] == pytest.approx(bars["Close"].mean())
+
+    # More bars than the capacity in one slice
+    extend(ring, minute_bars("2026-03-02 09:37", 12, first_close=107.0))
+    assert ring_closes(ring) == [114.0, 115.0, 116.0, 117.0, 118.0]
+    assert ring.latest()["session_volume"] == 1900
+
+    # A new session starts the ring over
+    extend(ring, minute_bars("2026-03-03 09:30", 2, first_close=50.0), session_date="2026-03-03")
+    assert ring_closes(ring) == [50.0, 51.0]
+    assert ring.latest()["session_open"] == 49.5
+
+
+def test_refresh_catches_up_from_the_newest_bar(monkeypatch):
+    day = {"AAPL": minute_bars("2026-03-02 09:30", 30), "MSFT": minute_bars("2026-03-02 09:30", 30, 300.0)}
+    downloads = []
+    now = [day["AAPL"].index[9].timestamp() + 30]
+
+    def download(symbols, **kwargs):
+        downloads.append(kwargs)
+        cutoff = pd.Timestamp(now[0], unit="s", tz="UTC")
+        start = kwargs.get("start")
+        frames = {}
+        for symbol in symbols:
+            bars = day[symbol][day[symbol].index <= cutoff]
+            if start is not None:
+                bars = bars[bars.index >= pd.Timestamp(start)]
+            frames[symbol] = bars
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(intraday.yf, "download", download)
+    monkeypatch.setattr(intraday.time, "time", lambda: now[0])
+    store = IntradayStore(refresh_interval_s=60)
+
+    store.refresh(["AAPL", "MSFT"])
+    assert "period" in downloads[0] and "start" not in downloads[0]
+    assert store.latest("AAPL")["bars"] == 10
+
+    # Within the refresh interval nothing is fetched
+    store.refresh(["AAPL"])
+    assert len(downloads) == 1
+
+    now[0] += 600
+    store.refresh(["AAPL", "MSFT"])
+    # Starts at the newest bar held, which comes back again and is not counted twice
+    assert pd.Timestamp(downloads[1]["start"]) == day["AAPL"].index[9]
+    latest = store.latest("AAPL")
+    assert latest["bars"] == 20
+    assert latest["session_volume"] == 2000
+    assert latest["price"] == 119.0
+    assert store.latest("MSFT")["price"] == 319.0
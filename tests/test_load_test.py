@@ -0,0 +1,20 @@
+# ============================================================================
+# tests/test_load_test.py
+# ============================================================================
+"""The load test's throwaway working directory"""
+import os
+
+import pytest
+
+from benchmarks.load_test import isolate_data_dir
+
+
+def test_data_dir_is_removed_and_cwd_restored():
+    cwd = os.getcwd()
+    with pytest.raises(RuntimeError):
+        with isolate_data_dir() as root:
+            assert os.getcwd() == os.path.realpath(root)
+            os.makedirs("data")
+            raise RuntimeError("run failed")
+    assert os.getcwd() == cwd
+    assert not os.path.exists(root)
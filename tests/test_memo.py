@@ -0,0 +1,98 @@
+# ============================================================================
+# tests/test_memo.py
+# ============================================================================
+"""Tool memo hits, invalidation and the calls it must never replay"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import market_report_agent.agent as agent_module
+from market_report_agent.memo import ToolMemo, bump_portfolio_version
+from market_report_agent.tools.sector_tools import get_portfolio_sector_exposure
+
+
+def tool_context(state: dict, session_id: str = "s1") -> SimpleNamespace:
+    """Just enough of a ToolContext for the memo and the report tool."""
+    return SimpleNamespace(
+        session=SimpleNamespace(app_name="app", user_id="u1", id=session_id),
+        state=state,
+        user_id="u1",
+        actions=SimpleNamespace(skip_summarization=None),
+    )
+
+
+def test_repeat_call_hits_until_portfolio_changes():
+    memo = ToolMemo()
+    state = {"portfolio": ["AAPL"]}
+    context = tool_context(state)
+
+    assert memo.get(context, "list_tickers", {}) is None
+    memo.put(context, "list_tickers", {}, {"success": True, "portfolio": ["AAPL"]})
+    assert memo.get(context, "list_tickers", {}) == {"success": True, "portfolio": ["AAPL"]}
+
+    bump_portfolio_version(state)
+    assert memo.get(context, "list_tickers", {}) is None
+    assert memo.hits["list_tickers"] == 1 and memo.misses["list_tickers"] == 2
+
+
+def test_entries_are_per_session_and_copied():
+    memo = ToolMemo()
+    context = tool_context({})
+    memo.put(context, "portfolio_sector_exposure", {}, {"weights": {"Energy": 1.0}})
+
+    assert memo.get(tool_context({}, session_id="s2"), "portfolio_sector_exposure", {}) is None
+    memo.get(context, "portfolio_sector_exposure", {})["weights"]["Energy"] = 0.0
+    assert memo.get(context, "portfolio_sector_exposure", {}) == {"weights": {"Energy": 1.0}}
+
+
+def test_expired_and_failed_results_are_recomputed(monkeypatch):
+    memo = ToolMemo(ttl_s=10)
+    context = tool_context({})
+    now = [1000.0]
+    monkeypatch.setattr("market_report_agent.memo.time.monotonic", lambda: now[0])
+
+    memo.put(context, "price_update_agent", {"request": "AAPL"}, "AAPL is up 1%")
+    now[0] += 11
+    assert memo.get(context, "price_update_agent", {"request": "AAPL"}) is None
+
+    for failed in ("UNAVAILABLE: timed out", {"success": False}, {"partial": True}, {"error": "x"}):
+        memo.put(context, "generate_report", {}, failed)
+        assert memo.get(context, "generate_report", {}) is None
+
+
+@pytest.mark.parametrize("degraded", [
+    {"performance_error": "Insufficient trading data"},
+    {"classification_error": "Sector lookup failed for XYZ"},
+])
+def test_degraded_sector_exposure_is_recomputed(monkeypatch, degraded):
+    monkeypatch.setattr("market_report_agent.tools.sector_tools.classify_tickers", lambda tickers: {
+        "AAPL": {"sector": "Information Technology", "etf": "XLK", "classified_at": "2026-01-01T00:00:00"},
+        "XYZ": {"sector": "Unclassified", "etf": None, "classified_at": None},
+    })
+    monkeypatch.setattr("market_report_agent.tools.sector_tools.bar_cache.get", lambda symbols: 1 / 0)
+    result = asyncio.run(get_portfolio_sector_exposure({"portfolio": ["AAPL", "XYZ"]}))
+    assert result["success"] and result["performance_error"] and result["classification_error"]
+
+    memo = ToolMemo()
+    context = tool_context({})
+    memo.put(context, "portfolio_sector_exposure", {}, {"success": True, **degraded})
+    assert memo.get(context, "portfolio_sector_exposure", {}) is None
+
+
+@pytest.mark.parametrize("args", [{"changes_only": True}, {"quick": True}])
+def test_archive_backed_reports_bypass_the_memo(monkeypatch, args):
+    calls = []
+
+    async def fake_generate_report(session_state, quick, include_summary, changes_only, user_id):
+        calls.append((quick, changes_only))
+        return {"success": True, "mode": "changes" if changes_only else "quick", "report": "r"}
+
+    monkeypatch.setattr(agent_module, "generate_report", fake_generate_report)
+    monkeypatch.setattr(agent_module, "tool_memo", ToolMemo())
+    context = tool_context({"portfolio": ["AAPL"]})
+
+    for _ in range(2):
+        asyncio.run(agent_module.generate_report_tool(context, **args))
+    assert len(calls) == 2
+    assert agent_module.tool_memo.summary() == {"tool_calls": 0}
@@ -0,0 +1,66 @@
+# ============================================================================
+# tests/test_monitor.py
+# ============================================================================
+"""Watchlist monitor: index freshness and the vectorized threshold pass"""
+import asyncio
+import os
+
+import pandas as pd
+from google.adk.events import Event, EventActions
+
+from market_report_agent import monitor as monitor_module
+from market_report_agent.monitor import WatchlistMonitor
+from utils.session_storage import create_session_service
+
+APP_NAME = "test_monitor"
+
+
+def closes_frame(day_changes: dict, date: str = "2026-03-02") -> pd.DataFrame:
+    """Two daily closes per ticker with the given % change on the last day."""
+    index = pd.to_datetime([pd.Timestamp(date) - pd.Timedelta(days=1), pd.Timestamp(date)])
+    return pd.DataFrame({t: [100.0, 100.0 * (1 + pct / 100)] for t, pct in day_changes.items()}, index=index)
+
+
+async def set_state(service, session, state: dict) -> None:
+    await service.append_event(session, Event(author="user", actions=EventActions(state_delta=state)))
+
+
+def test_alerts_follow_unflushed_thresholds(tmp_path, monkeypatch):
+    db_path = os.path.join(tmp_path, "sessions.db")
+    prices = [closes_frame({"AAPL": 3.0, "MSFT": -1.0})]
+    monkeypatch.setattr(monitor_module, "download_closes", lambda symbols, period: prices[0][symbols])
+    now = [1000.0]
+    monkeypatch.setattr(monitor_module.time, "monotonic", lambda: now[0])
+
+    async def run():
+        service = create_session_service(db_path, write_behind=True)
+        # A long flush interval: only an explicit flush writes these changes
+        service.flush_interval_s = 3600
+        first = await service.create_session(app_name=APP_NAME, user_id="u1")
+        second = await service.create_session(app_name=APP_NAME, user_id="u2")
+        await set_state(service, first, {"portfolio": ["AAPL", "MSFT"]})
+        await set_state(service, second, {"portfolio": ["AAPL", "MSFT"], "alert_rules": {"AAPL": 5.0, "MSFT": 0.5}})
+
+        monitor = WatchlistMonitor(service, APP_NAME, index_refresh_s=300)
+        first_poll = await monitor.poll_once()
+        alerts = [monitor.notifications.get_nowait() for _ in range(first_poll)]
+        # Alerts fire once per trading date and direction
+        repeat_poll = await monitor.poll_once()
+
+        # A rule change reaches the monitor at the next index refresh
+        await set_state(service, first, {"alert_rules": {"default": 0.5}})
+        now[0] += 301
+        prices[0] = closes_frame({"AAPL": 3.0, "MSFT": -1.0}, date="2026-03-03")
+        refreshed = await monitor.poll_once()
+        later = [monitor.notifications.get_nowait() for _ in range(refreshed)]
+        await service.close()
+        return monitor, alerts, repeat_poll, later
+
+    monitor, alerts, repeat_poll, later = asyncio.run(run())
+    assert {ticker: sorted(user for user, _ in subscribers) for ticker, subscribers in monitor.index.items()} == {
+        "AAPL": ["u1", "u2"], "MSFT": ["u1", "u2"],
+    }
+    assert sorted((a["user_id"], a["ticker"]) for a in alerts) == [("u1", "AAPL"), ("u2", "MSFT")]
+    assert {a["ticker"]: a["day_change_pct"] for a in alerts} == {"AAPL": 3.0, "MSFT": -1.0}
+    assert repeat_poll == 0
+    assert sorted((a["user_id"], a["ticker"]) for a in later) == [("u1", "AAPL"), ("u1", "MSFT"), ("u2", "MSFT")]
@@ -0,0 +1,74 @@
+# ============================================================================
+# tests/test_quick_report.py
+# ============================================================================
+"""Quick reports rendered from tool outputs and shown without the model"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+import market_report_agent.agent as agent_module
+from main import final_response_text
+from market_report_agent.memo import ToolMemo
+from market_report_agent.tools import report_tools
+
+
+def tool_context(portfolio: list[str]) -> SimpleNamespace:
+    return SimpleNamespace(
+        session=SimpleNamespace(app_name="app", user_id="u1", id="s1"),
+        state={"portfolio": portfolio},
+        user_id="u1",
+        actions=SimpleNamespace(skip_summarization=None),
+    )
+
+
+@pytest.fixture
+def quick_inputs(monkeypatch, report_inputs):
+    """Serve fixed report inputs and record archived reports."""
+    inputs = report_inputs({"AAPL": 3.0, "MSFT": -0.5}, {"Energy": 2.0}, ["Fed holds rates"])
+    archived = []
+
+    async def gather_report_data(portfolio):
+        return inputs
+
+    monkeypatch.setattr(report_tools, "gather_report_data", gather_report_data)
+    monkeypatch.setattr(report_tools, "archive_report", lambda *args: archived.append(args))
+    monkeypatch.setattr(agent_module, "tool_memo", ToolMemo())
+    return inputs, archived
+
+
+def test_quick_report_is_returned_as_the_answer(quick_inputs):
+    _, archived = quick_inputs
+    context = tool_context(["AAPL", "MSFT"])
+    result = asyncio.run(agent_module.generate_report_tool(context, quick=True))
+
+    assert result["mode"] == "quick" and not result["partial"]
+    assert "## Portfolio Performance" in result["report"] and "AAPL" in result["report"]
+    assert "Partial report" not in result["report"]
+    assert context.actions.skip_summarization is True
+    assert [args[0] for args in archived] == ["u1"]
+
+    # The runner's final event carries the tool response, not model text
+    event = Event(author="market_report_agent", content=types.Content(role="user", parts=[types.Part(
+        function_response=types.FunctionResponse(name="generate_report_tool", response=result)
+    )]))
+    assert final_response_text(event) == result["report"]
+
+
+def test_partial_quick_report_is_flagged_and_not_archived(quick_inputs):
+    inputs, archived = quick_inputs
+    inputs["general_news"] = {"general_news": [], "error": "timed out", "unavailable": True}
+    result = asyncio.run(agent_module.generate_report_tool(tool_context(["AAPL"]), quick=True))
+
+    assert result["partial"] and result["missing_sections"] == ["general_news"]
+    assert "Partial report" in result["report"] and "General Market News" in result["report"]
+    assert archived == []
+
+
+def test_model_text_is_shown_as_is():
+    event = Event(author="market_report_agent", content=types.Content(
+        role="model", parts=[types.Part(text="Your portfolio "), types.Part(text="is up.")]
+    ))
+    assert final_response_text(event) == "Your portfolio is up."
@@ -0,0 +1,100 @@
+# ============================================================================
+# tests/test_report_changes.py
+# ============================================================================
+"""changes_only reports: the input diff and the archive baseline"""
+import asyncio
+import functools
+import os
+
+import pytest
+
+from market_report_agent.tools import report_tools
+from market_report_agent.tools.report_diff import diff_report_inputs
+from utils import report_archive
+
+
+@pytest.fixture
+def snapshots(report_inputs) -> tuple[dict, dict]:
+    """Inputs of two consecutive reports for the same portfolio."""
+    before = report_inputs(
+        {"AAPL": 3.0, "MSFT": 0.5, "XOM": -2.5},
+        {"Energy": 2.0, "Utilities": 1.5, "Financials": -1.0},
+        ["Fed holds rates"],
+    )
+    after = report_inputs(
+        {"AAPL": 3.5, "MSFT": 2.4, "XOM": 2.1, "NVDA": 0.1},
+        {"Energy": -2.0, "Utilities": 1.5, "Financials": 1.0},
+        ["Fed holds rates", "Oil slides"],
+    )
+    return before, after
+
+
+def test_diff_reports_only_meaningful_changes(snapshots):
+    changes = diff_report_inputs(*snapshots)
+
+    # MSFT is a new mover and XOM reversed; AAPL kept moving the same way
+    assert [m["ticker"] for m in changes["new_movers"]] == ["MSFT", "XOM"]
+    assert changes["new_movers"][1]["previous_day_change_pct"] == -2.5
+    assert {c["sector"] for c in changes["sector_rank_changes"]} >= {"Energy", "Financials"}
+    assert "Energy" in changes["new_laggards"]
+    assert changes["new_headlines"] == ["Oil slides"]
+    assert changes["added_tickers"] == ["NVDA"] and changes["removed_tickers"] == []
+
+
+def test_diff_of_identical_inputs_is_empty(snapshots):
+    changes = diff_report_inputs(snapshots[1], snapshots[1])
+    assert not any(changes.values())
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """Point the report tools at a temporary archive."""
+    path = os.path.join(tmp_path, "report_archive.db")
+    monkeypatch.setattr(report_tools, "archive_report", functools.partial(report_archive.archive_report, path=path))
+    monkeypatch.setattr(report_tools, "load_latest_report", functools.partial(report_archive.load_latest_report, path=path))
+    return path
+
+
+def serve(monkeypatch, inputs: dict) -> None:
+    async def gather_report_data(portfolio):
+        return inputs
+    monkeypatch.setattr(report_tools, "gather_report_data", gather_report_data)
+
+
+def test_changes_report_diffs_against_the_last_archived_report(archive, monkeypatch, snapshots):
+    before, after = snapshots
+    state = {"portfolio": ["AAPL", "MSFT", "XOM"]}
+
+    # No baseline yet: a full quick report is generated and archived
+    serve(monkeypatch, before)
+    first = asyncio.run(report_tools.generate_report(state, changes_only=True, user_id="u1"))
+    assert first["mode"] == "quick"
+    assert report_archive.load_latest_report("u1", archive)["inputs"] == before
+
+    serve(monkeypatch, after)
+    second = asyncio.run(report_tools.generate_report(state, changes_only=True, user_id="u1"))
+    assert second["mode"] == "changes"
+    assert second["changes"] == diff_report_inputs(before, after)
+
+    # The new snapshot is the baseline for the next comparison
+    third = asyncio.run(report_tools.generate_report(state, changes_only=True, user_id="u1"))
+    assert not any(third["changes"].values())
+
+
+def test_changes_only_requires_a_user(archive):
+    result = asyncio.run(report_tools.generate_report({"portfolio": ["AAPL"]}, changes_only=True))
+    assert result["success"] is False
+    assert not os.path.exists(archive)
+
+
+def test_archive_keeps_the_latest_reports_per_user(archive, monkeypatch):
+    monkeypatch.setattr(report_archive, "ARCHIVE_MAX_REPORTS_PER_USER", 2)
+    for day in range(1, 5):
+        report_archive.archive_report("u1", f"2026-03-0{day}", f"report {day}", {}, archive)
+    report_archive.archive_report("u2", "2026-03-01", "other", {}, archive)
+
+    assert report_archive.load_latest_report("u1", archive)["report"] == "report 4"
+    with report_archive._connect(archive) as conn:
+        kept = conn.execute("SELECT user_id, trading_date FROM reports ORDER BY id").fetchall()
+    conn.close()
+    assert kept == [("u1", "2026-03-03"), ("u1", "2026-03-04"), ("u2", "2026-03-01")]
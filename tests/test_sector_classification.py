@@ -0,0 +1,80 @@
+# ============================================================================
+# tests/test_sector_classification.py
+# ============================================================================
+"""Classification index: retries, lookup timeouts and atomic writes"""
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from market_report_agent.tools.sector_tools import get_portfolio_sector_exposure
+from utils import sector_classification
+from utils.constants import UNCLASSIFIED_SECTOR
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(sector_classification, "_indexes", {})
+    return os.path.join(tmp_path, "index", "sector_classifications.json")
+
+
+def test_failed_lookups_are_retried_not_stored(index_path, monkeypatch):
+    lookups = []
+
+    def lookup(ticker):
+        lookups.append(ticker)
+        return None if ticker == "FLAKY" else "Energy"
+
+    monkeypatch.setattr(sector_classification, "_lookup_sector", lookup)
+    first = sector_classification.classify_tickers(["xom", "FLAKY"], path=index_path)
+    assert first["XOM"]["etf"] == "XLE"
+    assert first["FLAKY"] == {"sector": UNCLASSIFIED_SECTOR, "etf": None, "classified_at": None}
+
+    sector_classification.classify_tickers(["XOM", "FLAKY"], path=index_path)
+    assert lookups == ["XOM", "FLAKY", "FLAKY"]
+    with open(index_path) as f:
+        assert set(json.load(f)) == {"XOM"}
+    # The index is replaced in one step, without leftover temp files
+    assert os.listdir(os.path.dirname(index_path)) == ["sector_classifications.json"]
+
+
+def test_slow_lookups_stop_at_the_fetch_timeout(index_path, monkeypatch):
+    def lookup(ticker):
+        if ticker == "SLOW":
+            time.sleep(1)
+        return "Energy"
+
+    monkeypatch.setattr(sector_classification, "_lookup_sector", lookup)
+    monkeypatch.setattr(sector_classification, "fetch_timeout", lambda: 0.1)
+    start = time.monotonic()
+    result = sector_classification.classify_tickers(["XOM", "SLOW"], path=index_path)
+    assert time.monotonic() - start < 0.5
+    assert result["XOM"]["sector"] == "Energy"
+    assert result["SLOW"]["classified_at"] is None
+
+
+def test_indexes_are_kept_per_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(sector_classification, "_indexes", {})
+    monkeypatch.setattr(sector_classification, "_lookup_sector", lambda ticker: "Utilities")
+    first, second = (os.path.join(tmp_path, name) for name in ("a.json", "b.json"))
+    sector_classification.classify_tickers(["NEE"], path=first)
+    assert "NEE" not in sector_classification._load_index(second)
+
+
+def test_exposure_weights_and_relative_performance(make_store, monkeypatch):
+    store = make_store(["XOM", "CVX", "AAPL", "XLE", "XLK"], "2026-01-02", "2026-03-31")
+    sectors = {"XOM": "Energy", "CVX": "Energy", "AAPL": "Information Technology"}
+    monkeypatch.setattr("market_report_agent.tools.sector_tools.classify_tickers", lambda tickers: {
+        t: {"sector": sectors[t], "etf": "XLE" if sectors[t] == "Energy" else "XLK", "classified_at": "2026-03-31"}
+        for t in tickers
+    })
+    monkeypatch.setattr("market_report_agent.tools.sector_tools.bar_cache.get", lambda symbols: store)
+
+    result = asyncio.run(get_portfolio_sector_exposure({"portfolio": ["XOM", "CVX", "AAPL"]}))
+    assert result["sector_weights"] == {"Energy": 66.67, "Information Technology": 33.33}
+    close = dict(zip(store.symbols, store.close[:, -1] / store.close[:, -2]))
+    expected = round(((close["XOM"] - 1) - (close["XLE"] - 1)) * 100, 2)
+    assert result["holdings"]["XOM"]["day_vs_sector_pct"] == pytest.approx(expected, abs=0.011)
+    assert "performance_error" not in result
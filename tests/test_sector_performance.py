@@ -0,0 +1,67 @@
+# ============================================================================
+# tests/test_sector_performance.py
+# ============================================================================
+"""Multi-horizon sector returns from one bar store snapshot"""
+import importlib
+
+import numpy as np
+import pytest
+
+from utils.constants import GICS_SECTORS, SECTOR_HORIZONS
+
+# The package re-exports the agent object under the module's name
+sector_agent = importlib.import_module("market_report_agent.sub_agents.sector_performance_agent.agent")
+ETFS = list(GICS_SECTORS.values())
+
+
+def test_horizon_returns_match_direct_computation(make_store):
+    store = make_store(ETFS, "2025-01-02", "2026-03-31")
+    returns, trading_date = sector_agent._horizon_returns(store, ETFS + ["NOBARS"])
+
+    close = store.close.astype(np.float64)
+    assert trading_date == str(store.dates[-1])
+    for horizon, days in SECTOR_HORIZONS.items():
+        expected = (close[:, -1] / close[:, -1 - days] - 1) * 100
+        np.testing.assert_allclose(returns.loc[horizon, ETFS], expected, err_msg=horizon)
+
+    # YTD is measured from the last close of the previous year
+    year_end = store.end_index("2025-12-31") - 1
+    np.testing.assert_allclose(returns.loc["YTD", ETFS], (close[:, -1] / close[:, year_end] - 1) * 100)
+    # A symbol without bars stays NaN instead of producing a bogus return
+    assert returns["NOBARS"].isna().all()
+
+
+def test_multi_horizon_result_expires(make_store, monkeypatch):
+    store = make_store(ETFS, "2025-01-02", "2026-03-31")
+    loads = []
+    now = [1000.0]
+
+    def get(symbols, history_from=None):
+        loads.append(symbols)
+        return store
+
+    monkeypatch.setattr(sector_agent.bar_cache, "get", get)
+    monkeypatch.setattr(sector_agent.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(sector_agent, "_horizon_cache", {})
+
+    first = sector_agent.get_multi_horizon_sector_performance()
+    assert set(first["horizons"]) == set(SECTOR_HORIZONS) | {"YTD"}
+    assert sector_agent.get_multi_horizon_sector_performance() is first
+    assert len(loads) == 1
+
+    now[0] += sector_agent.HORIZON_CACHE_TTL_S + 1
+    sector_agent.get_multi_horizon_sector_performance()
+    assert len(loads) == 2
+
+
+@pytest.mark.parametrize("horizon", ["1W", "3M"])
+def test_ranks_follow_returns(make_store, monkeypatch, horizon):
+    store = make_store(ETFS, "2025-01-02", "2026-03-31")
+    monkeypatch.setattr(sector_agent.bar_cache, "get", lambda symbols, history_from=None: store)
+    monkeypatch.setattr(sector_agent, "_horizon_cache", {})
+
+    result = sector_agent.get_multi_horizon_sector_performance()
+    returns = result["horizons"][horizon]["returns_pct"]
+    best = max(returns, key=returns.get)
+    assert result["ranks"][best][horizon] == 1
+    assert list(result["horizons"][horizon]["leaders"])[0] == best
@@ -0,0 +1,196 @@
+# ============================================================================
+# tests/test_session_storage.py
+# ============================================================================
+"""Durability of the batched and write-behind session services"""
+import asyncio
+import os
+
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+
+from utils.session_storage import TurnBatchingSessionService, create_session_service
+
+APP_NAME = "test_sessions"
+
+
+def make_turn(invocation_id: str, portfolio: list[str]) -> list[Event]:
+    """User message, a tool response carrying a state delta, and the final answer."""
+    return [
+        Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=types.Content(role="user", parts=[types.Part(text="Add a ticker")]),
+        ),
+        Event(
+            invocation_id=invocation_id,
+            author=APP_NAME,
+            content=types.Content(role="user", parts=[types.Part(
+                function_response=types.FunctionResponse(name="add_ticker_tool", response={"success": True})
+            )]),
+            actions=EventActions(state_delta={"portfolio": portfolio}),
+        ),
+        Event(
+            invocation_id=invocation_id,
+            author=APP_NAME,
+            content=types.Content(role="model", parts=[types.Part(text="Done.")]),
+        ),
+    ]
+
+
+async def reload(db_path: str, user_id: str, session_id: str):
+    """Read a session back through a fresh, plain database service."""
+    service = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{db_path}")
+    try:
+        return await service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    finally:
+        await service.close()
+
+
+def test_turn_batching_writes_each_turn(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+
+    async def run():
+        service = create_session_service(db_path)
+        assert isinstance(service, TurnBatchingSessionService)
+        session = await service.create_session(app_name=APP_NAME, user_id="u1")
+        for turn, portfolio in enumerate((["AAPL"], ["AAPL", "MSFT"])):
+            for event in make_turn(f"inv_{turn}", portfolio):
+                await service.append_event(session, event)
+        stored = await reload(db_path, "u1", session.id)
+        await service.close()
+        return stored
+
+    stored = asyncio.run(run())
+    assert len(stored.events) == 6
+    assert stored.state["portfolio"] == ["AAPL", "MSFT"]
+
+
+def test_turn_batching_flushes_an_interrupted_turn(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+
+    async def run():
+        service = create_session_service(db_path)
+        session = await service.create_session(app_name=APP_NAME, user_id="u1")
+        # No final response: the turn's events are still buffered
+        for event in make_turn("inv_0", ["AAPL"])[:2]:
+            await service.append_event(session, event)
+        reread = await service.get_session(app_name=APP_NAME, user_id="u1", session_id=session.id)
+        stored = await reload(db_path, "u1", session.id)
+        await service.close()
+        return reread, stored
+
+    reread, stored = asyncio.run(run())
+    assert len(reread.events) == len(stored.events) == 2
+    assert stored.state["portfolio"] == ["AAPL"]
+
+
+def test_write_behind_survives_close_across_loops(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+    service = create_session_service(db_path, write_behind=True)
+
+    async def turn(user_id: str, portfolio: list[str]) -> str:
+        session = await service.create_session(app_name=APP_NAME, user_id=user_id)
+        for event in make_turn(f"inv_{user_id}", portfolio):
+            await service.append_event(session, event)
+        return session.id
+
+    # Each turn on its own event loop, as runner.run() does
+    session_ids = {user_id: asyncio.run(turn(user_id, [user_id.upper()])) for user_id in ("a", "b")}
+    asyncio.run(service.close())
+
+    for user_id, session_id in session_ids.items():
+        stored = asyncio.run(reload(db_path, user_id, session_id))
+        assert len(stored.events) == 3
+        assert stored.state["portfolio"] == [user_id.upper()]
+
+
+def test_write_behind_flushes_evicted_sessions(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+
+    async def run():
+        service = create_session_service(db_path, write_behind=True)
+        service.max_sessions = 1
+        first = await service.create_session(app_name=APP_NAME, user_id="u1")
+        for event in make_turn("inv_0", ["AAPL"]):
+            await service.append_event(first, event)
+        # Caching a second session evicts and writes out the first
+        await service.create_session(app_name=APP_NAME, user_id="u2")
+        stored = await reload(db_path, "u1", first.id)
+        await service.close()
+        return stored
+
+    stored = asyncio.run(run())
+    assert len(stored.events) == 3
+    assert stored.state["portfolio"] == ["AAPL"]
+
+
+def test_write_behind_flush_survives_a_failing_session(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+
+    async def run():
+        service = create_session_service(db_path, write_behind=True)
+        broken = await service.create_session(app_name=APP_NAME, user_id="u1")
+        healthy = await service.create_session(app_name=APP_NAME, user_id="u2")
+        for session in (broken, healthy):
+            for event in make_turn(f"inv_{session.user_id}", [session.user_id.upper()]):
+                await service.append_event(session, event)
+
+        append_events = service.backing.append_events
+
+        async def fail_broken(session, events):
+            if session.id == broken.id:
+                raise SessionNotFoundError(f"Session {session.id} not found.")
+            await append_events(session, events)
+
+        service.backing.append_events = fail_broken
+        await service.flush()
+        written = await reload(db_path, "u2", healthy.id)
+        unwritten = await reload(db_path, "u1", broken.id)
+
+        # The failed session stays dirty and is written once the backing recovers
+        service.backing.append_events = append_events
+        await service.close()
+        recovered = await reload(db_path, "u1", broken.id)
+        return written, unwritten, recovered
+
+    written, unwritten, recovered = asyncio.run(run())
+    assert len(written.events) == 3
+    assert len(unwritten.events) == 0
+    assert len(recovered.events) == 3
+    assert recovered.state["portfolio"] == ["U1"]
+
+
+def test_write_behind_reload_waits_for_eviction(tmp_path):
+    db_path = os.path.join(tmp_path, "sessions.db")
+
+    async def run():
+        service = create_session_service(db_path, write_behind=True)
+        service.max_sessions = 1
+        first = await service.create_session(app_name=APP_NAME, user_id="u1")
+        for event in make_turn("inv_0", ["AAPL"]):
+            await service.append_event(first, event)
+
+        append_events = service.backing.append_events
+
+        async def slow_append(session, events):
+            await asyncio.sleep(0.2)
+            await append_events(session, events)
+
+        service.backing.append_events = slow_append
+        # Evict the first session, and read it back while its flush is in flight
+        evicting = asyncio.create_task(service.create_session(app_name=APP_NAME, user_id="u2"))
+        await asyncio.sleep(0.05)
+        reread = await service.get_session(app_name=APP_NAME, user_id="u1", session_id=first.id)
+        await evicting
+
+        for event in make_turn("inv_1", ["AAPL", "MSFT"]):
+            await service.append_event(reread, event)
+        await service.close()
+        return reread, await reload(db_path, "u1", first.id)
+
+    reread, stored = asyncio.run(run())
+    assert len(reread.events) == 6
+    assert len(stored.events) == 6
+    assert stored.state["portfolio"] == ["AAPL", "MSFT"]
@@ -0,0 +1,43 @@
+# ============================================================================
+# tests/test_warm_start.py
+# ============================================================================
+"""Background warm-up at import time and the readiness gate"""
+import asyncio
+import threading
+
+from market_report_agent import warm_start
+
+
+def test_background_warm_up_loads_data_only(tmp_path, monkeypatch):
+    refreshed = threading.Event()
+    release = threading.Event()
+    client_calls = []
+
+    def refresh(symbols):
+        refreshed.set()
+        release.wait(5)
+
+    monkeypatch.setattr(warm_start, "_ready", threading.Event())
+    monkeypatch.setattr(warm_start, "_thread", None)
+    monkeypatch.setattr(warm_start.bar_cache, "get", refresh)
+    monkeypatch.setattr(warm_start, "start_pool", lambda: None)
+    monkeypatch.setattr(warm_start, "genai_client", lambda: client_calls.append(True))
+
+    # No bundle in the directory: warm-up still refreshes the sector ETFs
+    warm_start.start_warm_up(str(tmp_path))
+    assert refreshed.wait(5)
+    assert not warm_start.is_ready()
+
+    async def request():
+        gate = asyncio.create_task(warm_start.wait_for_warm_up(None))
+        await asyncio.sleep(0.05)
+        # Requests are held until the warm-up finishes
+        assert not gate.done()
+        release.set()
+        await gate
+
+    asyncio.run(request())
+    warm_start._thread.join(5)
+    assert warm_start.is_ready()
+    # The warm-up thread's loop never serves requests, so it creates no model clients
+    assert client_calls == []
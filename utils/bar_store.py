@@ -0,0 +1,526 @@
+# ============================================================================
+# utils/bar_store.py
+# ============================================================================
+"""
+Compact columnar store of daily bars.
+
+Each field is one NumPy array of shape (symbols, dates): float32 prices and
+int64 volumes, about 20 bytes per bar instead of a pandas DataFrame per
+ticker per call. Price and sector tools read their numbers straight from the
+arrays, and a store can be saved to data/ and memory-mapped back.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.market_data import download_bars
+
+BAR_STORE_DIR = os.path.join("data", "bar_store")
+# History loaded for new symbols and on the first load of each day
+BAR_HISTORY_PERIOD = "1y"
+# Recent bars re-fetched for symbols older than the refresh interval
+BAR_REFRESH_PERIOD = "5d"
+BAR_REFRESH_INTERVAL_S = 300
+# Re-fetched bars that move a stored close by more than this (relative)
+# mean the history was adjusted, so the symbol's history is reloaded
+ADJUSTMENT_TOLERANCE = 1e-3
+# Symbols kept in the cache; the least recently requested are evicted
+BAR_CACHE_MAX_SYMBOLS = int(os.getenv("BAR_CACHE_MAX_SYMBOLS", "5000"))
+# Sessions used for the 52-week high and low
+TRADING_DAYS_PER_YEAR = 252
+
+# Stored fields and their dtypes
+FIELDS = {
+    "high": np.float32,
+    "low": np.float32,
+    "close": np.float32,
+    "volume": np.int64,
+}
+
+
+class BarStore:
+    """Daily bars as (symbols, dates) arrays, one per field."""
+
+    def __init__(
+        self,
+        symbols: list[str],
+        dates: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        loaded_on: Optional[str] = None
+    ):
+        self.symbols = list(symbols)
+        self.position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        # Ascending trading dates (datetime64[D])
+        self.dates = dates
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        # Date of the last full history load
+        self.loaded_on = loaded_on
+
+    @classmethod
+    def empty(cls) -> "BarStore":
+        arrays = {field: np.empty((0, 0), dtype=dtype) for field, dtype in FIELDS.items()}
+        return cls([], np.empty(0, dtype="datetime64[D]"), **arrays)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, symbols: list[str], loaded_on: Optional[str] = None) -> "BarStore":
+        """
+        Build a store from a yfinance download grouped by column.
+
+        Requested symbols without data get all-missing rows, so they are
+        not requested again until the next full load.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if data.empty:
+            arrays = {field: np.empty((len(symbols), 0), dtype=dtype) for field, dtype in FIELDS.items()}
+            return cls(symbols, np.empty(0, dtype="datetime64[D]"), loaded_on=loaded_on, **arrays)
+
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        arrays = {}
+        for field, dtype in FIELDS.items():
+            frame = data[field.capitalize()]
+            # A single symbol may come back as a Series
+            if isinstance(frame, pd.Series):
+                frame = frame.to_frame(name=symbols[0])
+            values = frame.reindex(columns=symbols).to_numpy(dtype=np.float64).T
+            if np.issubdtype(dtype, np.integer):
+                values = np.nan_to_num(values)
+            arrays[field] = np.ascontiguousarray(values, dtype=dtype)
+
+        return cls(symbols, index.values.astype("datetime64[D]"), loaded_on=loaded_on, **arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(getattr(self, field).nbytes for field in FIELDS)
+
+    def merge(self, other: "BarStore") -> "BarStore":
+        """New store with the union of symbols and dates; `other` wins on overlaps."""
+        dates = np.union1d(self.dates, other.dates)
+        symbols = self.symbols + [s for s in other.symbols if s not in self.position]
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+
+        arrays = {}
+        for field, dtype in FIELDS.items():
+            fill = 0 if np.issubdtype(dtype, np.integer) else np.nan
+            merged = np.full((len(symbols), len(dates)), fill, dtype=dtype)
+            for source in (self, other):
+                rows = np.array([position[s] for s in source.symbols], dtype=np.int64)
+                block = np.ix_(rows, np.searchsorted(dates, source.dates))
+                values = getattr(source, field)
+                if source is other:
+                    # Bars missing from the newer download keep their old values
+                    values = np.where(np.isnan(other.close), merged[block], values)
+                merged[block] = values
+            arrays[field] = merged
+
+        return BarStore(symbols, dates, loaded_on=self.loaded_on or other.loaded_on, **arrays)
+
+    def select(self, symbols: list[str]) -> "BarStore":
+        """New store with only `symbols`, all of which must be stored."""
+        rows = np.array([self.position[s] for s in symbols], dtype=np.int64)
+        arrays = {field: getattr(self, field)[rows] for field in FIELDS}
+        return BarStore(symbols, self.dates, loaded_on=self.loaded_on, **arrays)
+
+    def _rows(self, symbols: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Row index per symbol (0 for unknown ones) and a known-symbol mask."""
+        rows = np.array([self.position.get(s, -1) for s in symbols], dtype=np.int64)
+        known = rows >= 0
+        return np.where(known, rows, 0), known
+
+    def end_index(self, as_of: Optional[str] = None) -> int:
+        """Number of stored dates on or before `as_of` (all dates if None)."""
+        if as_of is None:
+            return len(self.dates)
+        return int(np.searchsorted(self.dates, np.datetime64(as_of, "D"), side="right"))
+
+    def snapshot(
+        self,
+        symbols: list[str],
+        lookbacks: tuple[int, ...] = (1,),
+        as_of: Optional[str] = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Latest bar and earlier closes for many symbols in one pass.
+
+        Missing bars are skipped per symbol, so "n sessions back" counts the
+        symbol's own trading days. With fewer bars than a lookback, the
+        earliest bar is used.
+
+        Args:
+            symbols: Ticker symbols; unknown ones report zero bars
+            lookbacks: Sessions before the latest bar to include
+            as_of: Ignore bars after this date (YYYY-MM-DD)
+
+        Returns:
+            Arrays aligned with `symbols`: bars, close, date, volume,
+            high_52w, low_52w, and close_<n> / date_<n> per lookback
+        """
+        take, known = self._rows(symbols)
+        end = self.end_index(as_of)
+        n = len(symbols)
+
+        if not end or not known.any():
+            result = {"bars": np.zeros(n, dtype=np.int64)}
+            for key in ["close", "high_52w", "low_52w"] + [f"close_{k}" for k in lookbacks]:
+                result[key] = np.full(n, np.nan)
+            return result
+
+        close = self.close[take, :end].astype(np.float64)
+        close[~known] = np.nan
+
+        valid = ~np.isnan(close)
+        counts = valid.sum(axis=1)
+        # 1-based rank of each valid bar within its row
+        rank = np.cumsum(valid, axis=1)
+        arange = np.arange(n)
+
+        def sessions_back(k: int) -> np.ndarray:
+            target = np.maximum(counts - k, 1)
+            return np.argmax(valid & (rank == target[:, None]), axis=1)
+
+        latest = sessions_back(0)
+        year = slice(max(0, end - TRADING_DAYS_PER_YEAR), end)
+        high_52w = np.fmax.reduce(self.high[take, year].astype(np.float64), axis=1)
+        low_52w = np.fmin.reduce(self.low[take, year].astype(np.float64), axis=1)
+        high_52w[~known] = low_52w[~known] = np.nan
+        result = {
+            "bars": counts,
+            "close": close[arange, latest],
+            "date": self.dates[latest],
+            "volume": self.volume[take, latest],
+            "high_52w": high_52w,
+            "low_52w": low_52w,
+        }
+        for k in lookbacks:
+            back = sessions_back(k)
+            result[f"close_{k}"] = close[arange, back]
+            result[f"date_{k}"] = self.dates[back]
+        return result
+
+    def closes(
+        self,
+        symbols: list[str],
+        sessions: int = TRADING_DAYS_PER_YEAR,
+        as_of: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Gap-filled closes of the last `sessions` dates, oldest first.
+
+        Dates on which none of the symbols traded are skipped. A missing bar
+        takes the previous close, and a leading gap (a recent listing) the
+        first one. Symbols without bars stay NaN.
+
+        Args:
+            symbols: Ticker symbols
+            sessions: Most recent dates to include
+            as_of: Ignore bars after this date (YYYY-MM-DD)
+
+        Returns:
+            Array of shape (dates, symbols)
+        """
+        take, known = self._rows(symbols)
+        close = self.close[take, :self.end_index(as_of)].astype(np.float64)
+        close[~known] = np.nan
+        close = close[:, ~np.isnan(close).all(axis=0)][:, -sessions:]
+
+        valid = ~np.isnan(close)
+        # Position of the latest valid bar at or before each date
+        latest = np.maximum.accumulate(np.where(valid, np.arange(close.shape[1]), 0), axis=1)
+        filled = np.take_along_axis(close, latest, axis=1)
+        first = close[np.arange(len(close)), np.argmax(valid, axis=1)] if close.shape[1] else np.full(len(close), np.nan)
+        filled = np.where(np.isnan(filled), first[:, None], filled)
+        return filled.T
+
+    def history(
+        self,
+        symbols: list[str],
+        start: str,
+        end: str,
+        lookbacks: tuple[int, ...] = (1,)
+    ) -> dict[str, np.ndarray]:
+        """
+        What snapshot() would return on every stored date in a range.
+
+        Computed for all symbols and dates at once: each bar's position
+        among its symbol's own bars gives the bar n sessions back, and the
+        52-week range is a rolling window over the stored dates.
+
+        Args:
+            symbols: Ticker symbols; unknown ones have no bars
+            start: First date of the range (YYYY-MM-DD)
+            end: Last date of the range (YYYY-MM-DD)
+            lookbacks: Sessions before each date's bar to include
+
+        Returns:
+            "dates" of the range plus (symbols, dates) arrays with the same
+            keys as snapshot()
+        """
+        take, known = self._rows(symbols)
+        first = int(np.searchsorted(self.dates, np.datetime64(start, "D"), side="left"))
+        stop = self.end_index(end)
+        close = self.close[take, :stop].astype(np.float64)
+        close[~known] = np.nan
+
+        valid = ~np.isnan(close)
+        # Bars seen so far per symbol, and valid bar positions listed first
+        rank = np.cumsum(valid, axis=1)
+        order = np.argsort(~valid, axis=1, kind="stable")
+
+        def sessions_back(k: int) -> np.ndarray:
+            target = np.maximum(rank - k, 1) - 1
+            return np.take_along_axis(order, target, axis=1)
+
+        def rolling(values: np.ndarray, reducer) -> np.ndarray:
+            frame = pd.DataFrame(values[:, :stop].astype(np.float64).T)
+            rolled = getattr(frame.rolling(TRADING_DAYS_PER_YEAR, min_periods=1), reducer)()
+            return rolled.to_numpy().T
+
+        latest = sessions_back(0)
+        result = {
+            "dates": self.dates[first:stop],
+            "bars": rank,
+            "close": np.take_along_axis(close, latest, axis=1),
+            "date": self.dates[latest],
+            "volume": np.take_along_axis(self.volume[take, :stop], latest, axis=1),
+            "high_52w": rolling(self.high[take], "max"),
+            "low_52w": rolling(self.low[take], "min"),
+        }
+        for k in lookbacks:
+            back = sessions_back(k)
+            result[f"close_{k}"] = np.take_along_axis(close, back, axis=1)
+            result[f"date_{k}"] = self.dates[back]
+
+        # Dates before a symbol's first bar (or unknown symbols) have no data
+        no_bars = rank[:, first:] == 0
+        for key, values in result.items():
+            if key != "dates":
+                values = values[:, first:]
+                if values.dtype.kind == "f":
+                    values = np.where(no_bars, np.nan, values)
+                result[key] = values
+        return result
+
+    def save(self, directory: str = BAR_STORE_DIR) -> None:
+        """Write one .npy file per field plus a JSON index of symbols."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "dates.npy"), self.dates)
+        for field in FIELDS:
+            np.save(os.path.join(directory, f"{field}.npy"), getattr(self, field))
+
+        # The index is written last so a reader never sees it ahead of the arrays
+        tmp_path = os.path.join(directory, "index.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"symbols": self.symbols, "loaded_on": self.loaded_on}, f)
+        os.replace(tmp_path, os.path.join(directory, "index.json"))
+
+    @classmethod
+    def open(cls, directory: str = BAR_STORE_DIR, mmap: bool = True) -> "BarStore":
+        """Load a saved store, memory-mapping the arrays by default."""
+        with open(os.path.join(directory, "index.json")) as f:
+            index = json.load(f)
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode=mmap_mode)
+            for field in FIELDS
+        }
+        dates = np.load(os.path.join(directory, "dates.npy"), mmap_mode=mmap_mode)
+        return cls(index["symbols"], dates, loaded_on=index["loaded_on"], **arrays)
+
+
+def history_start(as_of: str) -> str:
+    """First date of the history needed for a report as of `as_of`."""
+    # A calendar year plus margin covers the 52-week range and lookbacks
+    return (datetime.strptime(as_of, "%Y-%m-%d") - timedelta(days=380)).strftime("%Y-%m-%d")
+
+
+def _year_ago() -> str:
+    return (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+
+
+def _load_history(symbols: list[str], start: Optional[str] = None) -> BarStore:
+    """A year of bars for `symbols`, or from `start` if that is earlier."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    if start is None or start >= _year_ago():
+        return BarStore.from_frame(download_bars(symbols, BAR_HISTORY_PERIOD), symbols, loaded_on=today)
+    return BarStore.from_frame(download_bars(symbols, start=start), symbols, loaded_on=today)
+
+
+def _needs_reload(store: BarStore, recent: BarStore) -> list[str]:
+    """
+    Symbols whose recently downloaded bars do not line up with the store.
+
+    Either the download starts after the symbol's last stored bar, leaving
+    a gap, or it disagrees with bars stored before the latest one (which may
+    have been a session in progress), so history was adjusted for a split
+    or dividend since it was loaded.
+    """
+    stale = []
+    for symbol in recent.symbols:
+        new = recent.close[recent.position[symbol]].astype(np.float64)
+        new_valid = ~np.isnan(new)
+        if not new_valid.any():
+            continue
+
+        old = store.close[store.position[symbol]].astype(np.float64)
+        old_dates = store.dates[~np.isnan(old)]
+        if not len(old_dates) or old_dates[-1] < recent.dates[new_valid][0]:
+            stale.append(symbol)
+            continue
+
+        overlap = new_valid & np.isin(recent.dates, old_dates[:-1])
+        stored = old[np.searchsorted(store.dates, recent.dates[overlap])]
+        if (np.abs(new[overlap] / stored - 1) > ADJUSTMENT_TOLERANCE).any():
+            stale.append(symbol)
+    return stale
+
+
+class BarCache:
+    """
+    Process-wide bar store that loads symbols on demand.
+
+    New symbols get a year of history. After the refresh interval, the
+    symbols a caller asks for re-fetch their last few sessions; a symbol
+    whose recent bars do not line up with the stored ones (a gap, or a split
+    or dividend adjustment) reloads its history instead. Downloads run
+    outside the lock and their bars are merged into the current store
+    afterwards, so a slow fetch never blocks other callers. Stores are
+    replaced, never modified, so readers need no lock. The least recently
+    requested symbols are evicted beyond BAR_CACHE_MAX_SYMBOLS.
+    """
+
+    def __init__(
+        self,
+        directory: str = BAR_STORE_DIR,
+        refresh_interval_s: float = BAR_REFRESH_INTERVAL_S,
+        max_symbols: int = BAR_CACHE_MAX_SYMBOLS
+    ):
+        self.directory = directory
+        self.refresh_interval_s = refresh_interval_s
+        self.max_symbols = max_symbols
+        self._store: Optional[BarStore] = None
+        # Per symbol: last refresh and last request (time.monotonic()), and
+        # the earliest date its history was loaded from
+        self._refreshed_at: dict[str, float] = {}
+        self._used_at: dict[str, float] = {}
+        self._history_from: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> BarStore:
+        """Current store, memory-mapped from disk on first use if saved there."""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    if os.path.exists(os.path.join(self.directory, "index.json")):
+                        self._store = BarStore.open(self.directory)
+                    else:
+                        self._store = BarStore.empty()
+        return self._store
+
+    def get(self, symbols: list[str], history_from: Optional[str] = None) -> BarStore:
+        """
+        Store covering `symbols`, loading or refreshing bars as needed.
+
+        Args:
+            symbols: Ticker symbols the caller will read
+            history_from: Also make sure bars go back to this date
+                (YYYY-MM-DD), e.g. for as-of-date reports
+
+        Returns:
+            A store containing every requested symbol
+        """
+        symbols = list(dict.fromkeys(symbols))
+        self.store  # Open a saved store on first use
+        today = datetime.now().strftime("%Y-%m-%d")
+        now = time.monotonic()
+
+        # Decide what to fetch; marking refreshes up front keeps concurrent
+        # callers from fetching the same symbols again
+        with self._lock:
+            store = self._store
+            previous = {s: self._refreshed_at.get(s, 0.0) for s in symbols}
+            self._used_at.update(dict.fromkeys(symbols, now))
+            missing = [s for s in symbols if s not in store.position]
+            due = [s for s in symbols if s in store.position and now - previous[s] >= self.refresh_interval_s]
+            shallow = [] if history_from is None else [
+                s for s in symbols if s in store.position and self._history_from.get(s, today) > history_from
+            ]
+            self._refreshed_at.update(dict.fromkeys(missing + due, now))
+
+        try:
+            # (bars, symbols whose history they hold, date that history starts)
+            loaded = []
+            if missing:
+                loaded.append((_load_history(missing, history_from), missing, history_from))
+            if due:
+                recent = BarStore.from_frame(download_bars(due, BAR_REFRESH_PERIOD), due)
+                loaded.append((recent, [], None))
+                stale = _needs_reload(store, recent)
+                if stale:
+                    start = min(self._history_from.get(s, today) for s in stale)
+                    loaded.append((_load_history(stale, start), stale, start))
+            if shallow:
+                loaded.append((_load_history(shallow, history_from), shallow, history_from))
+        except Exception:
+            with self._lock:
+                self._refreshed_at.update(previous)
+            raise
+
+        if not loaded:
+            return store
+
+        with self._lock:
+            store = self._store
+            for bars, reloaded, start in loaded:
+                store = store.merge(bars)
+                start = min(start, _year_ago()) if start else _year_ago()
+                for symbol in reloaded:
+                    self._history_from[symbol] = min(self._history_from.get(symbol, start), start)
+
+            if len(store.symbols) > self.max_symbols:
+                # Requested symbols were just used, so they are never evicted
+                recent_first = sorted(store.symbols, key=lambda s: self._used_at.get(s, 0.0), reverse=True)
+                keep = set(recent_first[:max(self.max_symbols, len(symbols))])
+                store = store.select([s for s in store.symbols if s in keep])
+                for state in (self._refreshed_at, self._used_at, self._history_from):
+                    for symbol in [s for s in state if s not in keep]:
+                        del state[symbol]
+
+            self._store = store
+        return store
+
+    def preload(self, store: BarStore) -> bool:
+        """
+        Start from a saved store, e.g. a warm-start bundle.
+
+        Its symbols are due for a refresh, so the first get() catches up by
+        merging recent bars rather than reloading their history. Ignored once
+        bars have been loaded, since those are newer.
+        """
+        with self._lock:
+            if self._store is not None and self._store.symbols:
+                return False
+            self._store = store
+            self._refreshed_at = {}
+            self._used_at = dict.fromkeys(store.symbols, time.monotonic())
+            if len(store.dates):
+                self._history_from = dict.fromkeys(store.symbols, str(store.dates[0]))
+            return True
+
+    def save(self) -> None:
+        """Save the current store so later processes can memory-map it."""
+        self.store.save(self.directory)
+
+
+bar_cache = BarCache()
@@ -0,0 +1,225 @@
+# ============================================================================
+# utils/compute_pool.py
+# ============================================================================
+"""
+Process-pool execution for CPU-heavy bar-history analytics.
+
+Bar histories are copied once into a shared memory block; worker processes
+attach to it by name and compute indicators for a slice of symbols, so no
+DataFrames are pickled across the process boundary. This module only depends
+on numpy so spawned workers start quickly.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Indicator parameters (in trading days)
+SMA_WINDOWS = (20, 50)
+RSI_PERIOD = 14
+VOLATILITY_WINDOW = 20
+TRADING_DAYS_PER_YEAR = 252
+
+# Pool sizing; small inputs are cheaper to compute in-process
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+POOL_MIN_CELLS = 50_000
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder's RSI of the latest bar for every column of a (days, symbols) array."""
+    deltas = np.diff(closes, axis=0)
+    if len(deltas) < period:
+        return np.full(closes.shape[1], np.nan)
+
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    avg_gain = gains[:period].mean(axis=0)
+    avg_loss = losses[:period].mean(axis=0)
+    for i in range(period, len(deltas)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + rs))
+
+
+def compute_indicators(closes: np.ndarray) -> list[dict]:
+    """
+    Compute rolling indicators for each symbol in a block of closes.
+
+    Args:
+        closes: Array of shape (days, symbols), oldest bar first
+
+    Returns:
+        One dictionary of indicators per symbol column
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    days = closes.shape[0]
+    last = closes[-1]
+
+    indicators = {}
+    for window in SMA_WINDOWS:
+        if days >= window:
+            sma = closes[-window:].mean(axis=0)
+            indicators[f"sma_{window}"] = sma
+            indicators[f"pct_vs_sma_{window}"] = (last / sma - 1) * 100
+
+    indicators[f"rsi_{RSI_PERIOD}"] = _rsi(closes)
+
+    running_max = np.maximum.accumulate(closes, axis=0)
+    drawdowns = (closes / running_max - 1) * 100
+    indicators["max_drawdown_pct"] = drawdowns.min(axis=0)
+    indicators["current_drawdown_pct"] = drawdowns[-1]
+
+    if days > VOLATILITY_WINDOW:
+        log_returns = np.diff(np.log(closes[-(VOLATILITY_WINDOW + 1):]), axis=0)
+        indicators["volatility_20d_pct"] = (
+            log_returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+        )
+
+    return [
+        {name: round(float(values[col]), 2) for name, values in indicators.items()}
+        for col in range(closes.shape[1])
+    ]
+
+
+def _compute_shared_slice(shm_name: str, shape: tuple, dtype: str, start: int, stop: int) -> list[dict]:
+    """Worker entry point: attach to shared memory and compute a column slice."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        closes = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return compute_indicators(closes[:, start:stop])
+    finally:
+        shm.close()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the worker pool on first use."""
+    global _pool
+    if _pool is None:
+        # spawn avoids forking a process that is running an event loop and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=COMPUTE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def start_pool() -> None:
+    """Spawn all workers ahead of the first computation."""
+    pool = _get_pool()
+    # One task per worker makes the executor start every process
+    list(pool.map(abs, range(COMPUTE_WORKERS)))
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool, e.g. at process shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def _submit(closes: np.ndarray) -> tuple[shared_memory.SharedMemory, list[Future]]:
+    """Copy closes into shared memory and submit one task per column slice."""
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, closes.nbytes))
+    np.ndarray(closes.shape, dtype=closes.dtype, buffer=shm.buf)[:] = closes
+
+    pool = _get_pool()
+    n_symbols = closes.shape[1]
+    chunk = -(-n_symbols // COMPUTE_WORKERS)
+    futures = [
+        pool.submit(
+            _compute_shared_slice, shm.name, closes.shape, closes.dtype.str,
+            start, min(start + chunk, n_symbols),
+        )
+        for start in range(0, n_symbols, chunk)
+    ]
+    return shm, futures
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _release_when_done(shm: shared_memory.SharedMemory, futures: list[Future]) -> None:
+    """
+    Unlink the shared memory once no worker can attach to it any more.
+
+    Queued slices are cancelled; slices already handed to a worker cannot be,
+    so the block is only released after the last of them has finished.
+    """
+    for future in futures:
+        future.cancel()
+    running = [future for future in futures if not future.done()]
+    if not running:
+        _release(shm)
+        return
+
+    lock = threading.Lock()
+    left = [len(running)]
+
+    def finished(_: Future) -> None:
+        with lock:
+            left[0] -= 1
+            last = left[0] == 0
+        if last:
+            _release(shm)
+
+    for future in running:
+        future.add_done_callback(finished)
+
+
+def compute_indicators_in_pool(closes: np.ndarray) -> list[dict]:
+    """
+    Compute indicators in worker processes, blocking until they finish.
+
+    Args:
+        closes: Array of shape (days, symbols), oldest bar first
+
+    Returns:
+        One dictionary of indicators per symbol column
+    """
+    if closes.size < POOL_MIN_CELLS:
+        return compute_indicators(closes)
+
+    shm, futures = _submit(closes)
+    try:
+        return [row for future in futures for row in future.result()]
+    finally:
+        _release_when_done(shm, futures)
+
+
+async def compute_indicators_async(closes: np.ndarray) -> list[dict]:
+    """
+    Compute indicators without blocking the event loop.
+
+    Large inputs run in the process pool and small ones in a thread (numpy
+    releases the GIL for most of the work); either way the event loop only
+    awaits the results, so other sessions keep being served meanwhile.
+
+    Args:
+        closes: Array of shape (days, symbols), oldest bar first
+
+    Returns:
+        One dictionary of indicators per symbol column
+    """
+    if closes.size < POOL_MIN_CELLS:
+        return await asyncio.to_thread(compute_indicators, closes)
+
+    shm, futures = _submit(closes)
+    try:
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+    finally:
+        # On cancellation, workers may still be reading the block
+        _release_when_done(shm, futures)
+    return [row for rows in results for row in rows]
@@ -14,4 +14,42 @@ GICS_SECTORS = {
     "Utilities": "XLU",
     "Real Estate": "XLRE",
     "Materials": "XLB"
-}
\ No newline at end of file
+}
+# Lookback horizons for multi-horizon sector analysis, in trading days.
+# YTD is measured from the last close of the previous year.
+SECTOR_HORIZONS = {
+    "1D": 1,
+    "1W": 5,
+    "1M": 21,
+    "3M": 63,
+}
+
+# Minimum momentum rank change (out of 11 sectors) flagged as sector rotation
+ROTATION_RANK_THRESHOLD = 3
+
+# Yahoo Finance sector names mapped to their GICS sector equivalents
+YAHOO_TO_GICS_SECTOR = {
+    "Technology": "Information Technology",
+    "Healthcare": "Health Care",
+    "Financial Services": "Financials",
+    "Consumer Cyclical": "Consumer Discretionary",
+    "Communication Services": "Communication Services",
+    "Industrials": "Industrials",
+    "Consumer Defensive": "Consumer Staples",
+    "Energy": "Energy",
+    "Utilities": "Utilities",
+    "Real Estate": "Real Estate",
+    "Basic Materials": "Materials",
+}
+
+# Sector label for tickers that cannot be mapped to a GICS sector
+UNCLASSIFIED_SECTOR = "Unclassified"
+
+# Absolute daily % change at which a holding is reported as a mover
+MOVER_THRESHOLD_PCT = 2.0
+
+# Minimum sector rank move (out of 11) reported in "what changed" reports
+SECTOR_RANK_CHANGE_MIN = 2
+
+# Default absolute daily % move that triggers a price alert
+ALERT_THRESHOLD_PCT = 3.0
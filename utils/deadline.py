@@ -0,0 +1,102 @@
+# ============================================================================
+# utils/deadline.py
+# ============================================================================
+"""
+Per-report latency budget carried in a context variable.
+
+A report sets an absolute deadline once; every fetch and sub-agent started
+underneath it (including work handed to threads with asyncio.to_thread)
+sees the same deadline and bounds its own wait by the time remaining.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Wall-clock budget for one report, end to end
+REPORT_BUDGET_S = float(os.getenv("REPORT_BUDGET_S", "60"))
+# Network timeout for a single data request (yfinance's own default)
+FETCH_TIMEOUT_S = 10.0
+# Requests started close to the deadline still get this long
+MIN_FETCH_TIMEOUT_S = 1.0
+
+# Absolute time.monotonic() deadline of the current report, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("report_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work does not finish within the report's budget."""
+
+
+def new_deadline(budget_s: float = REPORT_BUDGET_S) -> float:
+    """Absolute deadline `budget_s` seconds from now."""
+    return time.monotonic() + budget_s
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Run the enclosed block under `deadline`.
+
+    An enclosing deadline that is earlier still wins, and None keeps the
+    current deadline unchanged.
+    """
+    current = _deadline.get()
+    if deadline is None or (current is not None and current <= deadline):
+        yield
+        return
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def report_deadline(budget_s: float = REPORT_BUDGET_S) -> Iterator[None]:
+    """Start a report budget unless one is already running."""
+    with deadline_scope(None if _deadline.get() is not None else new_deadline(budget_s)):
+        yield
+
+
+def fetch_timeout(default: float = FETCH_TIMEOUT_S) -> float:
+    """Network timeout for a request, capped by the time remaining."""
+    left = remaining()
+    if left is None:
+        return default
+    return max(MIN_FETCH_TIMEOUT_S, min(default, left))
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await `awaitable`, cancelling it when the current deadline passes.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        # Close a coroutine that will never be awaited
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Report time budget already spent")
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=left)
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded("Did not finish within the report's time budget") from e
@@ -0,0 +1,225 @@
+# ============================================================================
+# utils/intraday.py
+# ============================================================================
+"""
+Intraday minute bars held in fixed-size, array-backed ring buffers.
+
+Each active symbol keeps at most one trading session of minute bars plus
+running session aggregates, so the latest price, VWAP and session high/low
+are O(1) reads and memory stays bounded however often symbols are queried.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from utils.deadline import fetch_timeout
+
+# One regular US trading session of minute bars
+MINUTES_PER_SESSION = 390
+# Symbols kept in memory; the least recently used one is dropped beyond this
+MAX_INTRADAY_SYMBOLS = 500
+# Minimum seconds between refreshes of the same symbol
+REFRESH_INTERVAL_S = 60
+# Rings whose newest bar is older than this are refilled with the whole day
+MAX_CATCH_UP_S = 24 * 3600
+
+
+class MinuteBarRing:
+    """Ring buffer of minute bars for one symbol with running session stats."""
+
+    __slots__ = (
+        "capacity", "timestamps", "closes", "volumes", "head", "size",
+        "session_date", "session_open", "session_high", "session_low",
+        "pv_sum", "volume_sum", "refreshed_at",
+    )
+
+    def __init__(self, capacity: int = MINUTES_PER_SESSION):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.closes = np.zeros(capacity, dtype=np.float64)
+        self.volumes = np.zeros(capacity, dtype=np.int64)
+        self.head = 0
+        self.size = 0
+        self.session_date = None
+        self.refreshed_at = 0.0
+        self._reset_session(None)
+
+    def _reset_session(self, session_date) -> None:
+        self.session_date = session_date
+        self.session_open = np.nan
+        self.session_high = -np.inf
+        self.session_low = np.inf
+        self.pv_sum = 0.0
+        self.volume_sum = 0
+        self.head = 0
+        self.size = 0
+
+    @property
+    def last_timestamp(self) -> int:
+        if self.size == 0:
+            return 0
+        return int(self.timestamps[(self.head - 1) % self.capacity])
+
+    def extend(
+        self,
+        timestamps: np.ndarray,
+        session_date: str,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        volumes: np.ndarray,
+        opens: np.ndarray
+    ) -> None:
+        """
+        Add consecutive minute bars of one session in one slice.
+
+        Bars at or before the latest one held are ignored; a new session
+        date starts the ring over.
+        """
+        if session_date != self.session_date:
+            self._reset_session(session_date)
+        else:
+            keep = timestamps > self.last_timestamp
+            timestamps, highs, lows, closes, volumes, opens = (
+                a[keep] for a in (timestamps, highs, lows, closes, volumes, opens)
+            )
+        n = len(timestamps)
+        if n == 0:
+            return
+
+        if self.size == 0:
+            self.session_open = float(opens[0])
+
+        # Session aggregates cover every bar, the ring only the newest ones
+        self.session_high = max(self.session_high, float(highs.max()))
+        self.session_low = min(self.session_low, float(lows.min()))
+        self.pv_sum += float(((highs + lows + closes) / 3 * volumes).sum())
+        self.volume_sum += int(volumes.sum())
+
+        stored = min(n, self.capacity)
+        slots = (self.head + np.arange(n - stored, n)) % self.capacity
+        self.timestamps[slots] = timestamps[-stored:]
+        self.closes[slots] = closes[-stored:]
+        self.volumes[slots] = volumes[-stored:]
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def latest(self) -> dict:
+        """Latest price and session statistics in O(1)."""
+        if self.size == 0:
+            return {"error": "No intraday data available"}
+
+        last = (self.head - 1) % self.capacity
+        price = float(self.closes[last])
+        vwap = self.pv_sum / self.volume_sum if self.volume_sum else price
+        return {
+            "price": round(price, 2),
+            "time": pd.Timestamp(int(self.timestamps[last]), unit="s", tz="UTC")
+                      .tz_convert("America/New_York").strftime("%Y-%m-%d %H:%M"),
+            "session_open": round(float(self.session_open), 2),
+            "session_high": round(float(self.session_high), 2),
+            "session_low": round(float(self.session_low), 2),
+            "vwap": round(float(vwap), 2),
+            "pct_vs_vwap": round((price / vwap - 1) * 100, 2),
+            "change_from_open_pct": round((price / self.session_open - 1) * 100, 2),
+            "session_volume": int(self.volume_sum),
+            "bars": self.size,
+        }
+
+
+class IntradayStore:
+    """Minute-bar rings for the active symbols, refreshed incrementally."""
+
+    def __init__(self, max_symbols: int = MAX_INTRADAY_SYMBOLS, refresh_interval_s: float = REFRESH_INTERVAL_S):
+        self.max_symbols = max_symbols
+        self.refresh_interval_s = refresh_interval_s
+        self._rings: OrderedDict[str, MinuteBarRing] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ring(self, symbol: str) -> MinuteBarRing:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = MinuteBarRing()
+            while len(self._rings) > self.max_symbols:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(symbol)
+        return ring
+
+    def _ingest(self, symbol: str, bars: pd.DataFrame) -> None:
+        """Append bars newer than what the symbol's ring already holds."""
+        bars = bars.dropna()
+        if bars.empty:
+            return
+
+        ring = self._ring(symbol)
+        timestamps = bars.index.as_unit("s").asi8
+        session_dates = bars.index.strftime("%Y-%m-%d")
+
+        # The ring holds one session, so only the latest session's bars count
+        session_date = session_dates[-1]
+        take = np.asarray(session_dates == session_date)
+        ring.extend(
+            timestamps[take], session_date,
+            bars["High"].to_numpy(np.float64)[take],
+            bars["Low"].to_numpy(np.float64)[take],
+            bars["Close"].to_numpy(np.float64)[take],
+            bars["Volume"].to_numpy(np.int64)[take],
+            bars["Open"].to_numpy(np.float64)[take],
+        )
+
+    def _download_start(self, symbols: list[str], now: float) -> Optional[datetime]:
+        """
+        Start time for a download that catches all `symbols` up: the oldest
+        newest bar held, or None when a ring needs the whole day.
+        """
+        newest = [self._ring(s).last_timestamp for s in symbols]
+        oldest = min(newest)
+        if oldest == 0 or now - oldest > MAX_CATCH_UP_S:
+            return None
+        return datetime.fromtimestamp(oldest, tz=timezone.utc)
+
+    def refresh(self, symbols: list[str]) -> None:
+        """Fetch minute bars for symbols whose data is older than the refresh interval."""
+        now = time.time()
+        with self._lock:
+            stale = [s for s in symbols if now - self._ring(s).refreshed_at >= self.refresh_interval_s]
+            if not stale:
+                return
+            start = self._download_start(stale, now)
+
+        # Catch up from the newest bar held instead of re-reading the day
+        window = {"period": "1d"} if start is None else {"start": start}
+        data = yf.download(
+            stale, interval="1m", group_by="ticker",
+            auto_adjust=False, progress=False, threads=True,
+            timeout=fetch_timeout(), **window,
+        )
+        if data.empty:
+            return
+
+        with self._lock:
+            for symbol in stale:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    bars = data[symbol]
+                else:
+                    bars = data
+                self._ingest(symbol, bars)
+                self._ring(symbol).refreshed_at = now
+
+    def latest(self, symbol: str) -> dict:
+        """Latest intraday snapshot for a symbol."""
+        with self._lock:
+            ring = self._rings.get(symbol)
+            return ring.latest() if ring else {"error": "No intraday data available"}
+
+
+intraday_store = IntradayStore()
@@ -0,0 +1,81 @@
+# ============================================================================
+# utils/market_data.py
+# ============================================================================
+"""
+Bulk market data helpers shared by the price and sector tools.
+
+Request timeouts are capped by the current report's deadline, if any.
+"""
+from typing import Optional
+
+import pandas as pd
+import yfinance as yf
+
+from utils.deadline import fetch_timeout
+
+
+def download_closes(symbols: list[str], period: str = "1y") -> pd.DataFrame:
+    """
+    Download daily closing prices for many symbols in a single request.
+
+    Args:
+        symbols: List of ticker symbols
+        period: yfinance period string (e.g. "1mo", "1y")
+
+    Returns:
+        DataFrame indexed by trading date with one column per symbol.
+        Gaps are forward-filled; symbols without any data are dropped.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame()
+
+    data = yf.download(
+        symbols,
+        period=period,
+        interval="1d",
+        auto_adjust=True,
+        group_by="column",
+        progress=False,
+        threads=True,
+        timeout=fetch_timeout(),
+    )
+
+    if data.empty:
+        return pd.DataFrame()
+
+    closes = data["Close"]
+    # A single symbol comes back as a Series
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(name=symbols[0])
+
+    return closes.dropna(axis=1, how="all").dropna(how="all").ffill()
+
+
+def download_bars(symbols: list[str], period: str = "1y", start: Optional[str] = None) -> pd.DataFrame:
+    """
+    Download daily OHLCV bars for many symbols in a single request.
+
+    Args:
+        symbols: List of ticker symbols
+        period: yfinance period string (e.g. "5d", "1y")
+        start: Load from this date (YYYY-MM-DD) instead of a period
+
+    Returns:
+        yfinance frame with (field, symbol) columns; empty if nothing loaded
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame()
+
+    return yf.download(
+        symbols,
+        period=None if start else period,
+        start=start,
+        interval="1d",
+        auto_adjust=True,
+        group_by="column",
+        progress=False,
+        threads=True,
+        timeout=fetch_timeout(),
+    )
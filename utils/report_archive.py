@@ -0,0 +1,129 @@
+# ============================================================================
+# utils/report_archive.py
+# ============================================================================
+"""
+Compressed archive of generated reports and their structured inputs
+"""
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+ARCHIVE_PATH = os.path.join("data", "report_archive.db")
+
+# Retention: reports kept per user, and the age after which any report is dropped
+ARCHIVE_MAX_REPORTS_PER_USER = int(os.getenv("REPORT_ARCHIVE_MAX_PER_USER", "30"))
+ARCHIVE_RETENTION = timedelta(days=int(os.getenv("REPORT_ARCHIVE_RETENTION_DAYS", "90")))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    trading_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    report BLOB NOT NULL,
+    inputs BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_user_date
+    ON reports (user_id, trading_date, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_created
+    ON reports (created_at);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _compress(value: str) -> bytes:
+    return zlib.compress(value.encode("utf-8"), level=6)
+
+
+def _decompress(value: bytes) -> str:
+    return zlib.decompress(value).decode("utf-8")
+
+
+def archive_report(
+    user_id: str,
+    trading_date: str,
+    report: str,
+    inputs: dict,
+    path: str = ARCHIVE_PATH
+) -> None:
+    """
+    Store a report and the structured data it was built from.
+
+    Older reports are pruned in the same transaction: the user keeps only
+    the latest ARCHIVE_MAX_REPORTS_PER_USER, and reports of any user older
+    than ARCHIVE_RETENTION are dropped.
+
+    Args:
+        user_id: Owner of the report
+        trading_date: Trading date the data refers to (YYYY-MM-DD)
+        report: Rendered markdown report
+        inputs: Structured tool outputs used to build the report
+        path: Location of the archive database
+    """
+    now = datetime.now()
+    with _connect(path) as conn:
+        conn.execute(
+            "INSERT INTO reports (user_id, trading_date, created_at, report, inputs) VALUES (?, ?, ?, ?, ?)",
+            (
+                user_id,
+                trading_date,
+                now.isoformat(timespec="seconds"),
+                _compress(report),
+                _compress(json.dumps(inputs, default=str)),
+            ),
+        )
+        conn.execute(
+            "DELETE FROM reports WHERE user_id = ? AND id NOT IN ("
+            "SELECT id FROM reports WHERE user_id = ? "
+            "ORDER BY trading_date DESC, created_at DESC, id DESC LIMIT ?)",
+            (user_id, user_id, ARCHIVE_MAX_REPORTS_PER_USER),
+        )
+        conn.execute(
+            "DELETE FROM reports WHERE created_at < ?",
+            ((now - ARCHIVE_RETENTION).isoformat(timespec="seconds"),),
+        )
+    conn.close()
+
+
+def load_latest_report(user_id: str, path: str = ARCHIVE_PATH) -> Optional[dict]:
+    """
+    Load the most recent archived report for a user.
+
+    Args:
+        user_id: Owner of the report
+        path: Location of the archive database
+
+    Returns:
+        Dictionary with trading_date, created_at, report and inputs,
+        or None if the user has no archived report
+    """
+    if not os.path.exists(path):
+        return None
+
+    with _connect(path) as conn:
+        row = conn.execute(
+            "SELECT trading_date, created_at, report, inputs FROM reports "
+            "WHERE user_id = ? ORDER BY trading_date DESC, created_at DESC, id DESC LIMIT 1",
+            (user_id,),
+        ).fetchone()
+    conn.close()
+
+    if row is None:
+        return None
+
+    return {
+        "trading_date": row[0],
+        "created_at": row[1],
+        "report": _decompress(row[2]),
+        "inputs": json.loads(_decompress(row[3])),
+    }
@@ -0,0 +1,150 @@
+# ============================================================================
+# utils/sector_classification.py
+# ============================================================================
+"""
+Persistent ticker-to-GICS-sector classification index
+"""
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Optional
+
+import yfinance as yf
+
+from utils.constants import GICS_SECTORS, YAHOO_TO_GICS_SECTOR, UNCLASSIFIED_SECTOR
+from utils.deadline import fetch_timeout
+
+# Classifications rarely change, so entries are reused for a long time
+CLASSIFICATION_PATH = os.path.join("data", "sector_classifications.json")
+CLASSIFICATION_TTL = timedelta(days=30)
+
+# Parallel lookups used when filling the index in bulk
+MAX_LOOKUP_WORKERS = 8
+
+# In-memory copies of the on-disk indexes by path, loaded lazily
+_indexes: dict[str, dict] = {}
+
+
+def _load_index(path: str = CLASSIFICATION_PATH) -> dict:
+    """Load a classification index, reading each file only once per process."""
+    if path not in _indexes:
+        try:
+            with open(path, "r") as f:
+                _indexes[path] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _indexes[path] = {}
+    return _indexes[path]
+
+
+def _save_index(index: dict, path: str = CLASSIFICATION_PATH) -> None:
+    """Write the classification index atomically."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # A temp file of its own, so concurrent writers never share one
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(index, f, indent=2, sort_keys=True)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(entry: dict) -> bool:
+    """Check whether a classification entry is still within its TTL."""
+    try:
+        classified_at = datetime.fromisoformat(entry["classified_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return datetime.now() - classified_at < CLASSIFICATION_TTL
+
+
+def _lookup_sector(ticker: str) -> Optional[str]:
+    """Look up the GICS sector for a single ticker, or None if the lookup failed."""
+    etf_to_sector = {etf: sector for sector, etf in GICS_SECTORS.items()}
+    if ticker in etf_to_sector:
+        return etf_to_sector[ticker]
+
+    try:
+        yahoo_sector = yf.Ticker(ticker).info.get("sector")
+    except Exception:
+        return None
+
+    return YAHOO_TO_GICS_SECTOR.get(yahoo_sector, UNCLASSIFIED_SECTOR)
+
+
+def classify_tickers(tickers: list[str], path: str = CLASSIFICATION_PATH) -> dict:
+    """
+    Map tickers to their GICS sector and sector ETF.
+
+    Cached entries are reused until they expire. Missing or stale tickers
+    are looked up together, bounded by fetch_timeout(), and the index is
+    written back once. Tickers whose lookup failed or did not finish in
+    time come back unclassified but are not stored, so the next call
+    retries them.
+
+    Args:
+        tickers: List of stock ticker symbols
+        path: Location of the on-disk index
+
+    Returns:
+        Dictionary mapping each ticker to {"sector", "etf", "classified_at"}
+    """
+    tickers = [t.upper().strip() for t in tickers]
+    index = _load_index(path)
+
+    missing = [t for t in dict.fromkeys(tickers) if not _is_fresh(index.get(t, {}))]
+    failed = {}
+
+    if missing:
+        # yfinance's info lookup takes no timeout; stop waiting for it instead
+        pool = ThreadPoolExecutor(max_workers=MAX_LOOKUP_WORKERS)
+        futures = [pool.submit(_lookup_sector, ticker) for ticker in missing]
+        done, _ = wait(futures, timeout=fetch_timeout())
+        pool.shutdown(wait=False, cancel_futures=True)
+        sectors = [future.result() if future in done else None for future in futures]
+
+        classified_at = datetime.now().isoformat(timespec="seconds")
+        updated = False
+        for ticker, sector in zip(missing, sectors):
+            if sector is None:
+                # Unclassified for now; an expired entry is still better
+                if ticker not in index:
+                    failed[ticker] = {"sector": UNCLASSIFIED_SECTOR, "etf": None, "classified_at": None}
+                continue
+            index[ticker] = {
+                "sector": sector,
+                "etf": GICS_SECTORS.get(sector),
+                "classified_at": classified_at,
+            }
+            updated = True
+        if updated:
+            _save_index(index, path)
+
+    return {t: index.get(t) or failed[t] for t in tickers}
+
+
+def preload_classifications(entries: dict, path: str = CLASSIFICATION_PATH) -> int:
+    """
+    Merge classifications from elsewhere (e.g. a warm-start bundle) into
+    the in-memory index without touching the file.
+
+    Args:
+        entries: Ticker -> {"sector", "etf", "classified_at"} entries
+        path: Location of the on-disk index loaded first
+
+    Returns:
+        Number of entries taken from `entries`
+    """
+    index = _load_index(path)
+    loaded = 0
+    for ticker, entry in entries.items():
+        current = index.get(ticker, {})
+        if _is_fresh(entry) and entry.get("classified_at", "") > current.get("classified_at", ""):
+            index[ticker] = entry
+            loaded += 1
+    return loaded
@@ -0,0 +1,512 @@
+# ============================================================================
+# utils/session_storage.py
+# ============================================================================
+"""
+Session storage configuration for concurrent sessions on SQLite.
+
+Enables WAL and tuned pragmas on every pooled connection, sizes the
+connection pool, and commits each turn's events in one transaction so a
+session's turn takes the SQLite writer once instead of once per event.
+Optionally keeps hot sessions in memory and writes them behind to SQLite.
+"""
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.errors._stale_session_error import StaleSessionError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, Session, _session_util
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from sqlalchemy import event as sqlalchemy_event, select
+
+SESSIONS_DB_PATH = os.path.join("data", "sessions.db")
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    # Readers no longer block the writer (and vice versa)
+    "journal_mode": "WAL",
+    # Safe with WAL: commits no longer fsync, checkpoints still do
+    "synchronous": "NORMAL",
+    # Wait for the writer lock instead of failing with "database is locked"
+    "busy_timeout": 5000,
+    # 64 MB page cache (negative values are KiB)
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+    "mmap_size": 256 * 1024 * 1024,
+    "foreign_keys": "ON",
+}
+
+# Connection pool sizing; WAL allows concurrent readers alongside the writer
+POOL_SIZE = int(os.getenv("SESSION_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("SESSION_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT_S = 30
+
+# Upper bound on events held back while a turn is still running
+MAX_BUFFERED_EVENTS = 32
+
+# Write-behind cache sizing and snapshot interval
+MAX_CACHED_SESSIONS = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+FLUSH_INTERVAL_S = float(os.getenv("SESSION_FLUSH_INTERVAL_S", "5"))
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """SQLAlchemy connect hook that applies SQLITE_PRAGMAS."""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+class TurnBatchingSessionService(DatabaseSessionService):
+    """
+    DatabaseSessionService that writes each turn's events in one transaction.
+
+    Events are applied to the in-memory session immediately, so the running
+    turn sees every state delta. When the turn's final response arrives, its
+    events and their merged state delta are committed together, serialized
+    per session only. Events left behind by a turn that failed or was
+    cancelled are written before the session is used again.
+    """
+
+    def __init__(self, db_url: str, max_buffered_events: int = MAX_BUFFERED_EVENTS, **kwargs):
+        super().__init__(db_url=db_url, **kwargs)
+        self.max_buffered_events = max_buffered_events
+        # (app_name, user_id, session_id) -> (session, events not yet persisted)
+        self._pending: dict[tuple, tuple[Session, list[Event]]] = {}
+        self.events_written = 0
+        self.turns_flushed = 0
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        # A new turn starts from the database, so it must include the events
+        # of an earlier turn that never reached its final response
+        await self._flush_session((app_name, user_id, session_id))
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        buffered = self._pending.get(key)
+        if buffered is not None and buffered[0] is not session:
+            # Left over from an interrupted turn on another session object
+            await self._flush_session(key)
+        _, pending = self._pending.setdefault(key, (session, []))
+
+        # Update the in-memory session only; persisted when the turn ends
+        event = await BaseSessionService.append_event(self, session, event)
+        pending.append(event)
+
+        turn_complete = event.author != "user" and event.is_final_response()
+        if turn_complete or len(pending) >= self.max_buffered_events:
+            await self._flush_session(key)
+        return event
+
+    async def append_events(self, session: Session, events: list[Event]) -> None:
+        """
+        Persist events already applied to `session` in a single transaction.
+
+        Follows DatabaseSessionService.append_event (stale-session check,
+        app/user/session state deltas, event rows), but merges the deltas of
+        all events and commits once. It reuses that class's private helpers,
+        which is why google-adk is pinned to the tested minor release.
+        """
+        await self.prepare_tables()
+        schema = self._get_schema_classes()
+        deltas = {"app": {}, "user": {}, "session": {}}
+        for event in events:
+            delta = _session_util.extract_json_safe_state_delta(event.actions.state_delta or {})
+            for scope, values in delta.items():
+                deltas[scope].update(values)
+
+        async with self._with_session_lock(
+            app_name=session.app_name, user_id=session.user_id, session_id=session.id
+        ):
+            async with self._rollback_on_exception_session() as sql_session:
+                storage_session = (await sql_session.execute(
+                    select(schema.StorageSession)
+                    .filter(schema.StorageSession.app_name == session.app_name)
+                    .filter(schema.StorageSession.user_id == session.user_id)
+                    .filter(schema.StorageSession.id == session.id)
+                )).scalars().one_or_none()
+                if storage_session is None:
+                    raise SessionNotFoundError(f"Session {session.id} not found.")
+                marker = storage_session.get_update_marker()
+                if session._storage_update_marker is not None and session._storage_update_marker != marker:
+                    raise StaleSessionError(f"Session {session.id} was modified by another writer.")
+
+                if deltas["app"]:
+                    app_state = await sql_session.get(schema.StorageAppState, session.app_name)
+                    app_state.state.update(deltas["app"])
+                if deltas["user"]:
+                    user_state = await sql_session.get(schema.StorageUserState, (session.app_name, session.user_id))
+                    user_state.state.update(deltas["user"])
+                if deltas["session"]:
+                    storage_session.state.update(deltas["session"])
+
+                update_time = datetime.fromtimestamp(events[-1].timestamp, timezone.utc)
+                if self._uses_naive_datetime():
+                    update_time = update_time.replace(tzinfo=None)
+                storage_session.update_time = update_time
+                sql_session.add_all([schema.StorageEvent.from_event(session, e) for e in events])
+
+                # Read revision fields before commit, as the base class does
+                last_update_time = storage_session.get_update_timestamp()
+                marker = storage_session.get_update_marker()
+                await sql_session.commit()
+
+        session.last_update_time = last_update_time
+        session._storage_update_marker = marker
+
+    async def _flush_session(self, key: tuple) -> None:
+        """Persist one session's buffered events."""
+        # Taken off the buffer first, so a failed write is never retried
+        # against a session object that has moved on
+        session, pending = self._pending.pop(key, (None, []))
+        if not pending:
+            return
+
+        try:
+            await self.append_events(session, pending)
+        except Exception as e:
+            print(f"⚠️  Could not persist {len(pending)} event(s) of session {key[2]}: {e}")
+            raise
+
+        self.events_written += len(pending)
+        self.turns_flushed += 1
+
+    async def flush(self) -> None:
+        """Persist every buffered event, e.g. before shutdown."""
+        for key in list(self._pending):
+            await self._flush_session(key)
+
+    async def close(self) -> None:
+        await self.flush()
+        await super().close()
+
+
+class _WriterLoop:
+    """
+    Event loop on a daemon thread that runs every database call.
+
+    Callers on any loop (runner.run() creates a new one per call) await
+    their work here, so the periodic flusher outlives them and the async
+    engine's connections stay on one loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro) -> Any:
+        """Run `coro` on the writer loop and await its result."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class _CachedSession:
+    """A hot session plus the bookkeeping needed to write it behind."""
+
+    __slots__ = ("session", "stored", "pending", "flush_lock")
+
+    def __init__(self, session: Session, stored: Session):
+        # Live session handed to the runner
+        self.session = session
+        # Copy known to the database; tracks its revision for stale checks
+        self.stored = stored
+        # Events applied in memory but not yet written to the database
+        self.pending: list[Event] = []
+        # Serializes writes of this session; only used on the writer loop
+        self.flush_lock = asyncio.Lock()
+
+
+class WriteBehindSessionService(BaseSessionService):
+    """
+    In-memory session service that writes changes behind to SQLite.
+
+    Active sessions live in an LRU cache bounded by `max_sessions`. Turns
+    read and append in memory only; changed sessions are flushed to the
+    backing TurnBatchingSessionService, one transaction per session, on an
+    interval, on eviction and at shutdown. All database work runs on a
+    dedicated writer loop, and every flush of a session holds that session's
+    flush lock, so writes are never reordered. Evicted sessions are reloaded
+    from the database on demand.
+    """
+
+    def __init__(
+        self,
+        backing: TurnBatchingSessionService,
+        max_sessions: int = MAX_CACHED_SESSIONS,
+        flush_interval_s: float = FLUSH_INTERVAL_S
+    ):
+        self.backing = backing
+        self.max_sessions = max_sessions
+        self.flush_interval_s = flush_interval_s
+        self._cache: OrderedDict[tuple, _CachedSession] = OrderedDict()
+        # Eviction flushes still writing, by key; a reload waits for them
+        self._evicting: dict[tuple, tuple[object, Future]] = {}
+        # Guards the cache, evictions and pending lists across the caller and writer threads
+        self._lock = threading.Lock()
+        self._writer = _WriterLoop()
+        self._flush_task: Optional[Future] = self._writer.submit(self._flush_loop())
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(app_name: str, user_id: str, session_id: str) -> tuple:
+        return (app_name, user_id, session_id)
+
+    def _schedule_eviction(self, key: tuple, entry: _CachedSession) -> Future:
+        """Start writing out an evicted session; call with self._lock held."""
+        token = object()
+        future = self._writer.submit(self._evict(key, entry, token))
+        self._evicting[key] = (token, future)
+        return future
+
+    async def _evict(self, key: tuple, entry: _CachedSession, token: object) -> None:
+        try:
+            await self._flush_entry(entry)
+        except Exception as e:
+            # Keep it cached rather than lose unwritten events
+            with self._lock:
+                self._cache.setdefault(key, entry)
+            print(f"⚠️  Could not evict session {key[2]}: {e}")
+        finally:
+            with self._lock:
+                # A later flush of the same session may have taken over the key
+                if self._evicting.get(key, (None,))[0] is token:
+                    del self._evicting[key]
+
+    async def _cache_session(self, stored: Session) -> _CachedSession:
+        """Add a session loaded from or created in the database."""
+        key = self._key(stored.app_name, stored.user_id, stored.id)
+        evictions = []
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                # Cached by a concurrent caller meanwhile; keep its pending events
+                return entry
+            entry = _CachedSession(session=stored.model_copy(deep=True), stored=stored)
+            # The stored copy only needs its revision, not the event history
+            stored.events = []
+            self._cache[key] = entry
+            while len(self._cache) > self.max_sessions:
+                evictions.append(self._schedule_eviction(*self._cache.popitem(last=False)))
+
+        for future in evictions:
+            await asyncio.wrap_future(future)
+        return entry
+
+    async def _load_entry(self, app_name: str, user_id: str, session_id: str) -> Optional[_CachedSession]:
+        """
+        Cached entry of a session, loading it from the database on a miss.
+
+        A session still being written out by its eviction is only reloaded
+        once that write has committed, so the copy read back is current.
+        """
+        key = self._key(app_name, user_id, session_id)
+        while True:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is not None:
+                    self._cache.move_to_end(key)
+                    return entry
+                eviction = self._evicting.get(key)
+            if eviction is None:
+                break
+            await asyncio.wrap_future(eviction[1])
+
+        self.misses += 1
+        stored = await self._writer.run(self.backing.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        ))
+        if stored is None:
+            return None
+        return await self._cache_session(stored)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            await self._flush_all()
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        # Created synchronously so the session id is durable and unique
+        stored = await self._writer.run(self.backing.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        ))
+        entry = await self._cache_session(stored)
+        return entry.session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        misses = self.misses
+        entry = await self._load_entry(app_name, user_id, session_id)
+        if entry is None:
+            return None
+        if self.misses == misses:
+            self.hits += 1
+
+        if config is None:
+            return entry.session
+
+        events = entry.session.events
+        if config.num_recent_events is not None:
+            events = events[-config.num_recent_events:] if config.num_recent_events else []
+        if config.after_timestamp is not None:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        return entry.session.model_copy(update={"events": list(events)})
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        await self.flush()
+        return await self._writer.run(self.backing.list_sessions(app_name=app_name, user_id=user_id))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        with self._lock:
+            self._cache.pop(self._key(app_name, user_id, session_id), None)
+        await self._writer.run(self.backing.delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        ))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        key = self._key(session.app_name, session.user_id, session.id)
+        # Reloaded if it was evicted mid-turn, once its eviction has committed
+        entry = await self._load_entry(session.app_name, session.user_id, session.id)
+        if entry is None:
+            raise SessionNotFoundError(f"Session {session.id} not found.")
+
+        event = await super().append_event(session, event)
+        late_flush = None
+        with self._lock:
+            # Evicted while appending, and maybe already reloaded from the database
+            current = self._cache.get(key) or entry
+            current.pending.append(event)
+            if current is entry and self._cache.get(key) is not entry:
+                # Its eviction flush may have missed this event
+                late_flush = self._schedule_eviction(key, entry)
+        if current.session is not session:
+            # The caller holds a filtered copy; keep the cached session current
+            await super().append_event(current.session, event)
+        if late_flush is not None:
+            await asyncio.wrap_future(late_flush)
+        return event
+
+    async def _flush_entry(self, entry: _CachedSession) -> None:
+        """Write one session's pending events in one transaction (writer loop only)."""
+        async with entry.flush_lock:
+            with self._lock:
+                pending, entry.pending = entry.pending, []
+            if not pending:
+                return
+            try:
+                await self.backing.append_events(entry.stored, pending)
+            except Exception:
+                # Keep unwritten events, in order, for the next flush
+                with self._lock:
+                    entry.pending = pending + entry.pending
+                raise
+
+    async def _flush_all(self) -> None:
+        with self._lock:
+            entries = [entry for entry in self._cache.values() if entry.pending]
+            evictions = [future for _, future in self._evicting.values()]
+        for entry in entries:
+            try:
+                await self._flush_entry(entry)
+            except Exception as e:
+                # The entry keeps its pending events; the other sessions still get written
+                print(f"⚠️  Could not flush session {entry.session.id}, will retry: {e}")
+        for future in evictions:
+            await asyncio.wrap_future(future)
+
+    async def flush(self) -> None:
+        """Write every changed session to the database."""
+        await self._writer.run(self._flush_all())
+
+    async def close(self) -> None:
+        """Stop the snapshot loop, write everything out and stop the writer."""
+        if self._flush_task is None:
+            return
+        self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
+        await self._writer.run(self.backing.close())
+        self._writer.stop()
+
+
+def create_session_service(
+    db_path: str = SESSIONS_DB_PATH,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = MAX_OVERFLOW,
+    batch_turn_writes: bool = True,
+    write_behind: bool = False
+) -> BaseSessionService:
+    """
+    Create a SQLite session service tuned for concurrent sessions.
+
+    Args:
+        db_path: Path to the SQLite database file
+        pool_size: Persistent connections kept in the pool
+        max_overflow: Extra connections allowed under bursts
+        batch_turn_writes: Write each turn's events together
+        write_behind: Keep hot sessions in memory and write them behind
+
+    Returns:
+        Configured session service
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    db_url = f"sqlite+aiosqlite:///{db_path}"
+    # Write-behind flushes through the batching service's append_events
+    batch_turn_writes = batch_turn_writes or write_behind
+    service_class = TurnBatchingSessionService if batch_turn_writes else DatabaseSessionService
+
+    service = service_class(
+        db_url=db_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=POOL_TIMEOUT_S,
+    )
+    sqlalchemy_event.listen(service.db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+    if write_behind:
+        return WriteBehindSessionService(service)
+    return service